@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Article Archive
+Архив опубликованных статей в общей SQLite базе: сжатые записи и индексы для выборок
+"""
+
+import os
+import re
+import glob
+import html
+import json
+import zlib
+import sqlite3
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    saved_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    url TEXT,
+    title TEXT,
+    topic TEXT,
+    media_url TEXT,
+    payload BLOB NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_unique ON articles (source, url, saved_at);
+CREATE INDEX IF NOT EXISTS idx_articles_saved ON articles (saved_at);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, saved_at);
+-- Темы сравниваются без учета регистра (IEEE хранит 'AI', в CLI пишут ai)
+DROP INDEX IF EXISTS idx_articles_topic;
+CREATE INDEX IF NOT EXISTS idx_articles_topic_nocase ON articles (topic COLLATE NOCASE, saved_at);
+CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url);
+"""
+
+# Полнотекстовый индекс: заголовок, текст статьи и созданный пост (rowid = articles.id)
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, content, post_content, tokenize='unicode61 remove_diacritics 2'
+);
+"""
+# Веса bm25: совпадение в заголовке важнее, чем в посте, а в посте - чем в тексте статьи
+SEARCH_WEIGHTS = (10.0, 1.0, 3.0)
+TAG_RE = re.compile(r'<[^>]+>')
+QUERY_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SUMMARY_COLUMNS = 'id, saved_at, source, url, title, topic, media_url'
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+COMPRESSION_LEVEL = 6
+
+
+def pack_record(record):
+    return zlib.compress(json.dumps(record, ensure_ascii=False, default=str).encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def unpack_record(payload):
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+def plain_text(text):
+    """Текст без HTML разметки для индексации"""
+    return html.unescape(TAG_RE.sub(' ', text or ''))
+
+
+def build_match_query(text):
+    """Запрос FTS5 из обычной строки: все слова (с учетом окончаний через префикс)"""
+    return ' '.join(f'"{token}"*' for token in QUERY_TOKEN_RE.findall(text))
+
+
+def _saved_at_from_record(record):
+    """Время сохранения из поля timestamp старых JSON файлов"""
+    try:
+        return datetime.strptime(record.get('timestamp', ''), TIMESTAMP_FORMAT).isoformat()
+    except ValueError:
+        return None
+
+
+class ArticleArchive:
+    """Архив опубликованных статей всех источников
+
+    Запись хранится целиком в сжатом JSON (формат тот же, что у старых файлов архива),
+    дата, источник, тема и URL вынесены в индексированные колонки.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        with self.store.lock, self.store.conn:
+            self.store.conn.executescript(SCHEMA)
+        self.search_available = self._create_search_index()
+
+    def _create_search_index(self):
+        """Создание полнотекстового индекса и индексация уже сохраненных записей"""
+        exists = self.store.query("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")
+        try:
+            with self.store.lock, self.store.conn:
+                self.store.conn.executescript(SEARCH_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search unavailable, falling back to title search: {e}")
+            return False
+        if not exists:
+            # Текст статей в архиве не хранится, поэтому старые записи индексируются по заголовку и посту
+            rows = self.store.query('SELECT id, title, payload FROM articles')
+            self.store.executemany(
+                'INSERT INTO articles_fts (rowid, title, content, post_content) VALUES (?, ?, ?, ?)',
+                [(row_id, title, '', plain_text(unpack_record(payload).get('post_content')))
+                 for row_id, title, payload in rows]
+            )
+        return True
+
+    def add(self, source, record, saved_at=None, content=None):
+        """Добавление записи, возвращает id (None, если такая запись уже есть)
+
+        content - текст статьи: попадает только в поисковый индекс, не в сжатую запись.
+        """
+        return self.add_many(source, [(record, saved_at, content)])[0]
+
+    def add_many(self, source, entries):
+        """Пакетное добавление записей (record, saved_at, content) в одной транзакции, список id"""
+        ids = []
+        with self.store.lock, self.store.conn:
+            for record, saved_at, content in entries:
+                ids.append(self._insert(source, record, saved_at, content))
+        return ids
+
+    def _insert(self, source, record, saved_at, content):
+        article = record.get('article') or {}
+        saved_at = saved_at or _saved_at_from_record(record) or datetime.now().isoformat()
+        cursor = self.store.conn.execute(
+            'INSERT OR IGNORE INTO articles (saved_at, source, url, title, topic, media_url, payload) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (saved_at, source, article.get('link'), article.get('title'), article.get('topic'),
+             record.get('media_url') or record.get('image_url'), pack_record(record))
+        )
+        if not cursor.rowcount:
+            return None
+        # Индекс обновляется в той же транзакции, что и запись архива
+        if self.search_available:
+            self.store.conn.execute(
+                'INSERT INTO articles_fts (rowid, title, content, post_content) VALUES (?, ?, ?, ?)',
+                (cursor.lastrowid, article.get('title'), content or '', plain_text(record.get('post_content')))
+            )
+        return cursor.lastrowid
+
+    def search(self, text, source=None, limit=20, raw=False):
+        """Поиск по заголовкам, текстам статей и постам, лучшие совпадения первыми"""
+        if not self.search_available:
+            where, params = self._where(source)
+            where = f"{where} AND title LIKE ?" if where else 'WHERE title LIKE ?'
+            rows = self.store.query(
+                f'SELECT {SUMMARY_COLUMNS} FROM articles {where} ORDER BY saved_at DESC LIMIT ?',
+                params + [f'%{text}%', limit]
+            )
+            return [dict(self._row_to_dict(row), score=None, snippet='') for row in rows]
+
+        query = text if raw else build_match_query(text)
+        if not query:
+            return []
+        source_condition = 'AND a.source = ?' if source else ''
+        rows = self.store.query(
+            f"SELECT a.id, a.saved_at, a.source, a.url, a.title, a.topic, a.media_url, "
+            f"bm25(articles_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) AS score, "
+            f"snippet(articles_fts, -1, '[', ']', '…', 12) "
+            f"FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+            f"WHERE articles_fts MATCH ? {source_condition} ORDER BY score LIMIT ?",
+            [query] + ([source] if source else []) + [limit]
+        )
+        return [dict(self._row_to_dict(row), score=-row[7], snippet=row[8]) for row in rows]
+
+    def get(self, article_id):
+        """Полная запись по id или None"""
+        rows = self.store.query(f'SELECT {SUMMARY_COLUMNS}, payload FROM articles WHERE id = ?', (article_id,))
+        return self._row_to_dict(rows[0], with_payload=True) if rows else None
+
+    @staticmethod
+    def _row_to_dict(row, with_payload=False):
+        item = dict(zip(('id', 'saved_at', 'source', 'url', 'title', 'topic', 'media_url'), row[:7]))
+        if with_payload:
+            item['record'] = unpack_record(row[7])
+        return item
+
+    @staticmethod
+    def _where(source=None, topic=None, url=None, since=None, until=None):
+        conditions, params = [], []
+        for column, value in (('source', source), ('topic COLLATE NOCASE', topic), ('url', url)):
+            if value:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if since:
+            conditions.append('saved_at >= ?')
+            params.append(since)
+        if until:
+            # Дата без времени включает весь день
+            conditions.append('saved_at < ?' if 'T' in until else "saved_at < ? || 'T99'")
+            params.append(until)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ''), params
+
+    def find(self, source=None, topic=None, url=None, since=None, until=None,
+             limit=None, offset=0, with_payload=False):
+        """Записи по фильтрам, новые первыми"""
+        where, params = self._where(source, topic, url, since, until)
+        columns = SUMMARY_COLUMNS + (', payload' if with_payload else '')
+        rows = self.store.query(
+            f'SELECT {columns} FROM articles {where} ORDER BY saved_at DESC, id DESC LIMIT ? OFFSET ?',
+            params + [-1 if limit is None else limit, offset]
+        )
+        return [self._row_to_dict(row, with_payload) for row in rows]
+
+    def count(self, source=None, topic=None, url=None, since=None, until=None):
+        where, params = self._where(source, topic, url, since, until)
+        return self.store.query(f'SELECT COUNT(*) FROM articles {where}', params)[0][0]
+
+    def archived_among(self, source, urls):
+        """Множество URL из списка, которые уже есть в архиве источника"""
+        urls = list(urls)
+        archived = set()
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(urls), 500):
+            batch = urls[start:start + 500]
+            rows = self.store.query(
+                f'SELECT DISTINCT url FROM articles WHERE source = ? AND url IN ({",".join("?" * len(batch))})',
+                [source] + batch
+            )
+            archived.update(url for (url,) in rows)
+        return archived
+
+    def group_counts(self, column, source=None):
+        """Количество записей по источникам или темам"""
+        if column not in ('source', 'topic'):
+            raise ValueError(f"Unsupported group column: {column}")
+        where, params = self._where(source)
+        return self.store.query(
+            f'SELECT {column}, COUNT(*) FROM articles {where} GROUP BY {column} ORDER BY COUNT(*) DESC', params
+        )
+
+    def migrate_directory(self, folder, source, force=False):
+        """Перенос JSON файлов старого архива (повторный перенос не создает дублей)"""
+        meta_key = f'migrated_archive:{os.path.abspath(folder)}'
+        if not os.path.isdir(folder) or (self.store.get_meta(meta_key) and not force):
+            return 0
+
+        migrated = 0
+        for path in sorted(glob.glob(os.path.join(folder, '*.json'))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable archive file {path}: {e}")
+                continue
+            if self.add(source, record) is not None:
+                migrated += 1
+
+        self.store.set_meta(meta_key, datetime.now().isoformat())
+        logger.info(f"Migrated {migrated} archived articles from {folder} to {self.store.db_path}")
+        return migrated
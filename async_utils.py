@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Async Utils
+Вспомогательные функции для запуска блокирующего кода из event loop
+"""
+
+import asyncio
+import functools
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Выполнение блокирующей функции (requests, PIL, OpenAI) в пуле потоков"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+async def gather_blocking(func, items):
+    """Параллельный вызов блокирующей функции для каждого элемента"""
+    return await asyncio.gather(*[run_blocking(func, item) for item in items])
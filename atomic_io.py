@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Atomic IO
+Атомарная запись файлов и межпроцессные рекомендательные блокировки
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def file_lock(path):
+    """Эксклюзивная блокировка на файле path + '.lock' (ждет освобождения)
+
+    Блокировка снимается ОС и при аварийном завершении процесса,
+    поэтому "зависших" lock-файлов не бывает.
+    """
+    lock_path = path + '.lock'
+    with open(lock_path, 'a+b') as lock_file:
+        if os.name == 'nt':
+            lock_file.seek(0)
+            # LK_LOCK повторяет попытку 10 раз в секунду, поэтому ждем в цикле
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _fsync_directory(directory):
+    """Фиксация переименования на диске (на Windows не требуется и не поддерживается)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_open(path, mode='w', encoding='utf-8'):
+    """Запись во временный файл рядом с path и атомарная замена после fsync
+
+    Читатели видят либо старый файл, либо полностью записанный новый.
+    При исключении временный файл удаляется, исходный не меняется.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_directory(directory)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
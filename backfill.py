@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Загрузка архива за прошедшие дни
+Статьи источников за диапазон дат: только извлечение текста и медиа (без AI и публикации),
+запись одной пачкой на день в архив, отпечатки историй и базу опубликованных URL.
+Прогресс сохраняется по дням: прерванная загрузка продолжается с незавершенных дней.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import platform
+from datetime import date, datetime, timedelta
+from dotenv import load_dotenv
+from async_utils import run_blocking
+from pipeline import Pipeline, Stage
+from scraper_clients import ScraperClients
+from base_scraper import BaseNewsScraper, load_sources
+from run_all_scrapers import create_scrapers, close_clients
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Сколько статей скачивается одновременно (все дни вместе)
+DEFAULT_CONCURRENCY = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill_progress (
+    source TEXT NOT NULL,
+    day TEXT NOT NULL,
+    articles INTEGER NOT NULL,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (source, day)
+);
+"""
+
+
+def date_range(since, until):
+    """Дни от since до until включительно"""
+    day = since
+    while day <= until:
+        yield day
+        day += timedelta(days=1)
+
+
+class BackfillProgress:
+    """Дни, полностью загруженные в архив, по источникам"""
+
+    def __init__(self, store):
+        self.store = store
+        with self.store.lock, self.store.conn:
+            self.store.conn.executescript(SCHEMA)
+
+    def done_days(self, source, since, until):
+        rows = self.store.query('SELECT day FROM backfill_progress WHERE source = ? AND day BETWEEN ? AND ?',
+                                (source, since.isoformat(), until.isoformat()))
+        return {date.fromisoformat(day) for (day,) in rows}
+
+    def mark_done(self, source, day, articles):
+        self.store.execute(
+            'INSERT OR REPLACE INTO backfill_progress (source, day, articles, finished_at) VALUES (?, ?, ?, ?)',
+            (source, day.isoformat(), articles, datetime.now().isoformat())
+        )
+
+
+class Backfill:
+    """Загрузка статей одного источника за диапазон дат
+
+    Дни проходят этапы конвейера: discover (список статей дня) → extract (текст и медиа,
+    не больше concurrency статей одновременно) → generate (пост с AI, только with_posts) →
+    write (одна пачка на день). День с ошибками записывается частично и не отмечается
+    завершенным: следующий запуск догрузит только недостающие статьи.
+    archive_only - не добавлять статьи в опубликованные URL и отпечатки историй.
+    """
+
+    def __init__(self, scraper, concurrency=DEFAULT_CONCURRENCY, with_posts=False, archive_only=False):
+        self.scraper = scraper
+        self.source = scraper.source_name
+        self.progress = BackfillProgress(scraper.state_store)
+        self.concurrency = max(1, concurrency)
+        self.with_posts = with_posts
+        self.archive_only = archive_only
+        self.semaphore = None
+        self.stats = {'days': 0, 'days_skipped': 0, 'failed_days': 0, 'articles': 0, 'already_archived': 0,
+                      'failed': 0}
+
+    def build_pipeline(self):
+        stages = [
+            Stage.from_env('discover', self.stage_discover, concurrency=2),
+            Stage.from_env('extract', self.stage_extract, concurrency=2),
+        ]
+        if self.with_posts:
+            stages.append(Stage.from_env('generate', self.stage_generate, concurrency=2))
+        # Запись последовательная: одна транзакция архива на день
+        stages.append(Stage('write', self.stage_write, concurrency=1))
+        return Pipeline(stages, name=f"{self.scraper.display_name} backfill")
+
+    async def limited(self, func, *args):
+        """Блокирующий вызов с общим лимитом параллельности"""
+        async with self.semaphore:
+            return await run_blocking(func, *args)
+
+    async def stage_discover(self, day):
+        """Статьи дня, которых еще нет в архиве"""
+        articles = await run_blocking(self.scraper.fetch_articles_for_date, day)
+        archived = self.scraper.archive.archived_among(self.source, [article['link'] for article in articles])
+        self.stats['already_archived'] += len(archived)
+        return {'day': day, 'articles': [article for article in articles if article['link'] not in archived],
+                'entries': [], 'failed': 0}
+
+    async def stage_extract(self, item):
+        """Текст и медиа статей дня"""
+        results = await asyncio.gather(*[self.limited(self.scraper.scrape_article, article['link'])
+                                         for article in item['articles']])
+        for article, article_data in zip(item['articles'], results):
+            if article_data['content']:
+                item['entries'].append((article, article_data))
+            else:
+                logger.warning(f"Failed to extract article content: {article['link']}")
+                item['failed'] += 1
+        return item
+
+    async def stage_generate(self, item):
+        """Посты с AI для статей дня (без публикации)"""
+        posts = await asyncio.gather(*[
+            self.limited(self.scraper.create_viral_post, article['title'], article_data['content'],
+                         article['link'], article.get('topic'))
+            for article, article_data in item['entries']
+        ])
+        for (article, article_data), post_content in zip(item['entries'], posts):
+            article_data['post_content'] = post_content
+        return item
+
+    async def stage_write(self, item):
+        """Запись дня одной пачкой: отпечатки историй, опубликованные URL, архив, прогресс"""
+        scraper = self.scraper
+        day = item['day']
+        articles = [article for article, _ in item['entries']]
+        # Дата статьи, а не время загрузки: окно поиска почти-дублей и выборки архива по датам
+        saved_at = datetime.combine(day, datetime.min.time()).isoformat()
+
+        if articles and not self.archive_only:
+            scraper.near_duplicates.add_many([(article['link'], self.source, article['title'],
+                                               scraper.story_fingerprint(article)) for article in articles],
+                                             saved_at)
+            scraper.published_urls.add_many([article['link'] for article in articles], saved_at)
+
+        entries = []
+        for article, article_data in item['entries']:
+            record, _, content = scraper.archive_entry(article, article_data.get('post_content'),
+                                                       article_data['media_url'], article_data['content'])
+            record['published'] = False
+            entries.append((record, saved_at, content))
+        scraper.archive.add_many(self.source, entries)
+
+        self.stats['articles'] += len(entries)
+        self.stats['failed'] += item['failed']
+        if not item['failed']:
+            self.progress.mark_done(self.source, day, len(entries))
+            self.stats['days'] += 1
+        logger.info(f"Backfill {self.source} {day}: {len(entries)} articles archived, {item['failed']} failed")
+        # Текст статей уже в архиве: в результатах конвейера остается только итог дня
+        return {'day': day, 'articles': len(entries), 'failed': item['failed']}
+
+    async def run(self, since, until, force=False):
+        """Загрузка дней диапазона (уже завершенные пропускаются, если не force), статистика"""
+        days = list(date_range(since, until))
+        done = set() if force else self.progress.done_days(self.source, since, until)
+        pending = [day for day in days if day not in done]
+        self.stats['days_skipped'] = len(days) - len(pending)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        pipeline = self.build_pipeline()
+        await pipeline.run(pending)
+        # День, на котором упал этап (например, не загрузился список статей), будет загружен заново
+        self.stats['failed_days'] = sum(stats.failed for stats in pipeline.stats.values())
+        return self.stats
+
+
+def supports_backfill(scraper):
+    return type(scraper).fetch_articles_for_date is not BaseNewsScraper.fetch_articles_for_date
+
+
+def parse_day(text):
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"неверная дата {text!r}, ожидается ГГГГ-ММ-ДД")
+
+
+async def main(argv=None):
+    registry = load_sources()
+    parser = argparse.ArgumentParser(description="📚 Загрузка архива статей за прошедшие дни")
+    parser.add_argument('--source', action='append', choices=list(registry),
+                        help='Загружать только этот источник (можно указать несколько раз)')
+    parser.add_argument('--since', type=parse_day, required=True, help='Первый день (ГГГГ-ММ-ДД)')
+    parser.add_argument('--until', type=parse_day, default=date.today() - timedelta(days=1),
+                        help='Последний день включительно (по умолчанию вчера)')
+    parser.add_argument('--concurrency', type=int,
+                        default=int(os.getenv('BACKFILL_CONCURRENCY', DEFAULT_CONCURRENCY)),
+                        help='Сколько статей скачивать одновременно (BACKFILL_CONCURRENCY)')
+    parser.add_argument('--with-posts', action='store_true',
+                        help='Создавать посты с AI для архива (без публикации)')
+    parser.add_argument('--archive-only', action='store_true',
+                        help='Только архив: не отмечать статьи опубликованными')
+    parser.add_argument('--force', action='store_true', help='Загрузить заново уже завершенные дни')
+    args = parser.parse_args(argv)
+
+    if args.since > args.until:
+        parser.error('--since позже --until')
+    if args.until >= date.today() and not args.archive_only:
+        # Статьи сегодняшнего дня еще может опубликовать обычный запуск
+        parser.error('--until должен быть в прошлом (или используйте --archive-only)')
+
+    clients = ScraperClients()
+    failed = False
+    try:
+        scrapers = create_scrapers(args.source or list(registry), clients)
+        for source, scraper in scrapers.items():
+            if not supports_backfill(scraper):
+                print(f"⚠️  {source}: загрузка архива не поддерживается")
+                continue
+            print(f"📚 {source}: загрузка с {args.since} по {args.until}")
+            started = time.monotonic()
+            stats = await Backfill(scraper, args.concurrency, args.with_posts, args.archive_only).run(
+                args.since, args.until, args.force)
+            failed = failed or bool(stats['failed'] or stats['failed_days'])
+            print(f"   ✅ дней: {stats['days']} (пропущено загруженных: {stats['days_skipped']}), "
+                  f"статей: {stats['articles']}, уже в архиве: {stats['already_archived']}, "
+                  f"ошибок: {stats['failed']} ({time.monotonic() - started:.1f} с)")
+    finally:
+        await close_clients(clients)
+    if failed:
+        print("⚠️  Часть статей не загружена: повторный запуск догрузит их")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if platform.system() == 'Windows':
+        # Используем SelectEventLoop для Windows чтобы избежать проблем с ProactorEventLoop
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        print("\n⏹️ Загрузка прервана, прогресс сохранен")
+        sys.exit(0)
@@ -0,0 +1,1073 @@
+#!/usr/bin/env python3
+"""
+Base News Scraper
+Общий конвейер скраперов: фильтрация опубликованного, выбор статьи и создание поста с AI,
+скачивание медиа, публикация в Telegram и архив. Источник реализует только поиск статей
+(fetch_articles) и извлечение текста и медиа (scrape_article).
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import tempfile
+import importlib
+from datetime import datetime, date
+from urllib.parse import urljoin, urlparse
+from dotenv import load_dotenv
+from telegram_publisher import TelegramPublisher, load_channel_targets
+from markdown_html import convert_markdown_to_html
+from message_splitter import truncate_html_message
+from media_validation import validate_media, media_type_for
+from async_utils import gather_blocking, run_blocking
+from pipeline import Pipeline, Stage
+from state_store import PublishedUrlStore
+from url_canon import canonicalize_url
+from near_duplicates import fingerprint_story
+from article_archive import ArticleArchive
+from checkpoints import RunCheckpoints, READY_STAGE
+from scraper_clients import ScraperClients
+
+logger = logging.getLogger(__name__)
+
+# Модули встроенных источников; дополнительные - через SCRAPER_PLUGINS (через запятую)
+SOURCE_MODULES = ['techcrunch_scraper', 'ieee_spectrum_scraper']
+_SOURCES = {}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+# Сколько раз пересоздавать пост, если Telegram отклонил слишком длинную подпись
+MAX_RECREATE_ATTEMPTS = 10
+# Сколько статей AI ранжирует за запуск: выбранная и запасные на случай ее сбоя
+DEFAULT_SHORTLIST_SIZE = 3
+# Готовый пост старше этого возраста (часы) перед публикацией проверяется заново
+DEFAULT_READY_MAX_AGE_HOURS = 6
+# Статья удалена с сайта: готовый пост по ней не публикуется
+GONE_STATUS_CODES = (404, 410)
+# Файлы, которые нельзя отправить фото в альбоме (GIF публикуется только анимацией)
+NON_PHOTO_EXTENSIONS = ('.gif', '.svg', '.mp4', '.webm')
+
+
+def is_photo_url(url):
+    return not urlparse(url).path.lower().endswith(NON_PHOTO_EXTENSIONS)
+
+
+def register_source(scraper_class):
+    """Декоратор класса источника: делает его доступным для общих запусков по source_name"""
+    _SOURCES[scraper_class.source_name] = scraper_class
+    return scraper_class
+
+
+def load_sources():
+    """Все зарегистрированные источники {source_name: класс} (с импортом модулей-плагинов)"""
+    plugins = [name.strip() for name in os.getenv('SCRAPER_PLUGINS', '').split(',') if name.strip()]
+    for module_name in SOURCE_MODULES + plugins:
+        importlib.import_module(module_name)
+    return dict(_SOURCES)
+
+
+class BackupPool:
+    """Запасные статьи запуска
+
+    Пока готовится основная статья, следующая запасная уже скрапится в фоне, чтобы при
+    сбое основной переключиться без ожидания. Неиспользованная работа отменяется.
+    """
+
+    def __init__(self, scraper, articles):
+        self.scraper = scraper
+        self.articles = list(articles)
+        self.prefetched = None
+        # Зарезервированные запасные статьи: резерв снимается в конце запуска
+        self.reserved = []
+
+    def prefetch(self):
+        """Фоновый скрапинг следующей запасной статьи"""
+        if self.prefetched is None and self.articles:
+            article = self.articles.pop(0)
+            task = asyncio.ensure_future(run_blocking(self.scraper.scrape_article, article['link']))
+            self.prefetched = (article, task)
+            logger.info(f"Speculatively scraping backup article: {article['title']}")
+
+    async def take(self):
+        """Следующая запасная статья и результат ее скрапинга, (None, None) - запасных нет"""
+        while True:
+            self.prefetch()
+            if self.prefetched is None:
+                return None, None
+            article, task = self.prefetched
+            self.prefetched = None
+            article_data = await task
+            if self.scraper.reserve_story(article):
+                self.reserved.append(article)
+                self.prefetch()
+                return article, article_data
+            logger.warning(f"Backup story is already being published by another source: {article['title']}")
+
+    def cancel(self):
+        """Отмена фонового скрапинга, который не понадобился"""
+        if self.prefetched is not None:
+            article, task = self.prefetched
+            task.cancel()
+            self.prefetched = None
+            logger.info(f"Cancelled unused backup article: {article['title']}")
+
+
+class BaseNewsScraper:
+    """Базовый класс источника
+
+    Подкласс задает source_name, display_name, промпты и реализует fetch_articles()
+    (список словарей с title, link, author и полем лида summary_field) и scrape_article(url)
+    ({'content', 'media_url', 'media_urls'}). Остальные этапы можно переопределить точечно.
+    """
+
+    source_name = None
+    display_name = None
+    # Старые файлы состояния: переносятся в общую базу при первом запуске
+    published_urls_file = None
+    json_folder = None
+    # Поле статьи с лидом/описанием: отпечаток истории и описание для выбора
+    summary_field = 'summary'
+    # Ключ URL медиафайла в записи архива (как в старых JSON файлах источника)
+    archive_media_key = 'media_url'
+    HEADERS = DEFAULT_HEADERS
+
+    SELECTION_PROMPT = """
+            Ты эксперт по технологиям и контенту. Из следующего списка статей выбери ОДНУ самую интересную и виральную статью для публикации в Telegram канале о технологиях.
+
+            Статьи:
+            {articles}
+
+            Ответь ТОЛЬКО номерами статей через запятую: сначала выбранная, затем до {backups} запасных по убыванию интереса (например: 3, 1, 7). Если ни одна статья не подходит, ответь "0".
+            """
+    POST_PROMPT = """
+            Создай для Telegram канала на основе этой статьи виральный пост длинной до 900 символов. Используй разметку, отступы и эмоджи. Вопрос в конце поста не нужен.
+
+            Заголовок статьи: {title}
+
+            Содержание статьи: {content}
+            """
+    SHORT_POST_PROMPT = """
+                    Создай на основе этой статьи для Telegram канала о технологиях очень короткий виральный пост длинной от 500 до 1000 символов(включая теги), вопрос в конце поста не нужен. Используй разметку, отступы и эмоджи. Вывести только сам пост.
+
+                    Заголовок статьи: {title}
+
+                    Содержание статьи: {content}
+                    """
+    POST_CONTENT_LIMIT = 2900
+    SHORT_POST_CONTENT_LIMIT = 1500
+
+    def __init__(self, clients=None):
+        """clients - общие для нескольких скраперов клиенты и база состояния (ScraperClients)"""
+        load_dotenv()
+        self.clients = clients or ScraperClients()
+
+        # Конфигурация OpenRouter
+        self.openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
+        self.openrouter_base_url = os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
+        self.ai_model = os.getenv('AI_MODEL', 'google/gemini-pro')
+        self.max_tokens = int(os.getenv('MAX_TOKENS', '4000'))
+        self.temperature = float(os.getenv('TEMPERATURE', '0.7'))
+
+        # Конфигурация Telegram
+        self.telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
+        self.telegram_channel = os.getenv('TELEGRAM_CHANNEL_ID')
+
+        # Хранилище опубликованных URL (SQLite); JSON файл - только для переноса старых данных
+        self.state_store = self.clients.state_store
+        self.published_urls = self.load_published_urls()
+
+        # Отпечатки опубликованных историй всех источников (поиск почти-дублей)
+        self.near_duplicates = self.clients.near_duplicates
+
+        # Архив опубликованных статей (SQLite); папка с JSON файлами - только для переноса старых данных
+        self.archive = ArticleArchive(self.state_store)
+        if self.json_folder:
+            self.archive.migrate_directory(self.json_folder, self.source_name)
+
+        # Контрольные точки подготовки постов: повторный запуск продолжает с незавершенного этапа
+        self.checkpoints = RunCheckpoints(self.state_store)
+
+        # Клиенты OpenRouter и Telegram создаются при первом обращении (см. ScraperClients)
+        self._publisher = None
+
+        # Очередь отправки с учетом лимитов Telegram и flood-wait
+        self.send_queue = self.clients.send_queue
+
+        # Каналы для публикации (основной и региональные)
+        self.channel_targets = load_channel_targets()
+        self.publish_attempts = int(os.getenv('TELEGRAM_PUBLISH_ATTEMPTS', '3'))
+
+        # Альбом: сколько изображений публиковать одним send_media_group (1 - без альбома)
+        self.album_max_items = max(1, min(10, int(os.getenv('ALBUM_MAX_ITEMS', '1'))))
+        self.failed_channels = []
+
+        # Выбранная статья и запасные (скрапятся заранее, если выбранная не скачается)
+        self.shortlist_size = max(1, int(os.getenv('SHORTLIST_SIZE', DEFAULT_SHORTLIST_SIZE)))
+
+        # Сколько постов публиковать за запуск и пауза между ними
+        self.max_posts = max(1, int(os.getenv('MAX_POSTS_PER_RUN', '1')))
+        self.post_spacing = max(0.0, float(os.getenv('POST_SPACING_SECONDS', '0')))
+        self.next_post_at = 0.0
+
+        # Заранее подготовленные посты: служебный чат для загрузки медиа и возраст перепроверки
+        self.staging_chat_id = os.getenv('TELEGRAM_STAGING_CHAT_ID')
+        self.ready_max_age_hours = float(os.getenv('READY_MAX_AGE_HOURS', DEFAULT_READY_MAX_AGE_HOURS))
+
+        # HTTP сессия: соединения (keep-alive, TLS) переиспользуются между запросами и запусками
+        self.http = self.clients.http
+        self.headers = dict(self.HEADERS)
+
+    @property
+    def openai_client(self):
+        return self.clients.openai_client
+
+    @property
+    def telegram_bot(self):
+        return self.clients.telegram_bot
+
+    @property
+    def publisher(self):
+        if self._publisher is None:
+            self._publisher = TelegramPublisher(self.telegram_bot, self.send_queue, self.channel_targets)
+        return self._publisher
+
+    # --- Этапы, которые реализует источник ---
+
+    def fetch_articles(self):
+        """Поиск свежих статей источника"""
+        raise NotImplementedError
+
+    def scrape_article(self, article_url):
+        """Текст статьи, основной медиафайл и кандидаты для альбома"""
+        raise NotImplementedError
+
+    def start_run(self):
+        """Подготовка к очередному запуску (например, обновление текущей даты)"""
+
+    def fetch_articles_for_date(self, day):
+        """Статьи, вышедшие в прошедший день (загрузка архива в backfill.py); необязательно"""
+        raise NotImplementedError(f"{self.display_name} does not support backfill")
+
+    # --- Опубликованные URL и почти-дубли ---
+
+    def load_published_urls(self):
+        """Подключение к хранилищу опубликованных URL (с переносом из старого JSON)"""
+        published_urls = PublishedUrlStore(self.state_store, self.source_name)
+        if self.published_urls_file:
+            published_urls.migrate_json(self.published_urls_file)
+        return published_urls
+
+    def add_published_url(self, url):
+        """Добавление URL в список опубликованных"""
+        self.published_urls.add(url)
+        logger.info(f"Added URL to published list: {url}")
+
+    def is_url_published(self, url):
+        """Проверка, был ли URL уже опубликован"""
+        return url in self.published_urls
+
+    def story_fingerprint(self, article):
+        """Отпечаток истории по заголовку и лиду"""
+        return fingerprint_story(article['title'], article.get(self.summary_field, ''))
+
+    def filter_near_duplicates(self, articles):
+        """Исключение историй, уже опубликованных под другим URL (в т.ч. другим источником)"""
+        unique_articles = []
+        for article in articles:
+            duplicate = self.near_duplicates.find(self.story_fingerprint(article))
+            if duplicate:
+                logger.info(f"Skipping near-duplicate of {duplicate['source']} story "
+                            f"'{duplicate['title']}' (similarity {duplicate['similarity']:.2f}): {article['title']}")
+            else:
+                unique_articles.append(article)
+
+        logger.info(f"Near-duplicate check: {len(unique_articles)} unique, {len(articles) - len(unique_articles)} skipped")
+        return unique_articles
+
+    def record_published_story(self, article):
+        """Сохранение отпечатка опубликованной истории"""
+        self.near_duplicates.add(article['link'], self.source_name, article['title'], self.story_fingerprint(article))
+
+    def reserve_story(self, article):
+        """Резерв истории на время подготовки и публикации поста (False - ее уже берет другой источник)"""
+        return self.near_duplicates.reserve(article['link'], self.source_name, article['title'],
+                                            self.story_fingerprint(article))
+
+    def release_story(self, article):
+        """Снятие резерва истории"""
+        self.near_duplicates.release(article['link'])
+
+    def filter_unpublished_articles(self, articles):
+        """Фильтрация статей, исключая уже опубликованные"""
+        unpublished_articles = []
+        skipped_count = 0
+
+        published = self.published_urls.published_among([article['link'] for article in articles])
+        seen_urls = set()
+
+        for article in articles:
+            # Один и тот же материал под разными URL (utm_*, AMP, слэш) сравниваем по каноническому виду
+            canonical_url = canonicalize_url(article['link'], self.source_name)
+            if article['link'] not in published and canonical_url not in seen_urls:
+                seen_urls.add(canonical_url)
+                unpublished_articles.append(article)
+            else:
+                skipped_count += 1
+                logger.info(f"Skipping already published article: {article['title']}")
+
+        logger.info(f"Filtered articles: {len(unpublished_articles)} unpublished, {skipped_count} already published")
+        return unpublished_articles
+
+    # --- AI: выбор статьи и создание поста ---
+
+    def describe_article(self, article):
+        """Строки описания статьи для промпта выбора (после заголовка)"""
+        return (f"   Автор: {article.get('author', 'Unknown')}\n"
+                f"   Краткое описание: {article.get(self.summary_field, '')[:200]}...\n")
+
+    def rank_articles(self, articles, limit=1):
+        """Выбор самой интересной статьи и запасных с помощью AI (до limit статей, лучшая первой)"""
+        try:
+            if not articles:
+                logger.warning("No articles to select from")
+                return []
+
+            # Формируем список статей для AI
+            shown = articles[:10]  # Берем первые 10 статей
+            articles_text = ""
+            for i, article in enumerate(shown, 1):
+                articles_text += f"{i}. {article['title']}\n{self.describe_article(article)}\n"
+
+            prompt = self.SELECTION_PROMPT.format(articles=articles_text, backups=max(0, limit - 1))
+            response = self.openai_client.chat.completions.create(
+                model=self.ai_model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=50,
+                temperature=self.temperature
+            )
+
+            choice = response.choices[0].message.content.strip()
+
+            ranked = []
+            for number in re.findall(r'\d+', choice):
+                index = int(number) - 1
+                if 0 <= index < len(shown) and shown[index] not in ranked:
+                    ranked.append(shown[index])
+            if ranked:
+                logger.info(f"AI selected article: {ranked[0]['title']} ({len(ranked[1:limit])} backups)")
+                return ranked[:limit]
+            logger.warning(f"AI returned no valid article number: {choice}")
+            return articles[:limit]
+
+        except Exception as e:
+            # Сбой модели не уменьшает число постов запуска: статьи берутся по порядку источника
+            logger.error(f"Error selecting best article: {e}")
+            return articles[:limit]
+
+    def select_best_article(self, articles):
+        """Выбор самой интересной статьи с помощью AI"""
+        ranked = self.rank_articles(articles)
+        return ranked[0] if ranked else None
+
+    def generate_post(self, prompt, article_url):
+        """Запрос поста у AI с подстановкой ссылки вместо плейсхолдера"""
+        try:
+            response = self.openai_client.chat.completions.create(
+                model=self.ai_model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self.max_tokens,
+                temperature=self.temperature
+            )
+
+            post_content = response.choices[0].message.content.strip()
+
+            # Заменяем плейсхолдер ссылки на реальную
+            post_content = post_content.replace('[ссылка]', article_url)
+
+            logger.info(f"Successfully created post with AI ({len(post_content)} characters)")
+            return post_content
+
+        except Exception as e:
+            logger.error(f"Error creating viral post: {e}")
+            return None
+
+    def create_viral_post(self, article_title, article_content, article_url, topic=None):
+        """Создание вирального поста для Telegram с помощью AI"""
+        prompt = self.POST_PROMPT.format(title=article_title, content=article_content[:self.POST_CONTENT_LIMIT])
+        return self.generate_post(prompt, article_url)
+
+    def create_short_post(self, article_title, article_content, article_url):
+        """Короткий пост, если Telegram отклонил подпись как слишком длинную"""
+        prompt = self.SHORT_POST_PROMPT.format(title=article_title,
+                                               content=article_content[:self.SHORT_POST_CONTENT_LIMIT])
+        return self.generate_post(prompt, article_url)
+
+    # --- Медиа ---
+
+    def extract_article_text(self, soup):
+        """Основной текст статьи (служебные элементы удаляются из soup)"""
+        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
+            element.decompose()
+
+        # Ищем основной контент статьи
+        content_selectors = [
+            'article',
+            '.article-content',
+            '.post-content',
+            '.entry-content',
+            '.content',
+            'main'
+        ]
+
+        content = ""
+        for selector in content_selectors:
+            elements = soup.select(selector)
+            if elements:
+                content = elements[0].get_text(separator=' ', strip=True)
+                break
+
+        if not content:
+            # Если не нашли по селекторам, берем весь body
+            content = soup.get_text(separator=' ', strip=True)
+
+        return ' '.join(content.split())
+
+    def fetch_soup(self, url):
+        """Загрузка и разбор HTML страницы"""
+        response = self.http.get(url, headers=self.headers, timeout=30)
+        response.raise_for_status()
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(response.content, 'html.parser')
+
+    def extract_main_image(self, soup, article_url):
+        """Извлечение главного изображения статьи"""
+        try:
+            # Список селекторов для поиска главного изображения
+            image_selectors = [
+                'meta[property="og:image"]',
+                'meta[name="twitter:image"]',
+                'meta[property="og:image:secure_url"]',
+                '.article-featured-image img',
+                '.post-featured-image img',
+                '.entry-featured-image img',
+                '.featured-image img',
+                'article img',
+                '.article-content img',
+                '.post-content img',
+                '.entry-content img',
+                'main img'
+            ]
+
+            image_url = None
+
+            # Сначала ищем в meta тегах (обычно там лучшее качество)
+            for selector in image_selectors[:3]:
+                elements = soup.select(selector)
+                if elements:
+                    image_url = elements[0].get('content') or elements[0].get('src')
+                    if image_url:
+                        break
+
+            # Если не нашли в meta, ищем в img тегах
+            if not image_url:
+                for selector in image_selectors[3:]:
+                    elements = soup.select(selector)
+                    if elements:
+                        # Берем первое изображение с достаточным размером
+                        for img in elements:
+                            src = img.get('src')
+                            if src:
+                                width = img.get('width')
+                                height = img.get('height')
+
+                                # Если размеры не указаны, берем изображение
+                                if not width or not height:
+                                    image_url = src
+                                    break
+
+                                # Проверяем минимальные размеры (200x200)
+                                try:
+                                    if int(width) >= 200 and int(height) >= 200:
+                                        image_url = src
+                                        break
+                                except (ValueError, TypeError):
+                                    image_url = src
+                                    break
+
+            # Преобразуем относительные URL в абсолютные
+            if image_url and not image_url.startswith(('http://', 'https://')):
+                image_url = urljoin(article_url, image_url)
+
+            return image_url
+
+        except Exception as e:
+            logger.error(f"Error extracting main image: {e}")
+            return None
+
+    def extract_image_candidates(self, soup, article_url, main_image_url=None, limit=10):
+        """Извлечение нескольких изображений статьи (главное - первым)
+
+        Альбом отправляется как InputMediaPhoto, поэтому GIF и видео в кандидаты не попадают.
+        """
+        candidates = [main_image_url] if main_image_url and is_photo_url(main_image_url) else []
+
+        for img in soup.select('article img, .article-content img, .post-content img, .entry-content img'):
+            if len(candidates) >= limit:
+                break
+            src = img.get('src')
+            if not src or src.startswith('data:'):
+                continue
+
+            # Пропускаем мелкие изображения (иконки, аватары)
+            try:
+                if img.get('width') and img.get('height') and (int(img['width']) < 200 or int(img['height']) < 200):
+                    continue
+            except (ValueError, TypeError):
+                pass
+
+            src = urljoin(article_url, src)
+            if is_photo_url(src) and src not in candidates:
+                candidates.append(src)
+
+        return candidates[:limit]
+
+    async def download_media_batch(self, media_urls):
+        """Параллельное скачивание нескольких медиафайлов"""
+        paths = await gather_blocking(self.download_media, media_urls)
+        return [path for path in paths if path]
+
+    def download_media(self, media_url):
+        """Скачивание изображения во временный файл"""
+        try:
+            if not media_url:
+                return None
+
+            logger.info(f"Downloading image: {media_url}")
+
+            response = self.http.get(media_url, headers=self.headers, timeout=30)
+            response.raise_for_status()
+
+            # Проверяем, что это изображение
+            content_type = response.headers.get('content-type', '')
+            if not content_type.startswith('image/'):
+                logger.warning(f"URL does not point to an image: {content_type}")
+                return None
+
+            # Определяем расширение файла
+            ext = self.get_image_extension(content_type, media_url)
+
+            # Создаем временный файл
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
+            temp_file.write(response.content)
+            temp_file.close()
+
+            logger.info(f"Image downloaded to: {temp_file.name}")
+            return temp_file.name
+
+        except Exception as e:
+            logger.error(f"Error downloading image: {e}")
+            return None
+
+    def get_image_extension(self, content_type, url):
+        """Определение расширения файла изображения"""
+        # По content-type
+        if 'jpeg' in content_type or 'jpg' in content_type:
+            return '.jpg'
+        elif 'png' in content_type:
+            return '.png'
+        elif 'gif' in content_type:
+            return '.gif'
+        elif 'webp' in content_type:
+            return '.webp'
+
+        # По URL
+        path = urlparse(url).path.lower()
+        if path.endswith('.jpg') or path.endswith('.jpeg'):
+            return '.jpg'
+        elif path.endswith('.png'):
+            return '.png'
+        elif path.endswith('.gif'):
+            return '.gif'
+        elif path.endswith('.webp'):
+            return '.webp'
+
+        # По умолчанию
+        return '.jpg'
+
+    # --- Публикация и архив ---
+
+    def convert_markdown_to_html(self, text):
+        """Конвертация Markdown разметки в HTML для Telegram"""
+        return convert_markdown_to_html(text)
+
+    async def publish_to_telegram(self, post_content, media_path=None, targets=None, album_paths=None,
+                                  file_id=None):
+        """Публикация поста во все Telegram каналы с медиафайлом или альбомом
+
+        file_id - медиафайл, загруженный заранее (для него не нужна повторная загрузка).
+        True - опубликовано везде, False - есть каналы с ошибкой (self.failed_channels),
+        "RECREATE_POST" - подпись слишком длинная, пост нужно сократить.
+        """
+        targets = self.channel_targets if targets is None else targets
+        try:
+            logger.info(f"Publishing post to Telegram channels: {', '.join(str(t.chat_id) for t in targets)}")
+
+            # Конвертируем Markdown в HTML
+            html_content = self.convert_markdown_to_html(post_content)
+
+            if album_paths and len(album_paths) > 1:
+                # Один неподходящий файл ломает весь send_media_group: такие файлы отбрасываем
+                album_paths = [path for path in self.valid_media_paths(album_paths)
+                               if media_type_for(path) == 'photo']
+                if media_path not in album_paths:
+                    media_path = album_paths[0] if album_paths else None
+
+            media_type = 'photo'
+            if album_paths and len(album_paths) > 1:
+                # Альбом: один вызов send_media_group, подпись на первом изображении
+                # (обрезается в публикаторе с учетом префикса и суффикса каждого канала)
+                logger.info(f"Publishing post as album with {len(album_paths)} images")
+                media_type = 'album'
+            elif media_path and os.path.exists(media_path):
+                if media_path.lower().endswith('.gif'):
+                    # Для GIF используем sendAnimation; подпись до 1024 символов обрезает публикатор
+                    logger.info(f"Publishing GIF animation: {media_path}")
+                    media_type = 'animation'
+                else:
+                    logger.info(f"Publishing post with image: {media_path}")
+            else:
+                logger.info("Publishing post without media")
+
+            # Одна загрузка медиафайла, параллельная рассылка по каналам
+            if media_type == 'album':
+                results = await self.publisher.publish_album(html_content, album_paths, targets)
+            else:
+                results = await self.publisher.publish(html_content, media_path, media_type, targets,
+                                                       file_id=file_id)
+            self.failed_channels = [t for t in targets if results.get(t.chat_id, True) is not None]
+            logger.info(f"Telegram send queue stats: {self.send_queue.stats()}")
+
+            if not self.failed_channels:
+                logger.info("Successfully published post to Telegram")
+                return True
+
+            logger.error(f"Failed to publish to channels: {', '.join(str(t.chat_id) for t in self.failed_channels)}")
+
+            # Если ошибка связана с длиной подписи, пересоздаем пост
+            if any("caption is too long" in str(results.get(t.chat_id)).lower() for t in self.failed_channels):
+                logger.warning("Caption too long, recreating post with shorter content...")
+                return "RECREATE_POST"
+
+            return False
+
+        except Exception as e:
+            logger.error(f"Error publishing to Telegram: {e}")
+            self.failed_channels = list(targets)
+            return False
+
+    def archive_entry(self, article, post_content, media_url=None, article_content=None):
+        """Запись архива (record, saved_at, content) в формате старых JSON файлов источника"""
+        saved_at = datetime.now()
+
+        # Даты (например, parsed_date) сохраняем строкой ISO
+        article_copy = {key: value.isoformat() if isinstance(value, (date, datetime)) else value
+                        for key, value in article.items()}
+
+        data = {
+            'timestamp': saved_at.strftime("%Y%m%d_%H%M%S"),
+            'article': article_copy,
+            'post_content': post_content,
+            self.archive_media_key: media_url,
+            'published': True
+        }
+        return data, saved_at.isoformat(), article_content
+
+    def save_article_data(self, article, post_content, media_url=None, article_content=None):
+        """Сохранение данных о статье для архива (текст статьи попадает в поисковый индекс)"""
+        try:
+            article_id = self.archive.add(self.source_name,
+                                          *self.archive_entry(article, post_content, media_url, article_content))
+            logger.info(f"Article data saved to archive (id {article_id})")
+
+        except Exception as e:
+            logger.error(f"Error saving article data: {e}")
+
+    def record_published(self, items):
+        """Учет опубликованных статей одной пачкой: URL, отпечатки историй, архив, контрольные точки"""
+        articles = [item['article'] for item in items]
+        self.published_urls.add_many([article['link'] for article in articles])
+        self.near_duplicates.add_many([(article['link'], self.source_name, article['title'],
+                                        self.story_fingerprint(article)) for article in articles])
+        logger.info(f"Added {len(articles)} URLs to published list")
+        try:
+            ids = self.archive.add_many(self.source_name, [
+                self.archive_entry(item['article'], item['post_content'], item['media_url'], item['content'])
+                for item in items
+            ])
+            logger.info(f"Article data saved to archive (ids {ids})")
+        except Exception as e:
+            logger.error(f"Error saving article data: {e}")
+        for article in articles:
+            self.checkpoints.clear(self.source_name, article['link'])
+
+    @staticmethod
+    def remove_media_files(paths):
+        """Удаление временных медиафайлов"""
+        for path in paths:
+            try:
+                if os.path.exists(path):
+                    os.unlink(path)
+                    logger.info("Temporary media file deleted")
+            except Exception as e:
+                logger.warning(f"Could not delete temporary media file: {e}")
+
+    # --- Конвейер ---
+
+    async def publish_with_retries(self, post_content, media_path, media_paths, article, article_content,
+                                   file_id=None):
+        """Публикация с повтором для каналов с ошибкой и сокращением слишком длинного поста
+
+        Возвращает (результат последней попытки, итоговый текст поста).
+        """
+        recreate_count = 0
+        publish_attempt = 1
+        targets = None
+
+        while True:
+            success = await self.publish_to_telegram(post_content, media_path, targets, media_paths, file_id)
+            targets = self.failed_channels
+
+            if success is True:
+                return success, post_content
+            if success == "RECREATE_POST" and recreate_count < MAX_RECREATE_ATTEMPTS:
+                recreate_count += 1
+                logger.info(f"Recreating post (attempt {recreate_count}/{MAX_RECREATE_ATTEMPTS})")
+                shorter = await run_blocking(self.create_short_post, article['title'], article_content,
+                                             article['link'])
+                if not shorter:
+                    return False, post_content
+                post_content = shorter
+                continue
+            if success == "RECREATE_POST":
+                logger.error(f"Failed to publish after {MAX_RECREATE_ATTEMPTS} attempts")
+                return success, post_content
+            if publish_attempt < self.publish_attempts:
+                publish_attempt += 1
+                logger.info(f"Retrying failed channels (attempt {publish_attempt}/{self.publish_attempts})")
+                continue
+            return success, post_content
+
+    def select_articles(self, articles):
+        """Статьи для публикации в этом запуске: max_posts лучших по мнению AI, затем запасные"""
+        return self.rank_articles(articles, self.max_posts + self.shortlist_size - 1)
+
+    def build_pipeline(self, prepare_ahead=False):
+        """Этапы подготовки и публикации статьи; лимиты - PIPELINE_<ЭТАП>_CONCURRENCY
+
+        prepare_ahead - вместо публикации пост помещается в очередь готовых (этап render).
+        """
+        if prepare_ahead:
+            last_stage = Stage.from_env('render', self.stage_render, concurrency=2)
+        else:
+            # Публикация последовательная: failed_channels и порядок постов в канале
+            last_stage = Stage('publish', self.stage_publish, concurrency=1)
+        return Pipeline([
+            Stage.from_env('scrape', self.stage_scrape, concurrency=4),
+            # Время подготовки - max(скачивание, ответ модели), а не их сумма
+            Stage.from_env('prepare', self.stage_prepare, concurrency=2),
+            last_stage,
+        ], name=f"{self.display_name} pipeline")
+
+    async def stage_scrape(self, item):
+        """Скрапинг содержимого статьи и ссылок на медиафайлы (при сбое - переход на запасную)"""
+        if item.get('content'):
+            return item
+        article_data = await run_blocking(self.scrape_article, item['article']['link'])
+        while not article_data['content']:
+            logger.error(f"Failed to scrape article content: {item['article']['link']}")
+            backup, article_data = await item['backups'].take()
+            if backup is None:
+                return None
+            logger.info(f"Switching to backup article: {backup['title']}")
+            item['article'] = backup
+        item.update(article_data)
+        self.checkpoints.save(self.source_name, item, 'scrape')
+        return item
+
+    async def prepare_media(self, item):
+        """Скачивание медиафайлов (уже скачанные в прошлом запуске используются повторно)"""
+        if not item['media_paths']:
+            item['media_paths'] = await self.download_media_batch(item['media_urls'][:self.album_max_items])
+            if item['media_url'] and not item['media_paths']:
+                logger.warning("Failed to download media, will publish without it")
+
+    async def prepare_post(self, item):
+        """Создание вирального поста с помощью AI (если его нет в контрольной точке)"""
+        if not item.get('post_content'):
+            article = item['article']
+            item['post_content'] = await run_blocking(
+                self.create_viral_post, article['title'], item['content'], article['link'], article.get('topic'))
+
+    async def stage_prepare(self, item):
+        """Скачивание медиафайлов и создание поста с AI одновременно: они не зависят друг от друга"""
+        if item.get('stage') == READY_STAGE:
+            return await self.revalidate_ready(item)
+        if item.get('stage') == 'prepare' and item['post_content']:
+            await self.prepare_media(item)
+            return item
+        await asyncio.gather(self.prepare_media(item), self.prepare_post(item))
+        if not item['post_content']:
+            logger.error("Failed to create viral post")
+            return None
+        self.checkpoints.save(self.source_name, item, 'prepare')
+        return item
+
+    def valid_media_paths(self, paths):
+        """Медиафайлы, которые Telegram примет; остальные удаляются"""
+        valid = []
+        for path in paths:
+            error = validate_media(path)
+            if error:
+                logger.warning(f"Dropping media file {path}: {error}")
+                self.remove_media_files([path])
+            else:
+                valid.append(path)
+        return valid
+
+    def caption_too_long(self, post_content, media_paths):
+        """Не поместится ли пост в подпись к фото (GIF и альбомы обрезаются при публикации)"""
+        if len(media_paths) != 1 or media_type_for(media_paths[0]) != 'photo':
+            return False
+        html_content = self.convert_markdown_to_html(post_content)
+        return any(truncate_html_message(caption) != caption
+                   for caption in (target.render(html_content) for target in self.channel_targets))
+
+    async def upload_ahead(self, media_paths):
+        """Загрузка медиафайла в служебный чат (TELEGRAM_STAGING_CHAT_ID), file_id или None"""
+        if not self.staging_chat_id or len(media_paths) != 1:
+            return None
+        try:
+            return await self.publisher.upload_media(self.staging_chat_id, media_paths[0],
+                                                     media_type_for(media_paths[0]))
+        except Exception as e:
+            logger.warning(f"Could not upload media ahead of publishing: {e}")
+            return None
+
+    async def stage_render(self, item):
+        """Подготовка поста к мгновенной публикации: проверка медиа, длина подписи, загрузка файла
+
+        Готовый пост сохраняется в контрольной точке этапа ready - очереди готовых постов.
+        """
+        article = item['article']
+        item['media_paths'] = self.valid_media_paths(item['media_paths'])
+
+        # Слишком длинная подпись сокращается сейчас, а не в момент публикации
+        recreate_count = 0
+        while self.caption_too_long(item['post_content'], item['media_paths']) \
+                and recreate_count < MAX_RECREATE_ATTEMPTS:
+            recreate_count += 1
+            logger.info(f"Caption too long, recreating post (attempt {recreate_count}/{MAX_RECREATE_ATTEMPTS})")
+            shorter = await run_blocking(self.create_short_post, article['title'], item['content'], article['link'])
+            if not shorter:
+                break
+            item['post_content'] = shorter
+
+        item['file_id'] = await self.upload_ahead(item['media_paths'])
+        item['prepared_at'] = datetime.now().isoformat()
+        self.checkpoints.save(self.source_name, item, READY_STAGE)
+        logger.info(f"Post is ready for publishing: {article['title']}")
+        return item
+
+    def article_available(self, article_url):
+        """Не удалена ли статья с сайта (при ошибке сети считаем, что доступна)"""
+        try:
+            response = self.http.head(article_url, headers=self.headers, timeout=10, allow_redirects=True)
+        except Exception as e:
+            logger.warning(f"Could not check article availability: {e}")
+            return True
+        return response.status_code not in GONE_STATUS_CODES
+
+    async def revalidate_ready(self, item):
+        """Проверка готового поста перед публикацией
+
+        Пост старше ready_max_age_hours удаляется из очереди, если статья пропала с сайта.
+        Удаленные вручную медиафайлы скачиваются заново (file_id без файла не используется).
+        """
+        article = item['article']
+        prepared_at = datetime.fromisoformat(item['prepared_at'])
+        if (datetime.now() - prepared_at).total_seconds() > self.ready_max_age_hours * 3600:
+            logger.info(f"Revalidating stale ready post: {article['title']}")
+            if not await run_blocking(self.article_available, article['link']):
+                logger.warning(f"Article is no longer available, ready post expired: {article['title']}")
+                self.checkpoints.clear(self.source_name, article['link'])
+                return None
+        if not item['media_paths']:
+            item['file_id'] = None
+            await self.prepare_media(item)
+            item['media_paths'] = self.valid_media_paths(item['media_paths'])
+        return item
+
+    async def wait_post_spacing(self):
+        """Пауза POST_SPACING_SECONDS после прошлого поста"""
+        delay = self.next_post_at - time.monotonic()
+        if delay > 0:
+            logger.info(f"Waiting {delay:.0f}s before the next post")
+            await asyncio.sleep(delay)
+
+    async def stage_publish(self, item):
+        """Публикация в Telegram (повторяем только для каналов с ошибкой) с паузой между постами"""
+        await self.wait_post_spacing()
+
+        article = item['article']
+        media_paths = item['media_paths']
+        success, item['post_content'] = await self.publish_with_retries(
+            item['post_content'], media_paths[0] if media_paths else None, media_paths, article, item['content'],
+            item.get('file_id'))
+        if success == "RECREATE_POST" or len(self.failed_channels) == len(self.channel_targets):
+            logger.error("Failed to publish to Telegram, the prepared post is kept for the next run")
+            return None
+        if success is not True:
+            logger.warning("Post was not delivered to some channels, marking as published anyway")
+        self.next_post_at = time.monotonic() + self.post_spacing
+
+        # Учет пишется пачкой в конце запуска; отметка в контрольной точке не даст
+        # опубликовать пост повторно, если процесс завершится раньше
+        self.checkpoints.save(self.source_name, item, 'publish')
+        return item
+
+    def resume_items(self):
+        """Статьи прошлых запусков с незавершенной публикацией (из контрольных точек)
+
+        Сначала идут готовые посты (этап ready) в порядке подготовки.
+        """
+        self.checkpoints.gc()
+        items = []
+        unrecorded = []
+        for item in self.checkpoints.pending(self.source_name):
+            article = item['article']
+            if self.is_url_published(article['link']):
+                self.checkpoints.clear(self.source_name, article['link'])
+            elif item['stage'] == 'publish':
+                unrecorded.append(item)
+            elif not self.filter_near_duplicates([article]):
+                # Пока пост ждал, эту историю опубликовал другой источник
+                self.checkpoints.clear(self.source_name, article['link'])
+            elif self.reserve_story(article):
+                logger.info(f"Resuming article after '{item['stage']}' stage: {article['title']}")
+                items.append(dict(item, reserved=[article], backups=BackupPool(self, [])))
+        if unrecorded:
+            logger.warning(f"Recording {len(unrecorded)} posts published by an interrupted run")
+            self.record_published(unrecorded)
+        items.sort(key=lambda item: item['stage'] != READY_STAGE)
+        return items
+
+    def release_items(self, items):
+        """Снятие резерва с продолженных статей, которые не участвуют в этом запуске"""
+        for item in items:
+            for article in item['reserved']:
+                self.release_story(article)
+
+    async def select_items(self, count):
+        """Поиск, фильтрация и выбор до count статей: элементы конвейера с зарезервированными статьями"""
+        # 1. Поиск свежих статей источника
+        articles = await run_blocking(self.fetch_articles)
+        if not articles:
+            logger.error(f"No articles found on {self.display_name}")
+            return []
+
+        # 2. Фильтрация уже опубликованных статей
+        unpublished_articles = self.filter_unpublished_articles(articles)
+        if not unpublished_articles:
+            logger.warning("All articles have already been published")
+            return []
+
+        # Исключаем истории, которые уже вышли под другим URL или у другого источника
+        unpublished_articles = self.filter_near_duplicates(unpublished_articles)
+        if not unpublished_articles:
+            logger.warning("All unpublished articles duplicate already published stories")
+            return []
+
+        # 3. Выбор статей с помощью AI
+        selected_articles = await run_blocking(self.select_articles, unpublished_articles)
+        if not selected_articles:
+            logger.error("No suitable article selected")
+            return []
+
+        # Резерв историй: другой источник этого процесса не возьмет их, пока идет публикация
+        items = []
+        while selected_articles and len(items) < count:
+            article = selected_articles.pop(0)
+            if self.reserve_story(article):
+                items.append({'article': article, 'media_paths': [], 'reserved': [article]})
+            else:
+                logger.warning(f"Story is already being published: {article['title']}")
+
+        # Оставшиеся статьи списка - общий запас для всех выбранных
+        backups = BackupPool(self, selected_articles)
+        for item in items:
+            item['backups'] = backups
+        return items
+
+    async def run_daily_scraping(self, prepare_ahead=False, ready_only=False):
+        """Основной метод для запуска ежедневного скраппинга
+
+        prepare_ahead - подготовить посты заранее (очередь готовых) без публикации,
+        ready_only - только опубликовать готовые посты: без поиска, выбора и запросов к модели.
+        """
+        logger.info(f"Starting daily {self.display_name} scraping process")
+        self.start_run()
+
+        items = []
+
+        try:
+            # Незавершенные статьи прошлых запусков продолжаются без повторного поиска и выбора
+            items = self.resume_items()
+            wanted = self.max_posts
+            ready_count = sum(item['stage'] == READY_STAGE for item in items)
+            if ready_only:
+                count = min(ready_count, self.max_posts)
+                self.release_items(items[count:])
+                items = items[:count]
+                wanted = 0
+            elif prepare_ahead:
+                # Готовые посты уже в очереди: готовим только недостающие
+                self.release_items(items[:ready_count])
+                items = items[ready_count:]
+                wanted -= ready_count
+            if len(items) < wanted:
+                items += await self.select_items(wanted - len(items))
+            if not items:
+                if prepare_ahead and wanted <= 0:
+                    logger.info("Ready queue is already full")
+                    return True
+                return False
+
+            # 4. Скрапинг, медиафайлы, пост и публикация - этапы конвейера
+            for item in items:
+                item['backups'].prefetch()
+            published = await self.build_pipeline(prepare_ahead).run(items)
+            if not published:
+                return False
+            if prepare_ahead:
+                logger.info(f"{len(published)} posts are ready for publishing")
+                return True
+
+            # 5. Учет опубликованного одной пачкой
+            self.record_published(published)
+
+            logger.info(f"Daily {self.display_name} scraping process completed successfully "
+                        f"({len(published)} of {len(items)} posts published)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in daily scraping process: {e}")
+            return False
+        finally:
+            # Удаляем временные файлы (кроме сохраненных в контрольных точках) и снимаем резервы
+            for item in items:
+                item['backups'].cancel()
+                self.remove_media_files([path for path in item['media_paths'] if not self.checkpoints.holds(path)])
+                for article in item['reserved'] + item['backups'].reserved:
+                    self.release_story(article)
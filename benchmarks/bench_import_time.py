@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк времени старта: импорт скраперов и утилит управления
+Import-time profile (python -X importtime) and cold-start budget per entry point
+"""
+
+import sys
+import os
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модуль -> бюджет холодного импорта (мс): запуск без новых статей и CLI не должны
+# тянуть openai, telegram, bs4 и PIL
+IMPORT_BUDGET_MS = {
+    'manage_state': 60,
+    'manage_archive': 60,
+    'manage_published_urls': 60,
+    'manage_ieee_urls': 60,
+    'techcrunch_scraper': 300,
+    'ieee_spectrum_scraper': 300,
+    'run_daemon': 300,
+}
+# Зависимости, которые должны импортироваться только на нужном этапе
+DEFERRED_PACKAGES = ('openai', 'telegram', 'bs4', 'PIL', 'httpx')
+REPEATS = 5
+TOP_PACKAGES = 8
+
+
+def profile_import(module):
+    """Разбор вывода -X importtime: {пакет верхнего уровня: собственное время модулей, мкс}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        # Собственное время не учитывает вложенные импорты, поэтому суммы не пересекаются
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages
+
+
+def wall_time_ms(module):
+    """Медиана времени импорта модуля в новом интерпретаторе (мс)"""
+    times = []
+    for _ in range(REPEATS):
+        code = f'import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)'
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        times.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    """Главная функция"""
+    print("⏱️ Бенчмарк времени импорта")
+    print("=" * 60)
+    over_budget = []
+    for module, budget in IMPORT_BUDGET_MS.items():
+        packages = profile_import(module)
+        elapsed = wall_time_ms(module)
+        deferred = sorted(p for p in packages if p in DEFERRED_PACKAGES)
+        status = '✅' if elapsed <= budget and not deferred else '⚠️ '
+        if status != '✅':
+            over_budget.append(module)
+        print(f"{status} {module:24} {elapsed:7.1f} мс (бюджет {budget} мс)")
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:TOP_PACKAGES]
+        print("      " + ", ".join(f"{name} {us / 1000:.0f}" for name, us in heaviest if us >= 1000))
+        if deferred:
+            print(f"      ❗ Импортированы при старте: {', '.join(deferred)}")
+    if over_budget:
+        print(f"\n⚠️  Вне бюджета: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\n🎉 Все модули укладываются в бюджет")
+
+
+if __name__ == "__main__":
+    main()
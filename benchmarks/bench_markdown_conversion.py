@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк конвертации Markdown в HTML для Telegram
+Micro-benchmark: legacy regex/replace chain vs single-pass tokenizer
+"""
+
+import sys
+import os
+import re
+import timeit
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_html import convert_markdown_to_html
+
+SAMPLE_POST = """
+🚀 **Новая технология AI** революционизирует индустрию!
+
+*Исследователи* из __ведущих университетов__ разработали ~~устаревший подход~~ и создали `инновационное решение`.
+
+Подробнее: [Читать статью](https://spectrum.ieee.org/article/123?utm_source=tg&utm_medium=post)
+
+**Ключевые особенности:**
+• Высокая производительность & низкие задержки
+• Низкое энергопотребление (< 5 Вт)
+• Простота использования
+
+#AI #Robotics #Tech
+"""
+
+
+def legacy_convert_markdown_to_html(text):
+    """Прежняя реализация: 6 regex-замен и цепочка str.replace"""
+    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
+    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
+    text = re.sub(r'__(.*?)__', r'<u>\1</u>', text)
+    text = re.sub(r'~~(.*?)~~', r'<s>\1</s>', text)
+    text = re.sub(r'`(.*?)`', r'<code>\1</code>', text)
+    text = text.replace('&', '&amp;')
+    text = text.replace('&amp;lt;b&amp;gt;', '<b>').replace('&amp;lt;/b&amp;gt;', '</b>')
+    text = text.replace('&amp;lt;i&amp;gt;', '<i>').replace('&amp;lt;/i&amp;gt;', '</i>')
+    text = text.replace('&amp;lt;u&amp;gt;', '<u>').replace('&amp;lt;/u&amp;gt;', '</u>')
+    text = text.replace('&amp;lt;s&amp;gt;', '<s>').replace('&amp;lt;/s&amp;gt;', '</s>')
+    text = text.replace('&amp;lt;code&amp;gt;', '<code>').replace('&amp;lt;/code&amp;gt;', '</code>')
+    text = text.replace('&amp;lt;a href=&amp;quot;', '<a href="').replace('&amp;lt;/a&amp;gt;', '</a>')
+    text = text.replace('&amp;quot;&amp;gt;', '">')
+    return text
+
+
+def bench(func, text, number):
+    """Лучшее время одного вызова (мкс) из нескольких повторов"""
+    best = min(timeit.repeat(lambda: func(text), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    """Главная функция"""
+    print("⏱️ Бенчмарк конвертации Markdown -> HTML")
+    print("=" * 60)
+
+    for label, text, number in [
+        ('post (~500 симв.)', SAMPLE_POST, 2000),
+        ('long (~50K симв.)', SAMPLE_POST * 100, 20),
+    ]:
+        legacy = bench(legacy_convert_markdown_to_html, text, number)
+        single_pass = bench(convert_markdown_to_html, text, number)
+        print(f"{label:20} legacy: {legacy:10.1f} мкс   single-pass: {single_pass:10.1f} мкс   "
+              f"x{legacy / single_pass:.2f}")
+
+
+if __name__ == "__main__":
+    main()
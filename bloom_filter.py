@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Bloom Filter
+Сохраняемый на диск фильтр Блума (через mmap) перед хранилищем опубликованных URL
+"""
+
+import os
+import math
+import mmap
+import time
+import struct
+import tempfile
+
+MAGIC = b'BLM1'
+# magic, число бит, число хеш-функций, емкость, число элементов, вероятность ложного срабатывания
+HEADER = struct.Struct('<4sQIQQd')
+COUNT_OFFSET = struct.calcsize('<4sQIQ')
+MASK64 = (1 << 64) - 1
+# Windows: файл, который отображен в память другим процессом, заменить нельзя, пока тот его не закроет
+REPLACE_ATTEMPTS = 20
+REPLACE_RETRY_SECONDS = 0.05
+
+
+def _mix64(value):
+    """Финализатор splitmix64: второй независимый хеш из первого"""
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & MASK64
+    return value ^ (value >> 31)
+
+
+def optimal_parameters(capacity, fp_rate):
+    """Размер битового массива и число хеш-функций для заданной емкости и FP"""
+    capacity = max(1, capacity)
+    num_bits = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+    num_bits = max(64, (num_bits + 7) // 8 * 8)
+    num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+    return num_bits, num_hashes
+
+
+class BloomFilter:
+    """Фильтр Блума по 64-битным ключам (хешам канонических URL)
+
+    "Нет" - точный ответ, "да" - с вероятностью ложного срабатывания fp_rate,
+    поэтому положительный ответ нужно подтверждать в основном хранилище.
+    Файл отображается в память, так что при старте ничего не загружается целиком.
+    """
+
+    def __init__(self, path, file, mm):
+        self.path = path
+        self.file = file
+        self.mm = mm
+        magic, self.num_bits, self.num_hashes, self.capacity, _, self.fp_rate = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a bloom filter file: {path}")
+        self.inode = os.fstat(file.fileno()).st_ino
+
+    @classmethod
+    def create(cls, path, capacity, fp_rate, keys=(), current=None):
+        """Создание нового фильтра с атомарной заменой файла
+
+        current - открытый фильтр этого файла: Windows не заменяет файл, отображенный в память,
+        поэтому он закрывается перед заменой (новый файл открывается после нее).
+        OSError - файл не удалось заменить, current при этом уже закрыт.
+        """
+        num_bits, num_hashes = optimal_parameters(capacity, fp_rate)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                        prefix=os.path.basename(path) + '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, num_bits, num_hashes, capacity, 0, fp_rate))
+            f.truncate(HEADER.size + num_bits // 8)
+
+        bloom = cls.open(tmp_path)
+        count = 0
+        for key in keys:
+            bloom.add(key)
+            count += 1
+        bloom.count = count
+        bloom.flush()
+        bloom.close()
+
+        if current is not None:
+            current.close()
+        try:
+            _replace_file(tmp_path, path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        """Открытие существующего фильтра, None если файла нет или он поврежден"""
+        try:
+            f = open(path, 'r+b')
+        except OSError:
+            return None
+        try:
+            mm = mmap.mmap(f.fileno(), 0)
+            bloom = cls(path, f, mm)
+            if len(mm) != HEADER.size + bloom.num_bits // 8:
+                raise ValueError(f"Truncated bloom filter file: {path}")
+            return bloom
+        except (ValueError, OSError, struct.error):
+            f.close()
+            return None
+
+    @property
+    def count(self):
+        return struct.unpack_from('<Q', self.mm, COUNT_OFFSET)[0]
+
+    @count.setter
+    def count(self, value):
+        struct.pack_into('<Q', self.mm, COUNT_OFFSET, max(0, value))
+
+    def _positions(self, key):
+        h1 = key & MASK64
+        h2 = _mix64(h1) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key):
+        mm = self.mm
+        for position in self._positions(key):
+            index = HEADER.size + (position >> 3)
+            mm[index] = mm[index] | (1 << (position & 7))
+
+    def __contains__(self, key):
+        mm = self.mm
+        for position in self._positions(key):
+            if not mm[HEADER.size + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def is_current(self):
+        """Проверка, что файл не был пересоздан другим процессом"""
+        try:
+            return os.stat(self.path).st_ino == self.inode
+        except OSError:
+            return False
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        if not self.mm.closed:
+            self.mm.close()
+        self.file.close()
+
+
+def _replace_file(src, dst):
+    """os.replace с повтором, пока другой процесс закрывает отображение файла (Windows)"""
+    for attempt in range(1, REPLACE_ATTEMPTS + 1):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_ATTEMPTS:
+                raise
+            time.sleep(REPLACE_RETRY_SECONDS)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Checkpoints
+Контрольные точки подготовки постов: текст статьи, скачанные медиафайлы и созданный пост
+сохраняются по URL статьи, чтобы повторный запуск продолжил с первого незавершенного этапа
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_HOURS = 24
+# Этап готового к публикации поста: очередь постов, подготовленных заранее
+READY_STAGE = 'ready'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_checkpoints (
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (source, url)
+);
+CREATE INDEX IF NOT EXISTS idx_run_checkpoints_updated ON run_checkpoints (updated_at);
+"""
+
+# Поля элемента конвейера, которые сохраняются в контрольной точке
+CHECKPOINT_FIELDS = ('article', 'content', 'media_url', 'media_urls', 'media_paths', 'post_content',
+                     'file_id', 'prepared_at')
+
+
+class RunCheckpoints:
+    """Контрольные точки всех источников в общей базе состояния
+
+    Медиафайлы переносятся из временной папки в media_dir и удаляются вместе с точкой:
+    после публикации, при сборке мусора (старше ttl_hours) или при ручной очистке.
+    """
+
+    def __init__(self, store, media_dir=None, ttl_hours=None):
+        self.store = store
+        self.media_dir = media_dir or os.getenv('CHECKPOINT_DIR') or store.db_path + '.checkpoints'
+        self.ttl_hours = ttl_hours if ttl_hours is not None else \
+            float(os.getenv('CHECKPOINT_TTL_HOURS', DEFAULT_TTL_HOURS))
+        with self.store.lock, self.store.conn:
+            self.store.conn.executescript(SCHEMA)
+
+    def holds(self, path):
+        """Принадлежит ли файл контрольной точке (такие файлы не удаляются в конце запуска)"""
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.media_dir)
+
+    def _keep_media(self, url, paths):
+        """Перенос медиафайлов элемента в папку контрольных точек"""
+        os.makedirs(self.media_dir, exist_ok=True)
+        prefix = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        kept = []
+        for index, path in enumerate(paths):
+            if not self.holds(path):
+                target = os.path.join(self.media_dir, f"{prefix}_{index}{os.path.splitext(path)[1]}")
+                shutil.move(path, target)
+                path = target
+            kept.append(path)
+        return kept
+
+    def save(self, source, item, stage):
+        """Сохранение элемента после завершенного этапа stage"""
+        url = item['article']['link']
+        if item.get('media_paths'):
+            item['media_paths'] = self._keep_media(url, item['media_paths'])
+        data = json.dumps({field: item[field] for field in CHECKPOINT_FIELDS if field in item},
+                          ensure_ascii=False, default=str)
+        self.store.execute(
+            'INSERT OR REPLACE INTO run_checkpoints (source, url, stage, data, updated_at) VALUES (?, ?, ?, ?, ?)',
+            (source, url, stage, data, datetime.now().isoformat())
+        )
+        item['stage'] = stage
+        logger.info(f"Checkpoint saved after '{stage}': {url}")
+
+    def pending(self, source):
+        """Незавершенные элементы источника (старые сначала) с полем stage"""
+        items = []
+        rows = self.store.query(
+            'SELECT stage, data FROM run_checkpoints WHERE source = ? AND updated_at >= ? ORDER BY updated_at',
+            (source, self._expires_before())
+        )
+        for stage, data in rows:
+            item = json.loads(data)
+            item['stage'] = stage
+            # Медиафайлы могли удалить вручную: тогда они будут скачаны заново
+            item['media_paths'] = [path for path in item.get('media_paths', []) if os.path.exists(path)]
+            items.append(item)
+        return items
+
+    def clear(self, source, url):
+        """Удаление точки и ее медиафайлов (статья опубликована или больше не нужна)"""
+        rows = self.store.query('SELECT data FROM run_checkpoints WHERE source = ? AND url = ?', (source, url))
+        self.store.execute('DELETE FROM run_checkpoints WHERE source = ? AND url = ?', (source, url))
+        for (data,) in rows:
+            self._remove_media(json.loads(data).get('media_paths', []))
+
+    def gc(self):
+        """Удаление устаревших точек, возвращает их количество"""
+        expires_before = self._expires_before()
+        rows = self.store.query('SELECT data FROM run_checkpoints WHERE updated_at < ?', (expires_before,))
+        if not rows:
+            return 0
+        self.store.execute('DELETE FROM run_checkpoints WHERE updated_at < ?', (expires_before,))
+        for (data,) in rows:
+            self._remove_media(json.loads(data).get('media_paths', []))
+        logger.info(f"Removed {len(rows)} stale checkpoints")
+        return len(rows)
+
+    def _expires_before(self):
+        return (datetime.now() - timedelta(hours=self.ttl_hours)).isoformat()
+
+    @staticmethod
+    def _remove_media(paths):
+        for path in paths:
+            try:
+                if os.path.exists(path):
+                    os.unlink(path)
+            except OSError as e:
+                logger.warning(f"Could not delete checkpoint media file {path}: {e}")
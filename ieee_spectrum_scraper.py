@@ -6,20 +6,13 @@ IEEE Spectrum Auto Scraper and Telegram Publisher
 
 import os
 import logging
-import requests
-import feedparser
-from datetime import datetime, date
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
-from openai import OpenAI
+from datetime import date, timedelta
 import asyncio
-from telegram import Bot
-import json
-import time
 import tempfile
 from urllib.parse import urljoin, urlparse
 import sys
 import re
+from base_scraper import BaseNewsScraper, register_source
 
 # Настройка логирования
 logging.basicConfig(
@@ -32,20 +25,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class IEEESpectrumScraper:
-    def __init__(self):
-        load_dotenv()
-        
-        # Конфигурация OpenRouter
-        self.openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
-        self.openrouter_base_url = os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
-        self.ai_model = os.getenv('AI_MODEL', 'google/gemini-pro')
-        self.max_tokens = int(os.getenv('MAX_TOKENS', '4000'))
-        self.temperature = float(os.getenv('TEMPERATURE', '0.7'))
-        
-        # Конфигурация Telegram
-        self.telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
-        self.telegram_channel = os.getenv('TELEGRAM_CHANNEL_ID')
+# Сколько страниц списка темы листать при загрузке архива за прошедшие дни
+ARCHIVE_MAX_PAGES = 30
+
+@register_source
+class IEEESpectrumScraper(BaseNewsScraper):
+    source_name = 'ieee_spectrum'
+    display_name = 'IEEE Spectrum'
+    published_urls_file = 'ieee_published_urls.json'
+    json_folder = 'ieee_articles_archive'
+    summary_field = 'description'
+    archive_media_key = 'media_url'
+    
+    # Заголовки для запросов
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'image/gif,*/*',
+        'Accept-Encoding': 'identity',
+        'Accept-Language': 'en-US,en;q=0.9'
+    }
+    
+    SELECTION_PROMPT = """
+            Ты эксперт по технологиям и контенту. Из следующего списка статей с IEEE Spectrum (AI и Robotics) выбери ОДНУ самую интересную и виральную статью для публикации в Telegram канале об AI и robotics технологиях.
+
+            Критерии выбора:
+            - Потенциал виральности
+            - Интерес для широкой аудитории
+            - Технологическая значимость
+
+            Статьи:
+            {articles}
+
+            Ответь ТОЛЬКО номерами статей через запятую: сначала выбранная, затем до {backups} запасных по убыванию интереса (например: 3, 1, 7). Если ни одна статья не подходит, ответь "0".
+            """
+    POST_PROMPT = """
+            Создай на основе этой статьи для Telegram канала об AI и Robotics технологиях виральный пост длинной длинной от 700 до 1024 символов(включая теги), вопрос в конце поста не нужен, количество тегов ограничить 5. Стиль информативный. Используй разметку, отступы и эmоджи. Перепроверь в конце количество символов, получившеся подписи, от 700 до 1024(включая теги). Вывести только сам пост.
+
+            Заголовок статьи: {title}
+            
+            Содержание статьи: {content}
+            """
+    SHORT_POST_PROMPT = """
+                    Создай на основе этой статьи для Telegram канала об AI и Robotics технологиях очень короткий виральный пост длинной от 700 до 1000 символов(включая теги), вопрос в конце поста не нужен, количество тегов ограничить 3. Стиль поста информативный, полезный. Используй разметку, отступы и эmоджи(красивее когда эмоджи начинают новый абзац). Перепроверь в конце количество символов, получившейся подписи, от 500 до 1000(включая теги). Вывести только сам пост.
+
+                    Заголовок статьи: {title}
+                    
+                    Содержание статьи: {content}
+                    """
+    
+    def __init__(self, clients=None):
+        """clients - общие для нескольких скраперов клиенты и база состояния (ScraperClients)"""
+        super().__init__(clients)
         
         # IEEE Spectrum URLs
         self.base_url = 'https://spectrum.ieee.org'
@@ -55,86 +85,19 @@ class IEEESpectrumScraper:
         # Сегодняшняя дата для фильтрации
         self.today = date.today()
         
-        # Создаем папку для JSON файлов
-        self.json_folder = 'ieee_articles_archive'
-        self.create_json_folder()
-        
-        # Файл для отслеживания опубликованных URL
-        self.published_urls_file = 'ieee_published_urls.json'
-        self.published_urls = self.load_published_urls()
-        
-        # Инициализация клиентов
-        self.openai_client = OpenAI(
-            api_key=self.openrouter_api_key,
-            base_url=self.openrouter_base_url
-        )
-        self.telegram_bot = Bot(token=self.telegram_token)
-        
-        # Заголовки для запросов
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'image/gif,*/*',
-            'Accept-Encoding': 'identity',
-            'Accept-Language': 'en-US,en;q=0.9'
-        }
+        # Страницы списков тем, уже загруженные при загрузке архива: {(url темы, страница): статьи}
+        self.listing_cache = {}
         
         logger.info("IEEE Spectrum Scraper initialized successfully")
         logger.info(f"Loaded {len(self.published_urls)} previously published URLs")
         logger.info(f"Filtering articles for today's date: {self.today}")
     
-    def create_json_folder(self):
-        """Создание папки для JSON файлов"""
-        try:
-            if not os.path.exists(self.json_folder):
-                os.makedirs(self.json_folder)
-                logger.info(f"Created JSON folder: {self.json_folder}")
-            else:
-                logger.info(f"JSON folder already exists: {self.json_folder}")
-        except Exception as e:
-            logger.error(f"Error creating JSON folder: {e}")
-            self.json_folder = '.'
-    
-    def load_published_urls(self):
-        """Загрузка списка уже опубликованных URL"""
-        try:
-            if os.path.exists(self.published_urls_file):
-                with open(self.published_urls_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    published_urls = set(data.get('published_urls', []))
-                    logger.info(f"Loaded {len(published_urls)} published URLs from {self.published_urls_file}")
-                    return published_urls
-            else:
-                logger.info(f"Published URLs file not found, creating new one: {self.published_urls_file}")
-                return set()
-        except Exception as e:
-            logger.error(f"Error loading published URLs: {e}")
-            return set()
-    
-    def save_published_urls(self):
-        """Сохранение списка опубликованных URL"""
-        try:
-            data = {
-                'published_urls': list(self.published_urls),
-                'last_updated': datetime.now().isoformat(),
-                'total_count': len(self.published_urls)
-            }
-            
-            with open(self.published_urls_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"Saved {len(self.published_urls)} published URLs to {self.published_urls_file}")
-        except Exception as e:
-            logger.error(f"Error saving published URLs: {e}")
-    
-    def add_published_url(self, url):
-        """Добавление URL в список опубликованных"""
-        self.published_urls.add(url)
-        self.save_published_urls()
-        logger.info(f"Added URL to published list: {url}")
+    def start_run(self):
+        # Дата обновляется на каждый запуск: скрапер может работать несколько дней в режиме демона
+        self.today = date.today()
     
-    def is_url_published(self, url):
-        """Проверка, был ли URL уже опубликован"""
-        return url in self.published_urls
+    def fetch_articles(self):
+        return self.scrape_ieee_articles()
     
     def parse_article_date(self, date_text):
         """Парсинг даты статьи"""
@@ -176,14 +139,11 @@ class IEEESpectrumScraper:
                     if 'Today' in match.group():
                         return self.today
                     elif 'Yesterday' in match.group():
-                        from datetime import timedelta
                         return self.today - timedelta(days=1)
-                    elif 'ago' in match.group():
-                        # Для "X hours/days ago" считаем как сегодня
-                        return self.today
-                    elif len(match.groups()) == 2 and match.group(2) in ['h', 'd', 'm']:
-                        # Для "17h", "2d", "30m" считаем как сегодня
-                        return self.today
+                    elif 'ago' in match.group() or (len(match.groups()) == 2 and
+                                                    match.group(2).lower() in ['h', 'd', 'm']):
+                        # "X days ago", "2d" - X дней назад; "17h", "30m" считаем как сегодня
+                        return self.relative_date(int(match.group(1)), match.group(2))
                     elif len(match.groups()) == 3:
                         groups = match.groups()
                         if groups[0].isdigit() and groups[1].isdigit() and groups[2].isdigit():
@@ -213,6 +173,16 @@ class IEEESpectrumScraper:
             logger.error(f"Error parsing date '{date_text}': {e}")
             return None
     
+    def relative_date(self, amount, unit):
+        """Дата по относительной метке списка
+
+        Дни отсчитываются от сегодня, иначе загрузка архива не найдет статьи прошлых дней.
+        Часы и минуты считаются сегодняшними: такие статьи подхватывает ежедневный запуск.
+        """
+        if unit.lower().startswith('d'):
+            return self.today - timedelta(days=amount)
+        return self.today
+
     def is_article_from_today(self, article_date):
         """Проверка, что статья за сегодняшнюю дату"""
         if not article_date:
@@ -254,54 +224,90 @@ class IEEESpectrumScraper:
         """Скрапинг страницы с определенной темой"""
         try:
             logger.info(f"Scraping {topic} articles from: {url}")
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
             articles = []
-            today_articles = 0
-            
-            # Ищем статьи на странице
-            article_selectors = [
-                'article',
-                '.article-card',
-                '.post-card',
-                '.content-card',
-                '[data-testid="article-card"]'
-            ]
-            
-            for selector in article_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    logger.info(f"Found {len(elements)} articles using selector: {selector}")
-                    break
             
-            if not elements:
-                # Если не нашли по селекторам, ищем по структуре
-                elements = soup.find_all(['article', 'div'], class_=re.compile(r'article|post|content'))
-            
-            for element in elements[:20]:  # Увеличиваем лимит для поиска сегодняшних статей
-                try:
-                    article = self.extract_article_info(element, topic)
-                    if article:
-                        # Проверяем, что статья за сегодня
-                        if article['parsed_date'] and self.is_article_from_today(article['parsed_date']):
-                            articles.append(article)
-                            today_articles += 1
-                            logger.info(f"Found today's article: {article['title']} ({article['date']})")
-                        else:
-                            logger.debug(f"Skipping old article: {article['title']} ({article['date']})")
-                except Exception as e:
-                    logger.warning(f"Error extracting article info: {e}")
-                    continue
+            for article in self.scrape_listing(url, topic):
+                # Проверяем, что статья за сегодня
+                if article['parsed_date'] and self.is_article_from_today(article['parsed_date']):
+                    articles.append(article)
+                    logger.info(f"Found today's article: {article['title']} ({article['date']})")
+                else:
+                    logger.debug(f"Skipping old article: {article['title']} ({article['date']})")
             
-            logger.info(f"Extracted {len(articles)} today's articles from {topic} page (total found: {today_articles})")
+            logger.info(f"Extracted {len(articles)} today's articles from {topic} page")
             return articles
             
         except Exception as e:
             logger.error(f"Error scraping topic page {url}: {e}")
             return []
     
+    def scrape_listing(self, url, topic, limit=20):
+        """Все статьи страницы со списком (с датами); ошибки запроса передаются вызывающему"""
+        response = self.http.get(url, headers=self.headers, timeout=30)
+        response.raise_for_status()
+        
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(response.content, 'html.parser')
+        articles = []
+        
+        # Ищем статьи на странице
+        article_selectors = [
+            'article',
+            '.article-card',
+            '.post-card',
+            '.content-card',
+            '[data-testid="article-card"]'
+        ]
+        
+        for selector in article_selectors:
+            elements = soup.select(selector)
+            if elements:
+                logger.info(f"Found {len(elements)} articles using selector: {selector}")
+                break
+        
+        if not elements:
+            # Если не нашли по селекторам, ищем по структуре
+            elements = soup.find_all(['article', 'div'], class_=re.compile(r'article|post|content'))
+        
+        for element in elements[:limit]:
+            try:
+                article = self.extract_article_info(element, topic)
+                if article:
+                    articles.append(article)
+            except Exception as e:
+                logger.warning(f"Error extracting article info: {e}")
+                continue
+        
+        return articles
+    
+    def fetch_articles_for_date(self, day):
+        """Статьи за прошедший день: страницы тем листаются, пока не станут старше этого дня
+
+        Страницы списков кешируются на время запуска: соседние дни лежат на тех же страницах.
+        Если листание не дошло до статей старше дня (лимит страниц или страница без дат),
+        день не считается загруженным: ошибка не даст отметить его завершенным.
+        """
+        articles = {}
+        for topic_url, topic in ((self.ai_url, "AI"), (self.robotics_url, "Robotics")):
+            for page in range(1, ARCHIVE_MAX_PAGES + 1):
+                key = (topic_url, page)
+                if key not in self.listing_cache:
+                    # Ошибка запроса прерывает день целиком: он будет загружен при следующем запуске
+                    self.listing_cache[key] = self.scrape_listing(f"{topic_url}?page={page}", topic)
+                listing = self.listing_cache[key]
+                for article in listing:
+                    if article['parsed_date'] == day:
+                        articles.setdefault(article['link'], article)
+                dates = [article['parsed_date'] for article in listing if article['parsed_date']]
+                if not dates:
+                    raise ValueError(f"{topic} listing page {page} has no article dates, {day} was not reached")
+                if min(dates) < day:
+                    break
+            else:
+                raise ValueError(f"{day} is older than {ARCHIVE_MAX_PAGES} pages of the {topic} listing")
+        logger.info(f"Found {len(articles)} IEEE Spectrum articles for {day}")
+        return list(articles.values())
+    
     def extract_article_info(self, element, topic):
         """Извлечение информации о статье из HTML элемента"""
         try:
@@ -426,108 +432,22 @@ class IEEESpectrumScraper:
             logger.error(f"Error extracting article info: {e}")
             return None
     
-    def filter_unpublished_articles(self, articles):
-        """Фильтрация статей, исключая уже опубликованные"""
-        unpublished_articles = []
-        skipped_count = 0
-        
-        for article in articles:
-            # Статьи уже отфильтрованы по дате в scrape_topic_page
-            # Здесь только проверяем, не были ли они уже опубликованы
-            if not self.is_url_published(article['link']):
-                unpublished_articles.append(article)
-            else:
-                skipped_count += 1
-                logger.info(f"Skipping already published article: {article['title']}")
-        
-        logger.info(f"Filtered articles: {len(unpublished_articles)} unpublished, {skipped_count} already published")
-        return unpublished_articles
-    
-    def select_best_article(self, articles):
-        """Выбор самой интересной статьи с помощью AI"""
-        try:
-            if not articles:
-                logger.warning("No articles to select from")
-                return None
-            
-            # Формируем список статей для AI
-            articles_text = ""
-            for i, article in enumerate(articles[:10], 1):  # Берем первые 10 статей
-                articles_text += f"{i}. {article['title']}\n"
-                articles_text += f"   Автор: {article['author']}\n"
-                articles_text += f"   Тема: {article['topic']}\n"
-                articles_text += f"   Описание: {article['description'][:200]}...\n\n"
-            
-            prompt = f"""
-            Ты эксперт по технологиям и контенту. Из следующего списка статей с IEEE Spectrum (AI и Robotics) выбери ОДНУ самую интересную и виральную статью для публикации в Telegram канале об AI и robotics технологиях.
-
-            Критерии выбора:
-            - Потенциал виральности
-            - Интерес для широкой аудитории
-            - Технологическая значимость
-
-            Статьи:
-            {articles_text}
-
-            Ответь ТОЛЬКО номером выбранной статьи (1-10). Если ни одна статья не подходит, ответь "0".
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.ai_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
-                temperature=self.temperature
-            )
-            
-            choice = response.choices[0].message.content.strip()
-            
-            try:
-                article_index = int(choice) - 1
-                if 0 <= article_index < len(articles):
-                    selected_article = articles[article_index]
-                    logger.info(f"AI selected article: {selected_article['title']}")
-                    return selected_article
-                else:
-                    logger.warning(f"AI returned invalid index: {choice}")
-                    return articles[0] if articles else None
-            except ValueError:
-                logger.warning(f"AI returned non-numeric response: {choice}")
-                return articles[0] if articles else None
-                
-        except Exception as e:
-            logger.error(f"Error selecting best article: {e}")
-            return articles[0] if articles else None
+    def describe_article(self, article):
+        return (f"   Автор: {article['author']}\n"
+                f"   Тема: {article['topic']}\n"
+                f"   Описание: {article['description'][:200]}...\n")
     
     def scrape_article_content_and_media(self, article_url):
         """Скрапинг содержимого статьи и извлечение GIF/медиа"""
+        article_data = self.scrape_article(article_url)
+        return article_data['content'], article_data['media_url']
+    
+    def scrape_article(self, article_url):
+        """Скрапинг статьи: текст, основной медиафайл и кандидаты для альбома"""
         try:
             logger.info(f"Scraping article content and media from: {article_url}")
-            response = requests.get(article_url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Удаляем ненужные элементы
-            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                element.decompose()
-
-            # Ищем основной контент статьи
-            content_selectors = [
-                'article',
-                '.article-content',
-                '.post-content',
-                '.entry-content',
-                '.content',
-                'main'
-            ]
-            content = ""
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content = elements[0].get_text(separator=' ', strip=True)
-                    break
-            if not content:
-                content = soup.get_text(separator=' ', strip=True)
-            content = ' '.join(content.split())
+            soup = self.fetch_soup(article_url)
+            content = self.extract_article_text(soup)
 
             # === Новый блок: Поиск GIF ===
             gif_url = None
@@ -562,10 +482,51 @@ class IEEESpectrumScraper:
             media_url = gif_url or image_url
             if media_url and not media_url.startswith(('http://', 'https://')):
                 media_url = urljoin(article_url, media_url)
-            return content, media_url
+            
+            # GIF публикуется анимацией, альбом собираем только из изображений
+            if gif_url or self.album_max_items == 1:
+                media_urls = [media_url] if media_url else []
+            else:
+                media_urls = self.extract_image_candidates(soup, article_url, media_url, self.album_max_items)
+            
+            return {'content': content, 'media_url': media_url, 'media_urls': media_urls}
         except Exception as e:
             logger.error(f"Error scraping article content and media: {e}")
-            return "", None
+            return {'content': "", 'media_url': None, 'media_urls': []}
+    
+    def extract_image_candidates(self, soup, article_url, main_image_url=None, limit=10):
+        """Извлечение нескольких изображений статьи (основное - первым)"""
+        candidates = [main_image_url] if main_image_url else []
+        
+        def add(src):
+            if not src or src.startswith('data:') or '.gif' in src.lower():
+                return
+            src = urljoin(article_url, src)
+            if src not in candidates:
+                candidates.append(src)
+        
+        # Изображения из <picture>: первая (самая большая) ссылка srcset
+        for picture in soup.find_all('picture'):
+            if len(candidates) >= limit:
+                break
+            for source in picture.find_all('source'):
+                srcset = source.get('srcset', '').strip()
+                if srcset:
+                    add(re.split('[, ]+', srcset)[0])
+                    break
+        
+        # Изображения в тексте статьи
+        for img in soup.select('article img, .article-content img, .post-content img, .entry-content img'):
+            if len(candidates) >= limit:
+                break
+            try:
+                if img.get('width') and img.get('height') and (int(img['width']) < 200 or int(img['height']) < 200):
+                    continue
+            except (ValueError, TypeError):
+                pass
+            add(img.get('src'))
+        
+        return candidates[:limit]
     
     def extract_media(self, soup, article_url):
         """Извлечение медиафайлов (изображения или видео)"""
@@ -633,7 +594,7 @@ class IEEESpectrumScraper:
                 
             logger.info(f"Downloading media: {media_url}")
             
-            response = requests.get(media_url, headers=self.headers, timeout=30)
+            response = self.http.get(media_url, headers=self.headers, timeout=30)
             response.raise_for_status()
             
             # Определяем тип файла
@@ -720,6 +681,8 @@ class IEEESpectrumScraper:
                         if img.size[0] > 2000 or img.size[1] > 2000:
                             logger.warning(f"GIF dimensions too large: {img.size}")
                         
+                except ImportError:
+                    logger.warning("PIL not available, skipping GIF validation")
                 except Exception as e:
                     logger.error(f"Error validating GIF: {e}")
                     try:
@@ -821,375 +784,6 @@ class IEEESpectrumScraper:
             return '.mp4'
         else:
             return '.jpg'
-    
-    def create_viral_post(self, article_title, article_content, article_url, topic):
-        """Создание вирального поста для Telegram с помощью AI"""
-        try:
-            prompt = f"""
-            Создай на основе этой статьи для Telegram канала об AI и Robotics технологиях виральный пост длинной длинной от 700 до 1024 символов(включая теги), вопрос в конце поста не нужен, количество тегов ограничить 5. Стиль информативный. Используй разметку, отступы и эmоджи. Перепроверь в конце количество символов, получившеся подписи, от 700 до 1024(включая теги). Вывести только сам пост.
-
-            Заголовок статьи: {article_title}
-            
-            Содержание статьи: {article_content[:2900]}
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.ai_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
-            
-            post_content = response.choices[0].message.content.strip()
-            
-            # Заменяем плейсхолдер ссылки на реальную
-            post_content = post_content.replace('[ссылка]', article_url)
-            
-            logger.info("Successfully created viral post with AI")
-            return post_content
-            
-        except Exception as e:
-            logger.error(f"Error creating viral post: {e}")
-            return None
-    
-    def convert_markdown_to_html(self, text):
-        """Конвертация Markdown разметки в HTML для Telegram"""
-        try:
-            # Заменяем Markdown на HTML теги
-            import re
-            
-            # Ссылки: [текст](url) -> <a href="url">текст</a> (делаем первым)
-            text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
-            
-            # Жирный текст: **текст** -> <b>текст</b>
-            text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-            
-            # Курсив: *текст* -> <i>текст</i>
-            text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
-            
-            # Подчеркнутый: __текст__ -> <u>текст</u>
-            text = re.sub(r'__(.*?)__', r'<u>\1</u>', text)
-            
-            # Зачеркнутый: ~~текст~~ -> <s>текст</s>
-            text = re.sub(r'~~(.*?)~~', r'<s>\1</s>', text)
-            
-            # Моноширинный: `текст` -> <code>текст</code>
-            text = re.sub(r'`(.*?)`', r'<code>\1</code>', text)
-            
-            # Экранируем специальные символы HTML (кроме наших тегов)
-            text = text.replace('&', '&amp;')
-            
-            # Восстанавливаем наши HTML теги
-            text = text.replace('&amp;lt;b&amp;gt;', '<b>').replace('&amp;lt;/b&amp;gt;', '</b>')
-            text = text.replace('&amp;lt;i&amp;gt;', '<i>').replace('&amp;lt;/i&amp;gt;', '</i>')
-            text = text.replace('&amp;lt;u&amp;gt;', '<u>').replace('&amp;lt;/u&amp;gt;', '</u>')
-            text = text.replace('&amp;lt;s&amp;gt;', '<s>').replace('&amp;lt;/s&amp;gt;', '</s>')
-            text = text.replace('&amp;lt;code&amp;gt;', '<code>').replace('&amp;lt;/code&amp;gt;', '</code>')
-            text = text.replace('&amp;lt;a href=&amp;quot;', '<a href="').replace('&amp;lt;/a&amp;gt;', '</a>')
-            text = text.replace('&amp;quot;&amp;gt;', '">')
-            
-            return text
-            
-        except Exception as e:
-            logger.error(f"Error converting markdown to HTML: {e}")
-            return text
-
-    async def publish_to_telegram(self, post_content, media_path=None):
-        """Публикация поста в Telegram канал с медиафайлом"""
-        try:
-            logger.info(f"Publishing post to Telegram channel: {self.telegram_channel}")
-            
-            # Конвертируем Markdown в HTML
-            html_content = self.convert_markdown_to_html(post_content)
-            
-            if media_path and os.path.exists(media_path):
-                # Определяем тип медиафайла
-                is_gif = media_path.lower().endswith('.gif')
-                
-                if is_gif:
-                    # Для GIF используем sendAnimation
-                    logger.info(f"Publishing GIF animation: {media_path}")
-                    
-                    # Ограничиваем длину подписи для анимаций (1024 символа)
-                    if len(html_content) > 1024:
-                        html_content = html_content[:1021] + "..."
-                        logger.info("Caption truncated for animation (max 1024 characters)")
-                    
-                    with open(media_path, 'rb') as animation:
-                        await self.telegram_bot.send_animation(
-                            chat_id=self.telegram_channel,
-                            animation=animation,
-                            caption=html_content,
-                            parse_mode='HTML'
-                        )
-                else:
-                    # Для других изображений используем sendPhoto
-                    logger.info(f"Publishing post with image: {media_path}")
-                    
-                    with open(media_path, 'rb') as photo:
-                        await self.telegram_bot.send_photo(
-                            chat_id=self.telegram_channel,
-                            photo=photo,
-                            caption=html_content,
-                            parse_mode='HTML'
-                        )
-                
-                # Удаляем временный файл
-                try:
-                    os.unlink(media_path)
-                    logger.info("Temporary media file deleted")
-                except Exception as e:
-                    logger.warning(f"Could not delete temporary media file: {e}")
-                    
-            else:
-                # Публикуем пост без медиа
-                logger.info("Publishing post without media")
-                
-                # Разбиваем длинный пост на части, если нужно
-                if len(html_content) > 4096:
-                    parts = [html_content[i:i+4096] for i in range(0, len(html_content), 4096)]
-                    for i, part in enumerate(parts):
-                        await self.telegram_bot.send_message(
-                            chat_id=self.telegram_channel,
-                            text=part,
-                            parse_mode='HTML',
-                            disable_web_page_preview=False
-                        )
-                        if i < len(parts) - 1:
-                            await asyncio.sleep(1)
-                else:
-                    await self.telegram_bot.send_message(
-                        chat_id=self.telegram_channel,
-                        text=html_content,
-                        parse_mode='HTML',
-                        disable_web_page_preview=False
-                    )
-            
-            logger.info("Successfully published post to Telegram")
-            return True
-            
-        except Exception as e:
-            error_message = str(e)
-            logger.error(f"Error publishing to Telegram: {error_message}")
-            
-            # Если ошибка связана с длиной подписи, пересоздаем пост
-            if "caption is too long" in error_message.lower():
-                logger.warning("Caption too long, recreating post with shorter content...")
-                
-                # Удаляем временный файл
-                if media_path and os.path.exists(media_path):
-                    try:
-                        os.unlink(media_path)
-                    except:
-                        pass
-                
-                # Возвращаем специальный код для пересоздания поста
-                return "RECREATE_POST"
-            
-            # Удаляем временный файл в случае других ошибок
-            if media_path and os.path.exists(media_path):
-                try:
-                    os.unlink(media_path)
-                except:
-                    pass
-            return False
-    
-    def save_article_data(self, article, post_content, media_url=None):
-        """Сохранение данных о статье для архива"""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"ieee_article_{timestamp}.json"
-            
-            # Конвертируем date объект в строку для JSON
-            article_copy = article.copy()
-            if article_copy.get('parsed_date'):
-                article_copy['parsed_date'] = article_copy['parsed_date'].isoformat()
-            
-            data = {
-                'timestamp': timestamp,
-                'article': article_copy,
-                'post_content': post_content,
-                'media_url': media_url,
-                'published': True
-            }
-            
-            with open(os.path.join(self.json_folder, filename), 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"Article data saved to {filename}")
-            
-        except Exception as e:
-            logger.error(f"Error saving article data: {e}")
-    
-    async def run_daily_scraping(self):
-        """Основной метод для запуска ежедневного скраппинга"""
-        logger.info("Starting daily IEEE Spectrum scraping process")
-        
-        media_path = None
-        
-        try:
-            # 1. Скрапинг статей с IEEE Spectrum
-            articles = self.scrape_ieee_articles()
-            if not articles:
-                logger.error("No articles found on IEEE Spectrum")
-                return False
-            
-            # 2. Фильтрация уже опубликованных статей
-            unpublished_articles = self.filter_unpublished_articles(articles)
-            if not unpublished_articles:
-                logger.warning("All articles have already been published or are from the past")
-                return False
-            
-            # 3. Выбор лучшей статьи с помощью AI
-            best_article = self.select_best_article(unpublished_articles)
-            if not best_article:
-                logger.error("No suitable article selected")
-                return False
-            
-            # 4. Скрапинг содержимого статьи и медиафайлов
-            article_content, media_url = self.scrape_article_content_and_media(best_article['link'])
-            if not article_content:
-                logger.error("Failed to scrape article content")
-                return False
-            
-            # 5. Скачивание медиафайла
-            if media_url:
-                media_path = self.download_media(media_url)
-                if not media_path:
-                    logger.warning("Failed to download media, will publish without it")
-            
-            # 6. Создание вирального поста с помощью AI
-            post_content = self.create_viral_post(
-                best_article['title'],
-                article_content,
-                best_article['link'],
-                best_article['topic']
-            )
-            if not post_content:
-                logger.error("Failed to create viral post")
-                return False
-            
-            # 7. Публикация в Telegram с медиафайлом
-            max_retry_attempts = 10
-            retry_count = 0
-            
-            while retry_count < max_retry_attempts:
-                success = await self.publish_to_telegram(post_content, media_path)
-                
-                if success == True:
-                    break
-                elif success == "RECREATE_POST":
-                    retry_count += 1
-                    logger.info(f"Recreating post (attempt {retry_count}/{max_retry_attempts})")
-                    
-                    # Создаем новый пост с более коротким лимитом
-                    shorter_prompt = f"""
-                    Создай на основе этой статьи для Telegram канала об AI и Robotics технологиях очень короткий виральный пост длинной от 700 до 1000 символов(включая теги), вопрос в конце поста не нужен, количество тегов ограничить 3. Стиль поста информативный, полезный. Используй разметку, отступы и эmоджи(красивее когда эмоджи начинают новый абзац). Перепроверь в конце количество символов, получившейся подписи, от 500 до 1000(включая теги). Вывести только сам пост.
-
-                    Заголовок статьи: {best_article['title']}
-                    
-                    Содержание статьи: {article_content[:1500]}
-                    """
-                    
-                    response = self.openai_client.chat.completions.create(
-                        model=self.ai_model,
-                        messages=[{"role": "user", "content": shorter_prompt}],
-                        max_tokens=self.max_tokens,
-                        temperature=self.temperature
-                    )
-                    
-                    post_content = response.choices[0].message.content.strip()
-                    post_content = post_content.replace('[ссылка]', best_article['link'])
-                    
-                    logger.info(f"Recreated post length: {len(post_content)} characters")
-                    
-                    # Скачиваем медиафайл заново
-                    if media_url:
-                        media_path = self.download_media(media_url)
-                        if not media_path:
-                            logger.warning("Failed to download media, will publish without it")
-                    
-                    continue
-                else:
-                    logger.error("Failed to publish to Telegram")
-                    return False
-            
-            if retry_count >= max_retry_attempts:
-                logger.error(f"Failed to publish after {max_retry_attempts} attempts")
-                return False
-            
-            # 8. Добавление URL в список опубликованных
-            self.add_published_url(best_article['link'])
-            
-            # 9. Сохранение данных
-            self.save_article_data(best_article, post_content, media_url)
-            
-            logger.info("Daily IEEE Spectrum scraping process completed successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error in daily scraping process: {e}")
-            # Удаляем временный файл в случае ошибки
-            if media_path and os.path.exists(media_path):
-                try:
-                    os.unlink(media_path)
-                except:
-                    pass
-            return False
-
-    def extract_main_image(self, soup, article_url):
-        """Извлечение fallback-изображения статьи (если нет GIF)"""
-        try:
-            # Список селекторов для поиска главного изображения
-            image_selectors = [
-                'meta[property="og:image"]',
-                'meta[name="twitter:image"]',
-                'meta[property="og:image:secure_url"]',
-                '.article-featured-image img',
-                '.post-featured-image img',
-                '.entry-featured-image img',
-                '.featured-image img',
-                'article img',
-                '.article-content img',
-                '.post-content img',
-                '.entry-content img',
-                'main img'
-            ]
-            image_url = None
-            # Сначала ищем в meta тегах (обычно там лучшее качество)
-            for selector in image_selectors[:3]:
-                elements = soup.select(selector)
-                if elements:
-                    image_url = elements[0].get('content') or elements[0].get('src')
-                    if image_url:
-                        break
-            # Если не нашли в meta, ищем в img тегах
-            if not image_url:
-                for selector in image_selectors[3:]:
-                    elements = soup.select(selector)
-                    if elements:
-                        for img in elements:
-                            src = img.get('src')
-                            if src:
-                                width = img.get('width')
-                                height = img.get('height')
-                                if not width or not height:
-                                    image_url = src
-                                    break
-                                try:
-                                    if int(width) >= 200 and int(height) >= 200:
-                                        image_url = src
-                                        break
-                                except (ValueError, TypeError):
-                                    image_url = src
-                                    break
-            # Преобразуем относительные URL в абсолютные
-            if image_url and not image_url.startswith(('http://', 'https://')):
-                image_url = urljoin(article_url, image_url)
-            return image_url
-        except Exception as e:
-            logger.error(f"Error extracting main image: {e}")
-            return None
 
 async def main():
     """Главная функция"""
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Утилита для выборок из архива опубликованных статей
+Utility for querying the published article archive
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from state_store import StateStore
+from article_archive import ArticleArchive
+from url_canon import SOURCE_RULES
+from atomic_io import atomic_open
+
+# Папки старого архива (по одному JSON файлу на статью)
+LEGACY_ARCHIVE_FOLDERS = {
+    'techcrunch': 'articles_archive',
+    'ieee_spectrum': 'ieee_articles_archive',
+}
+DEFAULT_PAGE_SIZE = 20
+
+
+def open_archive():
+    return ArticleArchive(StateStore())
+
+
+def known_sources(archive):
+    """Встроенные источники и все источники, у которых есть статьи в архиве (в т.ч. плагины)"""
+    return sorted(set(SOURCE_RULES) | {source for source, _ in archive.group_counts('source')})
+
+
+def filters(args):
+    return {
+        'source': args.source,
+        'topic': getattr(args, 'topic', None),
+        'url': getattr(args, 'url', None),
+        'since': getattr(args, 'since', None),
+        'until': getattr(args, 'until', None),
+    }
+
+
+def cmd_list(args):
+    archive = open_archive()
+    total = archive.count(**filters(args))
+    if not total:
+        print("📝 Подходящих статей в архиве нет")
+        return
+    page = max(1, args.page)
+    pages = (total + args.page_size - 1) // args.page_size
+    print(f"📚 Статей: {total}, страница {page}/{pages}")
+    for item in archive.find(**filters(args), limit=args.page_size, offset=(page - 1) * args.page_size):
+        topic = f" [{item['topic']}]" if item['topic'] else ''
+        print(f"  #{item['id']} {item['saved_at'][:16]} {item['source']}{topic}: {item['title']}")
+        print(f"      {item['url']}")
+
+
+def cmd_show(args):
+    item = open_archive().get(args.id)
+    if not item:
+        print(f"⚠️  Статья #{args.id} не найдена")
+        return
+    if args.json:
+        print(json.dumps(item['record'], ensure_ascii=False, indent=2))
+        return
+    print(f"📰 #{item['id']} {item['title']}")
+    print(f"   Источник: {item['source']}, сохранена: {item['saved_at']}")
+    print(f"   URL: {item['url']}")
+    if item['topic']:
+        print(f"   Тема: {item['topic']}")
+    if item['media_url']:
+        print(f"   Медиа: {item['media_url']}")
+    print()
+    print(item['record'].get('post_content', ''))
+
+
+def cmd_search(args):
+    archive = open_archive()
+    try:
+        results = archive.search(args.query, source=args.source, limit=args.limit, raw=args.raw)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Ошибка в запросе: {e}")
+        return
+    if not results:
+        print(f"🔍 По запросу '{args.query}' ничего не найдено")
+        return
+    print(f"🔍 Найдено {len(results)} статей по запросу '{args.query}':")
+    for item in results:
+        score = f" ({item['score']:.2f})" if item['score'] is not None else ''
+        print(f"  #{item['id']} {item['saved_at'][:10]} {item['source']}{score}: {item['title']}")
+        if item['snippet']:
+            print(f"      {' '.join(item['snippet'].split())}")
+
+
+def cmd_stats(args):
+    archive = open_archive()
+    print(f"📊 Статей в архиве: {archive.count(source=args.source)}")
+    print("По источникам:")
+    for source, count in archive.group_counts('source', args.source):
+        print(f"  - {source}: {count}")
+    topics = [row for row in archive.group_counts('topic', args.source) if row[0]]
+    if topics:
+        print("По темам:")
+        for topic, count in topics:
+            print(f"  - {topic}: {count}")
+
+
+def cmd_export(args):
+    archive = open_archive()
+    count = 0
+    # JSONL: одна полная запись на строку, читается потоково (pandas.read_json(lines=True) и т.п.)
+    with atomic_open(args.file) as f:
+        offset = 0
+        while True:
+            items = archive.find(**filters(args), limit=500, offset=offset, with_payload=True)
+            if not items:
+                break
+            for item in items:
+                record = dict(item['record'], archive_id=item['id'], source=item['source'], saved_at=item['saved_at'])
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                count += 1
+            offset += len(items)
+    print(f"✅ Экспортировано {count} статей в {os.path.abspath(args.file)}")
+
+
+def cmd_migrate(args):
+    archive = open_archive()
+    sources = [args.source] if args.source else list(LEGACY_ARCHIVE_FOLDERS)
+    for source in sources:
+        folder = args.folder or LEGACY_ARCHIVE_FOLDERS[source]
+        if not os.path.isdir(folder):
+            print(f"📁 {folder}: папка не найдена, пропускаем")
+            continue
+        migrated = archive.migrate_directory(folder, source, force=True)
+        print(f"✅ {folder}: перенесено {migrated} новых статей ({source})")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="📚 Архив опубликованных статей",
+        epilog="""Примеры:
+  python manage_archive.py list --source ieee_spectrum --topic robotics
+  python manage_archive.py list --since 2025-07-01 --until 2025-07-31 --page 2
+  python manage_archive.py show 42
+  python manage_archive.py search "openai gpt-5"
+  python manage_archive.py stats
+  python manage_archive.py export july.jsonl --since 2025-07-01
+  python manage_archive.py migrate""",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--source', help='Источник (по умолчанию - все)')
+    commands = parser.add_subparsers(dest='command', metavar='команда')
+
+    def add_filters(command):
+        command.add_argument('--topic', help='Тема (IEEE Spectrum: ai, robotics)')
+        command.add_argument('--url', help='Точный URL статьи')
+        command.add_argument('--since', help='С даты (YYYY-MM-DD или ISO время)')
+        command.add_argument('--until', help='По дату включительно (YYYY-MM-DD) или до ISO времени')
+
+    list_command = commands.add_parser('list', help='Список статей (новые первыми)')
+    add_filters(list_command)
+    list_command.add_argument('--page', type=int, default=1, help='Номер страницы')
+    list_command.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Размер страницы')
+
+    show = commands.add_parser('show', help='Показать статью и пост')
+    show.add_argument('id', type=int)
+    show.add_argument('--json', action='store_true', help='Полная запись в JSON')
+
+    search = commands.add_parser('search', help='Полнотекстовый поиск по заголовкам, статьям и постам')
+    search.add_argument('query')
+    search.add_argument('--limit', type=int, default=DEFAULT_PAGE_SIZE, help='Сколько результатов показать')
+    search.add_argument('--raw', action='store_true', help='Запрос в синтаксисе FTS5 (OR, NEAR, "фраза")')
+
+    commands.add_parser('stats', help='Статистика по источникам и темам')
+
+    export = commands.add_parser('export', help='Экспорт полных записей в JSONL')
+    export.add_argument('file')
+    add_filters(export)
+
+    migrate = commands.add_parser('migrate', help='Перенести JSON файлы старых папок архива')
+    migrate.add_argument('--folder', help='Папка архива (по умолчанию - стандартная для источника)')
+
+    commands.add_parser('help', help='Показать эту справку')
+    return parser
+
+
+COMMANDS = {
+    'list': cmd_list,
+    'show': cmd_show,
+    'search': cmd_search,
+    'stats': cmd_stats,
+    'export': cmd_export,
+    'migrate': cmd_migrate,
+}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command not in COMMANDS:
+        parser.print_help()
+        return
+    if args.command == 'migrate' and args.folder and not args.source:
+        parser.error("для --folder укажите --source")
+    if args.command == 'migrate' and args.source and not args.folder and args.source not in LEGACY_ARCHIVE_FOLDERS:
+        parser.error(f"у источника {args.source} нет старой папки архива, укажите --folder")
+    # Перенести старые файлы можно и в источник-плагин без записей; выборки - только по известным
+    if args.source and args.command != 'migrate':
+        sources = known_sources(open_archive())
+        if args.source not in sources:
+            parser.error(f"неизвестный источник {args.source} (доступны: {', '.join(sources)})")
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Утилита управления общим хранилищем опубликованных URL всех источников
+Utility for managing the shared published URL store
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from state_store import StateStore, PublishedUrlStore
+from url_canon import SOURCE_RULES, detect_source
+from atomic_io import atomic_open
+
+# Старые JSON списки, переносимые в базу при первом обращении
+LEGACY_JSON_FILES = {
+    'techcrunch': 'published_urls.json',
+    'ieee_spectrum': 'ieee_published_urls.json',
+}
+SOURCE_TITLES = {
+    'techcrunch': 'TechCrunch',
+    'ieee_spectrum': 'IEEE Spectrum',
+}
+IMPORT_BATCH_SIZE = 10000
+DEFAULT_PAGE_SIZE = 50
+
+
+def open_state_store():
+    """Подключение к базе с переносом старых JSON списков"""
+    store = StateStore()
+    for source, json_file in LEGACY_JSON_FILES.items():
+        PublishedUrlStore(store, source).migrate_json(json_file)
+    return store
+
+
+def open_url_store(source):
+    """Хранилище URL одного источника (None - все источники, только чтение)"""
+    return PublishedUrlStore(open_state_store(), source)
+
+
+def known_sources(store):
+    """Встроенные источники и все источники, у которых есть URL в базе (в т.ч. плагины)"""
+    return sorted(set(SOURCE_RULES) | set(PublishedUrlStore(store, None).sources()))
+
+
+def source_label(source):
+    return SOURCE_TITLES.get(source, source) if source else 'всех источников'
+
+
+def resolve_source(args, url):
+    """Источник для записи: из --source или по домену URL"""
+    source = args.source or detect_source(url)
+    if not source:
+        print(f"❌ Не удалось определить источник для {url}, укажите --source")
+    return source
+
+
+def print_urls(rows, start=1, show_source=False):
+    count = 0
+    for i, (url, source, published_at) in enumerate(rows, start):
+        suffix = f"  [{source}]" if show_source else ''
+        print(f"  {i}. {url}{suffix}")
+        count += 1
+    return count
+
+
+def page_window(args):
+    """offset и limit для --page/--page-size (без --page - весь список потоком)"""
+    if args.page is None:
+        return 0, None
+    page = max(1, args.page)
+    return (page - 1) * args.page_size, args.page_size
+
+
+def cmd_list(args):
+    urls = open_url_store(args.source)
+    offset, limit = page_window(args)
+    total = len(urls)
+    if not total:
+        print(f"📝 Список опубликованных URL {source_label(args.source)} пуст")
+        return
+    header = f"📝 Опубликованные URL {source_label(args.source)} ({total})"
+    if limit:
+        pages = (total + limit - 1) // limit
+        header += f", страница {offset // limit + 1}/{pages}"
+    print(header + ':')
+    print_urls(urls.iter_urls(offset=offset, limit=limit), offset + 1, args.source is None)
+
+
+def cmd_count(args):
+    urls = open_url_store(args.source)
+    print(f"📊 Количество опубликованных URL {source_label(args.source)}: {len(urls)}")
+    if args.source is None:
+        for source in known_sources(urls.store):
+            print(f"  - {source_label(source)}: {len(PublishedUrlStore(urls.store, source))}")
+
+
+def cmd_search(args):
+    urls = open_url_store(args.source)
+    offset, limit = page_window(args)
+    if args.prefix:
+        rows = urls.iter_urls(prefix=args.keyword, offset=offset, limit=limit)
+        description = f"начинающихся с '{args.keyword}'"
+    else:
+        rows = urls.iter_urls(contains=args.keyword, offset=offset, limit=limit)
+        description = f"содержащих '{args.keyword}'"
+
+    print(f"🔍 URL {description}:")
+    found = print_urls(rows, offset + 1, args.source is None)
+    if not found:
+        print(f"🔍 URL {description} не найдены")
+
+
+def cmd_add(args):
+    store = open_state_store()
+    for url in args.urls:
+        source = resolve_source(args, url)
+        if not source:
+            continue
+        urls = PublishedUrlStore(store, source)
+        if url in urls:
+            print(f"⚠️  URL уже в списке: {url}")
+        else:
+            urls.add(url)
+            print(f"✅ Добавлен URL ({source}): {url}")
+
+
+def cmd_remove(args):
+    store = open_state_store()
+    for url in args.urls:
+        source = resolve_source(args, url)
+        if not source:
+            continue
+        if PublishedUrlStore(store, source).remove(url):
+            print(f"✅ Удален URL: {url}")
+        else:
+            print(f"⚠️  URL не найден в списке: {url}")
+
+
+def cmd_clear(args):
+    store = open_state_store()
+    sources = [args.source] if args.source else known_sources(store)
+    total = sum(len(PublishedUrlStore(store, source)) for source in sources)
+    if not total:
+        print("📝 Список уже пуст")
+        return
+    if not args.yes:
+        confirm = input(f"⚠️  Вы уверены, что хотите очистить весь список {source_label(args.source)} ({total} URL)? (y/N): ")
+        if confirm.lower() not in ['y', 'yes', 'да']:
+            print("❌ Операция отменена")
+            return
+    for source in sources:
+        PublishedUrlStore(store, source).clear()
+    print(f"🗑️  Список опубликованных URL {source_label(args.source)} очищен")
+
+
+def read_import_file(path):
+    """URL из JSON (формат published_urls.json или список) или текстового файла (по одному в строке)"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('published_urls', [])
+        for item in data:
+            yield item if isinstance(item, str) else item.get('url')
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+
+
+def cmd_import(args):
+    store = open_state_store()
+    batches = {}
+    imported = skipped = 0
+
+    def flush(source):
+        PublishedUrlStore(store, source).add_many(batches.pop(source))
+
+    for url in read_import_file(args.file):
+        source = (args.source or detect_source(url)) if url else None
+        if not source:
+            skipped += 1
+            continue
+        batches.setdefault(source, []).append(url)
+        imported += 1
+        if len(batches[source]) >= IMPORT_BATCH_SIZE:
+            flush(source)
+    for source in list(batches):
+        flush(source)
+
+    print(f"✅ Импортировано {imported} URL из {args.file}")
+    if skipped:
+        print(f"⚠️  Пропущено {skipped} URL без известного источника (укажите --source)")
+
+
+def cmd_export(args):
+    urls = open_url_store(args.source)
+    count = 0
+    with atomic_open(args.file) as f:
+        if args.file.endswith('.json'):
+            # Тот же формат, что у старых published_urls.json, запись потоком
+            f.write('{\n  "published_urls": [')
+            for url, _, _ in urls.iter_urls():
+                f.write((',' if count else '') + '\n    ' + json.dumps(url, ensure_ascii=False))
+                count += 1
+            f.write(f'\n  ],\n  "last_updated": "{datetime.now().isoformat()}",\n  "total_count": {count}\n}}\n')
+        else:
+            for url, _, _ in urls.iter_urls():
+                f.write(url + '\n')
+                count += 1
+    print(f"✅ Экспортировано {count} URL в {os.path.abspath(args.file)}")
+
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="🔧 Управление опубликованными URL (общая база всех источников)",
+        epilog="""Примеры:
+  python manage_state.py count
+  python manage_state.py --source techcrunch list --page 2
+  python manage_state.py search robot
+  python manage_state.py search https://spectrum.ieee.org/ai --prefix
+  python manage_state.py add "https://techcrunch.com/2025/07/22/story/"
+  python manage_state.py export urls.txt
+  python manage_state.py --source ieee_spectrum import ieee_published_urls.json""",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--source', help='Источник (по умолчанию - все)')
+    commands = parser.add_subparsers(dest='command', metavar='команда')
+
+    def add_paging(command):
+        command.add_argument('--page', type=int, help='Номер страницы (без него - весь список)')
+        command.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Размер страницы')
+
+    add_paging(commands.add_parser('list', help='Показать опубликованные URL'))
+    commands.add_parser('count', help='Показать количество опубликованных URL')
+
+    search = commands.add_parser('search', help='Найти URL по подстроке или префиксу')
+    search.add_argument('keyword')
+    search.add_argument('--prefix', action='store_true', help='Искать URL, начинающиеся с keyword')
+    add_paging(search)
+
+    add = commands.add_parser('add', help='Добавить URL')
+    add.add_argument('urls', nargs='+')
+    remove = commands.add_parser('remove', help='Удалить URL (вместе с его вариантами)')
+    remove.add_argument('urls', nargs='+')
+
+    clear = commands.add_parser('clear', help='Очистить список')
+    clear.add_argument('--yes', action='store_true', help='Без подтверждения')
+
+    import_command = commands.add_parser('import', help='Импорт URL из .json или текстового файла')
+    import_command.add_argument('file')
+    export = commands.add_parser('export', help='Экспорт URL в .json или текстовый файл')
+    export.add_argument('file')
+
+    commands.add_parser('help', help='Показать эту справку')
+    return parser
+
+
+COMMANDS = {
+    'list': cmd_list,
+    'count': cmd_count,
+    'search': cmd_search,
+    'add': cmd_add,
+    'remove': cmd_remove,
+    'clear': cmd_clear,
+    'import': cmd_import,
+    'export': cmd_export,
+}
+
+
+def main(argv=None, prog=None):
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    if args.command not in COMMANDS:
+        parser.print_help()
+        return
+    # Добавлять URL можно и источнику-плагину без записей; остальные команды - только известным
+    if args.source and args.command not in ('add', 'import'):
+        sources = known_sources(open_state_store())
+        if args.source not in sources:
+            parser.error(f"неизвестный источник {args.source} (доступны: {', '.join(sources)})")
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Markdown to Telegram HTML
+Однопроходная конвертация Markdown разметки в HTML для Telegram
+"""
+
+import re
+
+# Все значимые для разметки конструкции находятся одним скомпилированным выражением,
+# текст между совпадениями копируется как есть
+TOKEN_RE = re.compile(r"""
+    (?=[\[`*_~&<>])                                          # быстрый пропуск обычного текста
+    (?:
+    \[(?P<link_text>[^\]\n]+)\]\((?P<link_url>[^)\s]+)\)    # [текст](url)
+  | `(?P<code>[^`\n]*)`                                      # `код`
+  | (?P<stars>\*+)                                           # ** и * (в т.ч. ***)
+  | (?P<marker>__|~~)                                        # маркеры форматирования
+  | (?P<entity>&(?:amp|lt|gt|quot|\#\d+|\#x[0-9a-fA-F]+);)   # готовые HTML-сущности
+  | (?P<special>[&<>])                                       # символы для экранирования
+    )
+""", re.VERBOSE)
+
+MARKER_TAGS = {
+    '**': 'b',
+    '*': 'i',
+    '__': 'u',
+    '~~': 's'
+}
+
+OPEN_TAGS = {marker: f'<{tag}>' for marker, tag in MARKER_TAGS.items()}
+CLOSE_TAGS = {marker: f'</{tag}>' for marker, tag in MARKER_TAGS.items()}
+
+ESCAPES = {
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;'
+}
+
+
+def escape_html(text, quote=False):
+    """Экранирование текста для Telegram HTML"""
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if quote:
+        text = text.replace('"', '&quot;')
+    return text
+
+
+def convert_markdown_to_html(text):
+    """Конвертация Markdown разметки в HTML для Telegram
+
+    Поддерживаются **жирный**, *курсив*, __подчеркнутый__, ~~зачеркнутый~~,
+    `моноширинный` текст и ссылки [текст](url). Как и раньше, форматирование
+    действует в пределах строки: непарные маркеры остаются обычным текстом.
+    """
+    if not text:
+        return text
+
+    out = []
+    # Открытые теги: (маркер, индекс открывающего тега в out)
+    stack = []
+    position = 0
+
+    for match in TOKEN_RE.finditer(text):
+        start = match.start()
+        if start > position:
+            chunk = text[position:start]
+            if stack and '\n' in chunk:
+                # Форматирование не переносится через строку
+                _revert_unclosed(out, stack)
+            out.append(chunk)
+        position = match.end()
+
+        kind = match.lastgroup
+        if kind == 'stars':
+            _toggle_stars(out, stack, match.group('stars'))
+        elif kind == 'marker':
+            _toggle_marker(out, stack, match.group('marker'))
+        elif kind == 'special':
+            out.append(ESCAPES[match.group('special')])
+        elif kind == 'entity':
+            out.append(match.group('entity'))
+        elif kind == 'code':
+            out.append(f"<code>{escape_html(match.group('code'))}</code>")
+        else:
+            link_text = convert_markdown_to_html(match.group('link_text'))
+            link_url = escape_html(match.group('link_url'), quote=True)
+            out.append(f'<a href="{link_url}">{link_text}</a>')
+
+    if position < len(text):
+        out.append(text[position:])
+    _revert_unclosed(out, stack)
+
+    return ''.join(out)
+
+
+def _toggle_stars(out, stack, stars):
+    """Разбор серии звездочек: *, ** или *** (жирный курсив)"""
+    if len(stars) > 3:
+        # Разделители вида "****" остаются текстом
+        out.append(stars)
+        return
+
+    if len(stars) < 3:
+        _toggle_marker(out, stack, stars)
+        return
+
+    # Для "***" порядок зависит от того, какой тег открыт последним
+    if stack and stack[-1][0] == '*':
+        markers = ('*', '**')
+    else:
+        markers = ('**', '*')
+    for marker in markers:
+        _toggle_marker(out, stack, marker)
+
+
+def _toggle_marker(out, stack, marker):
+    """Открытие или закрытие тега с сохранением корректной вложенности"""
+    if stack and stack[-1][0] == marker:
+        if stack[-1][1] == len(out) - 1:
+            # Пустая пара маркеров ("~~~~") остается текстом
+            stack.pop()
+            out[-1] = marker + marker
+        else:
+            stack.pop()
+            out.append(CLOSE_TAGS[marker])
+        return
+
+    depth = None
+    for i in range(len(stack) - 2, -1, -1):
+        if stack[i][0] == marker:
+            depth = i
+            break
+
+    if depth is None:
+        stack.append((marker, len(out)))
+        out.append(OPEN_TAGS[marker])
+        return
+
+    # Закрываем вложенные теги, затем сам тег, и заново открываем вложенные
+    inner = stack[depth + 1:]
+    del stack[depth:]
+    for inner_marker, _ in reversed(inner):
+        out.append(CLOSE_TAGS[inner_marker])
+    out.append(CLOSE_TAGS[marker])
+    for inner_marker, _ in inner:
+        stack.append((inner_marker, len(out)))
+        out.append(OPEN_TAGS[inner_marker])
+
+
+def _revert_unclosed(out, stack):
+    """Непарные маркеры превращаются обратно в текст"""
+    for marker, index in stack:
+        out[index] = marker
+    stack.clear()
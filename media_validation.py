@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Media Validation
+Проверка медиафайлов до публикации: файл, который Telegram не примет, лучше отбросить
+при подготовке поста, чем получить ошибку в момент публикации
+"""
+
+import os
+
+# Ограничения Bot API на загружаемые файлы
+PHOTO_MAX_BYTES = 10 * 1024 * 1024
+ANIMATION_MAX_BYTES = 50 * 1024 * 1024
+# Сумма ширины и высоты фото и максимальное соотношение сторон
+PHOTO_MAX_DIMENSIONS = 10000
+PHOTO_MAX_RATIO = 20
+
+
+def media_type_for(path):
+    """Тип медиа для публикации: GIF отправляется анимацией, остальное - фото"""
+    return 'animation' if path.lower().endswith('.gif') else 'photo'
+
+
+def validate_media(path):
+    """Причина, по которой Telegram не примет файл, или None, если файл можно публиковать"""
+    if not os.path.exists(path):
+        return 'file is missing'
+    size = os.path.getsize(path)
+    if size == 0:
+        return 'file is empty'
+    media_type = media_type_for(path)
+    limit = ANIMATION_MAX_BYTES if media_type == 'animation' else PHOTO_MAX_BYTES
+    if size > limit:
+        return f'file is too large ({size} bytes, limit {limit})'
+
+    try:
+        from PIL import Image
+    except ImportError:
+        # Без Pillow проверяем только размер файла
+        return None
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            image.verify()
+    except Exception as e:
+        return f'not a valid image: {e}'
+    if media_type == 'photo':
+        if width + height > PHOTO_MAX_DIMENSIONS:
+            return f'photo is too large ({width}x{height})'
+        if max(width, height) > PHOTO_MAX_RATIO * max(1, min(width, height)):
+            return f'unsupported photo aspect ratio ({width}x{height})'
+    return None
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Message Splitter
+Разбиение длинного Telegram HTML на части без разрыва тегов и сущностей
+"""
+
+import re
+from collections import deque
+
+# Лимиты Telegram (в единицах UTF-16 видимого текста, теги не учитываются)
+MAX_MESSAGE_LENGTH = 4096
+MAX_CAPTION_LENGTH = 1024
+
+HTML_TOKEN_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)[^>]*>|&[#a-zA-Z0-9]+;|[^<&]+|[<&]')
+WORD_RE = re.compile(r'\S*\s*')
+
+# Приоритеты точек разбиения: абзац > строка > предложение > слово
+BREAK_PARAGRAPH = 4
+BREAK_LINE = 3
+BREAK_SENTENCE = 2
+BREAK_WORD = 1
+
+OPEN, CLOSE, TEXT = 'open', 'close', 'text'
+
+
+def utf16_length(text):
+    """Длина строки в единицах UTF-16, как ее считает Telegram"""
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+def html_length(html):
+    """Видимая длина HTML в единицах UTF-16 (без тегов, сущность - один символ)"""
+    return sum(token[2] for token in tokenize_html(html))
+
+
+def _break_priority(word):
+    """Приоритет разбиения после слова (с учетом завершающих пробелов)"""
+    stripped = word.rstrip()
+    if stripped == word:
+        return 0
+    tail = word[len(stripped):]
+    if '\n\n' in tail:
+        return BREAK_PARAGRAPH
+    if '\n' in tail:
+        return BREAK_LINE
+    if stripped.endswith(('.', '!', '?', '…')):
+        return BREAK_SENTENCE
+    return BREAK_WORD
+
+
+def tokenize_html(html):
+    """Разбор HTML в поток атомов: (тип, raw, длина, тег, приоритет разбиения)"""
+    for match in HTML_TOKEN_RE.finditer(html):
+        raw = match.group(0)
+        tag = match.group(2)
+        if tag:
+            kind = CLOSE if match.group(1) else OPEN
+            yield (kind, raw, 0, tag.lower(), 0)
+        elif raw.startswith('&') and len(raw) > 1:
+            # Сущность (&amp; и т.п.) - один видимый символ
+            yield (TEXT, raw, 1, None, 0)
+        else:
+            for word in WORD_RE.findall(raw):
+                if word:
+                    yield (TEXT, word, utf16_length(word), None, _break_priority(word))
+
+
+def _cut_text(raw, limit):
+    """Разрез слова длиннее лимита по границе символа"""
+    length = 0
+    for index, char in enumerate(raw):
+        length += 2 if ord(char) > 0xFFFF else 1
+        if length > limit:
+            return raw[:index], raw[index:]
+    return raw, ''
+
+
+def split_html_message(html, limit=MAX_MESSAGE_LENGTH):
+    """Разбиение HTML на части не длиннее limit
+
+    Разрез выполняется по абзацам, затем по строкам, предложениям и словам.
+    Открытые теги закрываются в конце части и открываются заново в следующей,
+    поэтому каждая часть - самостоятельный корректный HTML.
+    """
+    return [body + closing for body, closing in _split(html, limit)]
+
+
+def truncate_html_message(html, limit=MAX_CAPTION_LENGTH, ellipsis='...'):
+    """Обрезка HTML до limit видимых символов с сохранением корректных тегов"""
+    parts = _split(html, limit)
+    if len(parts) <= 1:
+        return html
+    body, closing = _split(html, limit - utf16_length(ellipsis))[0]
+    return body.rstrip() + ellipsis + closing
+
+
+def _split(html, limit):
+    """Разбиение на части: список пар (тело части, закрывающие теги)"""
+    chunks = []
+    pending = deque(tokenize_html(html))
+
+    current = []        # атомы текущей части
+    length = 0          # видимая длина текущей части
+    stack = []          # открытые теги: (тег, raw открывающего тега)
+    candidates = {}     # приоритет -> (индекс в current, длина, снимок stack)
+
+    def emit(atoms, open_stack):
+        body = ''.join(atom[1] for atom in atoms)
+        closing = ''.join(f'</{tag}>' for tag, _ in reversed(open_stack))
+        if body.strip():
+            chunks.append((body, closing))
+
+    def reopen(open_stack):
+        return [(OPEN, raw, 0, tag, 0) for tag, raw in open_stack]
+
+    while pending:
+        atom = pending.popleft()
+        kind, raw, atom_length, tag, priority = atom
+
+        if kind == OPEN:
+            stack.append((tag, raw))
+            current.append(atom)
+            continue
+        if kind == CLOSE:
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == tag:
+                    del stack[i]
+                    break
+            current.append(atom)
+            continue
+
+        if length + atom_length <= limit:
+            current.append(atom)
+            length += atom_length
+            if priority:
+                candidates[priority] = (len(current), length, list(stack))
+            continue
+
+        # Атом не помещается - выбираем лучшую точку разбиения
+        split = None
+        for level in (BREAK_PARAGRAPH, BREAK_LINE, BREAK_SENTENCE, BREAK_WORD):
+            candidate = candidates.get(level)
+            if candidate and candidate[1] >= limit // 2:
+                split = candidate
+                break
+        if split is None and candidates:
+            split = max(candidates.values(), key=lambda c: c[1])
+
+        pending.appendleft(atom)
+        if split is not None:
+            index, _, split_stack = split
+            # Закрывающие теги сразу после точки разбиения оставляем в этой части
+            while index < len(current) and current[index][0] == CLOSE and split_stack \
+                    and split_stack[-1][0] == current[index][3]:
+                split_stack = split_stack[:-1]
+                index += 1
+            emit(current[:index], split_stack)
+            # Остаток текущей части переносим в следующую
+            pending.extendleft(reversed(current[index:]))
+            current = reopen(split_stack)
+            stack = list(split_stack)
+        elif length > 0:
+            emit(current, stack)
+            current = reopen(stack)
+        else:
+            # Одно слово длиннее лимита - режем по символам
+            pending.popleft()
+            head, tail = _cut_text(raw, limit)
+            current.append((TEXT, head, utf16_length(head), None, 0))
+            emit(current, stack)
+            current = reopen(stack)
+            if tail:
+                pending.appendleft((TEXT, tail, utf16_length(tail), None, priority))
+        length = 0
+        candidates = {}
+
+    emit(current, stack)
+    return chunks
+
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Near Duplicates
+Поиск одной и той же истории у разных источников по MinHash заголовка и лида
+"""
+
+import os
+import re
+import html
+import random
+import struct
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 32
+DEFAULT_THRESHOLD = 0.5
+# С какой вероятностью пара со сходством на пороге должна попасть в общую полосу LSH
+TARGET_RECALL = 0.98
+DEFAULT_WINDOW_DAYS = 14
+
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20250722)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+                for _ in range(NUM_PERMUTATIONS)]
+SIGNATURE = struct.Struct(f'<{NUM_PERMUTATIONS}Q')
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by',
+    'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'its', 'it', 'this', 'that',
+    'these', 'those', 'has', 'have', 'had', 'will', 'can', 'new', 'now', 'says', 'said',
+    'into', 'about', 'after', 'over', 'than', 'their', 'they', 'we', 'you', 'our', 'his', 'her',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS story_fingerprints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT,
+    signature BLOB NOT NULL,
+    published_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_story_fingerprints_published ON story_fingerprints (published_at);
+"""
+
+
+def normalize_words(text):
+    """Слова текста без HTML, регистра и стоп-слов"""
+    text = html.unescape(TAG_RE.sub(' ', text or '')).lower()
+    return [word for word in WORD_RE.findall(text) if word not in STOPWORDS and len(word) > 1]
+
+
+def fingerprint_story(title, lead=''):
+    """MinHash-подпись множества слов заголовка и лида (кортеж из NUM_PERMUTATIONS чисел)"""
+    words = set(normalize_words(title)) | set(normalize_words(lead))
+    if not words:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+              for word in words]
+    return tuple(min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in PERMUTATIONS)
+
+
+def band_rows_for(threshold):
+    """Длина полосы LSH для порога: наибольшая, при которой дубль на пороге находится с TARGET_RECALL
+
+    Пара попадает в общую полосу с вероятностью 1 - (1 - s^r)^b (r строк, b полос): чем длиннее
+    полоса, тем меньше лишних кандидатов, но тем выше сходство, с которого дубли находятся надежно.
+    """
+    for rows in (8, 4, 2):
+        if 1 - (1 - threshold ** rows) ** (NUM_PERMUTATIONS // rows) >= TARGET_RECALL:
+            return rows
+    return 1
+
+
+def similarity(signature_a, signature_b):
+    """Оценка коэффициента Жаккара по доле совпавших позиций подписей"""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERMUTATIONS
+
+
+class NearDuplicateIndex:
+    """LSH индекс подписей опубликованных историй всех источников
+
+    Подпись делится на полосы по band_rows значений; кандидатами считаются истории,
+    у которых совпала хотя бы одна полоса целиком, после чего сходство проверяется по всей
+    подписи. Длина полосы выбирается по порогу (для 0.5 - 16 полос по 2 строки), чтобы
+    дубли со сходством на пороге не терялись на этапе кандидатов. Поиск - несколько
+    обращений к словарю вместо перебора истории. Подписи хранятся в общей SQLite
+    базе состояния, в памяти - только окно последних дней.
+    """
+
+    def __init__(self, store, threshold=None, window_days=None):
+        self.store = store
+        self.threshold = threshold if threshold is not None else \
+            float(os.getenv('NEAR_DUPLICATE_THRESHOLD', DEFAULT_THRESHOLD))
+        self.window_days = window_days if window_days is not None else \
+            int(os.getenv('NEAR_DUPLICATE_WINDOW_DAYS', DEFAULT_WINDOW_DAYS))
+        self.band_rows = band_rows_for(self.threshold)
+        self.buckets = {}
+        self.last_id = 0
+        self.oldest = None
+        # Истории, которые сейчас публикуются скраперами этого процесса (url -> подпись)
+        self.pending = {}
+        with self.store.lock, self.store.conn:
+            self.store.conn.executescript(SCHEMA)
+        self.refresh()
+
+    def _band_keys(self, signature):
+        return [(start, signature[start:start + self.band_rows])
+                for start in range(0, NUM_PERMUTATIONS, self.band_rows)]
+
+    def _since(self):
+        return (datetime.now() - timedelta(days=self.window_days)).isoformat()
+
+    def refresh(self):
+        """Подгрузка подписей, добавленных с прошлого раза (в т.ч. другими процессами)"""
+        since = self._since()
+        if self.oldest is not None and self.oldest < since:
+            self._prune(since)
+        rows = self.store.query(
+            'SELECT id, url, source, title, signature, published_at FROM story_fingerprints '
+            'WHERE id > ? AND published_at >= ? ORDER BY id',
+            (self.last_id, since)
+        )
+        for row_id, url, source, title, signature, published_at in rows:
+            entry = (url, source, title, SIGNATURE.unpack(signature), published_at)
+            for key in self._band_keys(entry[3]):
+                self.buckets.setdefault(key, []).append(entry)
+            if self.oldest is None or published_at < self.oldest:
+                self.oldest = published_at
+            self.last_id = row_id
+
+    def _prune(self, since):
+        """Удаление из памяти подписей, вышедших из окна (для долгоживущего процесса)"""
+        for key in list(self.buckets):
+            entries = [entry for entry in self.buckets[key] if entry[4] >= since]
+            if entries:
+                self.buckets[key] = entries
+            else:
+                del self.buckets[key]
+        self.oldest = min((entry[4] for entries in self.buckets.values() for entry in entries), default=None)
+
+    def find(self, signature):
+        """Самая похожая опубликованная история со сходством не ниже порога или None"""
+        if signature is None:
+            return None
+        self.refresh()
+        since = self._since()
+        best = None
+        for key in self._band_keys(signature):
+            for url, source, title, candidate, published_at in self.buckets.get(key, ()):
+                if published_at < since:
+                    continue
+                score = similarity(signature, candidate)
+                if score >= self.threshold and (best is None or score > best['similarity']):
+                    best = {'url': url, 'source': source, 'title': title, 'similarity': score}
+        for url, source, title, candidate in self.pending.values():
+            score = similarity(signature, candidate)
+            if score >= self.threshold and (best is None or score > best['similarity']):
+                best = {'url': url, 'source': source, 'title': title, 'similarity': score}
+        return best
+
+    def reserve(self, url, source, title, signature):
+        """Резерв истории на время публикации, False - если она уже опубликована или публикуется
+
+        Проверка и резерв выполняются без await, поэтому в одном event loop два скрапера
+        не могут одновременно взять одну историю.
+        """
+        if signature is None:
+            return True
+        if self.find(signature):
+            return False
+        self.pending[url] = (url, source, title, signature)
+        return True
+
+    def release(self, url):
+        """Снятие резерва (после публикации история уже сохранена в базе)"""
+        self.pending.pop(url, None)
+
+    def add(self, url, source, title, signature, published_at=None):
+        """Сохранение подписи опубликованной истории"""
+        self.add_many([(url, source, title, signature)], published_at)
+
+    def add_many(self, stories, published_at=None):
+        """Пакетное сохранение подписей историй (url, source, title, signature) в одной транзакции"""
+        published_at = published_at or datetime.now().isoformat()
+        rows = [(url, source, title, SIGNATURE.pack(*signature), published_at)
+                for url, source, title, signature in stories if signature is not None]
+        if not rows:
+            return
+        self.store.executemany(
+            'INSERT INTO story_fingerprints (url, source, title, signature, published_at) VALUES (?, ?, ?, ?, ?)',
+            rows
+        )
+        self.refresh()
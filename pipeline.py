@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pipeline
+Асинхронный конвейер: этапы соединены ограниченными очередями, у каждого этапа свой
+лимит параллельности. Элементы проходят этапы независимо друг от друга.
+"""
+
+import os
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 2
+
+# Маркер конца потока: каждый обработчик этапа получает свой
+_DONE = object()
+
+
+class Stage:
+    """Этап конвейера
+
+    handler - корутина handler(item): результат передается следующему этапу,
+    None - элемент отбрасывается. Исключение обработчика отбрасывает только этот элемент.
+    concurrency - сколько элементов этап обрабатывает одновременно,
+    queue_size - емкость входной очереди (заполненная очередь останавливает предыдущий этап).
+    """
+
+    def __init__(self, name, handler, concurrency=1, queue_size=DEFAULT_QUEUE_SIZE):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency))
+        self.queue_size = max(1, int(queue_size))
+
+    @classmethod
+    def from_env(cls, name, handler, concurrency=1, queue_size=None):
+        """Лимиты из окружения: PIPELINE_<ЭТАП>_CONCURRENCY и PIPELINE_QUEUE_SIZE"""
+        concurrency = int(os.getenv(f'PIPELINE_{name.upper()}_CONCURRENCY', concurrency))
+        if queue_size is None:
+            queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+        return cls(name, handler, concurrency, queue_size)
+
+
+class StageStats:
+    """Счетчики этапа: обработано, отброшено, ошибок, суммарное время обработки"""
+
+    def __init__(self):
+        self.passed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    def as_dict(self):
+        return {'passed': self.passed, 'dropped': self.dropped, 'failed': self.failed,
+                'busy_seconds': round(self.busy_seconds, 3)}
+
+
+class Pipeline:
+    """Конвейер из последовательных этапов с ограниченными очередями между ними"""
+
+    def __init__(self, stages, name='pipeline'):
+        self.stages = list(stages)
+        self.name = name
+        self.stats = {stage.name: StageStats() for stage in self.stages}
+
+    async def _worker(self, index, queues, remaining, results):
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        inbox = queues[index]
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                break
+            started = time.monotonic()
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                logger.error(f"{self.name}: stage '{stage.name}' failed: {e}")
+                stats.failed += 1
+                continue
+            finally:
+                stats.busy_seconds += time.monotonic() - started
+            if result is None:
+                stats.dropped += 1
+                continue
+            stats.passed += 1
+            if index + 1 < len(self.stages):
+                await queues[index + 1].put(result)
+            else:
+                results.append(result)
+
+        # Последний завершившийся обработчик закрывает поток для следующего этапа
+        remaining[index] -= 1
+        if remaining[index] == 0 and index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].concurrency):
+                await queues[index + 1].put(_DONE)
+
+    async def run(self, items):
+        """Прогон элементов через все этапы, результаты последнего этапа в порядке завершения"""
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        remaining = [stage.concurrency for stage in self.stages]
+        results = []
+        workers = [asyncio.ensure_future(self._worker(index, queues, remaining, results))
+                   for index, stage in enumerate(self.stages)
+                   for _ in range(stage.concurrency)]
+        try:
+            for item in items:
+                await queues[0].put(item)
+            for _ in range(self.stages[0].concurrency):
+                await queues[0].put(_DONE)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        logger.info(f"{self.name}: stage stats {self.stats_dict()}")
+        return results
+
+    def stats_dict(self):
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
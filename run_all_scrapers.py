@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Запуск всех скраперов
+Все источники в одном процессе и одном event loop с общими клиентами HTTP, OpenRouter и Telegram
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import platform
+from dotenv import load_dotenv
+from scraper_clients import ScraperClients
+from base_scraper import load_sources
+from telegram_publisher import load_channel_targets
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+REQUIRED_ENV_VARS = ['OPENROUTER_API_KEY', 'TELEGRAM_BOT_TOKEN']
+# Каналы задаются любым из способов load_channel_targets
+CHANNEL_ENV_VARS = 'TELEGRAM_CHANNEL_ID / TELEGRAM_CHANNEL_IDS / TELEGRAM_CHANNELS_CONFIG'
+# Сколько ждать отправки оставшихся сообщений Telegram при завершении
+SHUTDOWN_TIMEOUT = 30
+
+
+def missing_env_vars():
+    """Незаданные обязательные переменные окружения (для каналов - хотя бы один способ)"""
+    missing = [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
+    if not load_channel_targets():
+        missing.append(CHANNEL_ENV_VARS)
+    return missing
+
+
+def create_scrapers(sources, clients, max_posts=None):
+    """Скраперы источников с общими клиентами и базой состояния"""
+    registry = load_sources()
+    scrapers = {source: registry[source](clients=clients) for source in sources}
+    if max_posts:
+        for scraper in scrapers.values():
+            scraper.max_posts = max(1, max_posts)
+    return scrapers
+
+
+async def close_clients(clients):
+    """Отправка оставшихся сообщений и закрытие соединений"""
+    try:
+        await asyncio.wait_for(clients.close(), timeout=SHUTDOWN_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Error while closing shared clients: {e}")
+
+
+async def run_source(source, scraper, **options):
+    """Один запуск источника: {'success', 'elapsed', 'error'}
+
+    options - режим запуска run_daily_scraping (prepare_ahead, ready_only).
+    """
+    started = time.monotonic()
+    error = None
+    try:
+        success = await scraper.run_daily_scraping(**options)
+    except Exception as e:
+        logger.error(f"{source}: run failed: {e}")
+        success, error = False, str(e)
+    return {'success': bool(success), 'elapsed': time.monotonic() - started, 'error': error}
+
+
+async def run_all(scrapers, **options):
+    """Параллельный запуск всех источников, результаты по источникам"""
+    results = await asyncio.gather(*[run_source(source, scraper, **options)
+                                     for source, scraper in scrapers.items()])
+    return dict(zip(scrapers, results))
+
+
+def print_results(results, prepare_ahead=False):
+    print("📊 Результаты по источникам:")
+    for source, result in results.items():
+        if result['error']:
+            status = f"❌ ошибка: {result['error']}"
+        elif result['success']:
+            status = "✅ посты подготовлены" if prepare_ahead else "✅ пост опубликован"
+        else:
+            status = "📝 без публикации (нет новых статей или ошибка, см. лог)"
+        print(f"  - {source}: {status} ({result['elapsed']:.1f} с)")
+
+
+async def main(argv=None):
+    registry = load_sources()
+    parser = argparse.ArgumentParser(description="🚀 Запуск всех скраперов в одном процессе")
+    parser.add_argument('--source', action='append', choices=list(registry),
+                        help='Запускать только этот источник (можно указать несколько раз)')
+    parser.add_argument('--max-posts', type=int, metavar='N',
+                        help='Сколько постов публиковать за запуск каждого источника (MAX_POSTS_PER_RUN)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--prepare-ahead', action='store_true',
+                      help='Подготовить посты заранее в очередь готовых, не публикуя их')
+    mode.add_argument('--publish-ready', action='store_true',
+                      help='Опубликовать только готовые посты (без поиска статей и запросов к модели)')
+    args = parser.parse_args(argv)
+
+    missing_vars = missing_env_vars()
+    if missing_vars:
+        print(f"❌ Отсутствуют обязательные переменные окружения: {', '.join(missing_vars)}")
+        print("📝 Создайте файл .env на основе config.env.example")
+        sys.exit(1)
+
+    sources = args.source or list(registry)
+    print(f"🚀 Запуск скраперов: {', '.join(sources)}")
+    clients = ScraperClients()
+    try:
+        results = await run_all(create_scrapers(sources, clients, args.max_posts),
+                                prepare_ahead=args.prepare_ahead, ready_only=args.publish_ready)
+    finally:
+        await close_clients(clients)
+    print_results(results, args.prepare_ahead)
+    if not any(result['success'] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if platform.system() == 'Windows':
+        # Используем SelectEventLoop для Windows чтобы избежать проблем с ProactorEventLoop
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        print("\n⏹️ Скрапинг прерван пользователем")
+        sys.exit(0)
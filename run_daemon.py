@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Запуск скраперов в режиме демона
+Долгоживущий процесс: скраперы остаются в памяти и запускаются по расписанию,
+HTTP соединения, кеши и база состояния не пересоздаются между запусками
+"""
+
+import os
+import sys
+import time
+import signal
+import random
+import asyncio
+import logging
+import argparse
+import platform
+from dotenv import load_dotenv
+from scraper_clients import ScraperClients
+from run_all_scrapers import missing_env_vars, create_scrapers, close_clients
+from base_scraper import load_sources
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MINUTES = 24 * 60
+DEFAULT_JITTER_MINUTES = 10
+
+
+def load_schedule(sources=None):
+    """Интервалы запуска в секундах: DAEMON_INTERVAL_<ИСТОЧНИК> или общий DAEMON_INTERVAL_MINUTES"""
+    default = float(os.getenv('DAEMON_INTERVAL_MINUTES', DEFAULT_INTERVAL_MINUTES))
+    schedule = {}
+    for source in sources or load_sources():
+        minutes = float(os.getenv(f'DAEMON_INTERVAL_{source.upper()}', default))
+        schedule[source] = max(1.0, minutes) * 60
+    return schedule
+
+
+def load_jitter():
+    """Разброс времени запуска в секундах (DAEMON_JITTER_MINUTES)"""
+    return max(0.0, float(os.getenv('DAEMON_JITTER_MINUTES', DEFAULT_JITTER_MINUTES))) * 60
+
+
+def next_delay(interval, jitter, rng=random):
+    """Пауза до следующего запуска: интервал со случайным сдвигом в пределах +-jitter"""
+    return max(0.0, interval + rng.uniform(-jitter, jitter))
+
+
+class ScraperDaemon:
+    """Планировщик внутри процесса: своя задача на каждый источник
+
+    Источники работают одновременно (общие клиенты, как в run_all_scrapers), поэтому медленный
+    источник не задерживает остальные. Следующий запуск отсчитывается от начала предыдущего:
+    интервал не растет на время работы, а запуски одного источника не пересекаются.
+
+    Первый сигнал остановки (SIGTERM/SIGINT) дает текущему запуску завершиться,
+    второй - прерывает его.
+    """
+
+    def __init__(self, scrapers, schedule, jitter=0.0, run_on_start=True, rng=None):
+        self.scrapers = scrapers
+        self.schedule = schedule
+        self.jitter = jitter
+        self.run_on_start = run_on_start
+        self.rng = rng or random.Random()
+        self.runs = {source: 0 for source in scrapers}
+        self.stop_event = None
+        self.tasks = []
+
+    def stop(self):
+        """Остановка по сигналу"""
+        if self.stop_event is None:
+            return
+        if self.stop_event.is_set():
+            logger.warning("Second shutdown signal, cancelling current run")
+            for task in self.tasks:
+                task.cancel()
+            return
+        logger.info("Shutdown requested, waiting for the current run to finish")
+        self.stop_event.set()
+
+    def install_signal_handlers(self):
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # Windows: обработчики сигналов цикла событий не поддерживаются
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(self.stop))
+
+    async def _wait(self, seconds):
+        """Ожидание следующего запуска, True - если пришла команда остановки"""
+        if self.stop_event.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=max(seconds, 0.001))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def run_source(self, source):
+        scraper = self.scrapers[source]
+        interval = self.schedule[source]
+        delay = 0 if self.run_on_start else next_delay(interval, self.jitter, self.rng)
+        while not await self._wait(delay):
+            logger.info(f"Daemon: starting {source} run #{self.runs[source] + 1}")
+            started = time.monotonic()
+            try:
+                success = await scraper.run_daily_scraping()
+            except Exception as e:
+                logger.error(f"Daemon: {source} run failed: {e}")
+                success = False
+            self.runs[source] += 1
+            finished = time.monotonic()
+            # Запуск дольше интервала: следующий начинается сразу
+            delay = max(0.0, started + next_delay(interval, self.jitter, self.rng) - finished)
+            logger.info(f"Daemon: {source} run finished in {finished - started:.1f}s "
+                        f"({'published' if success else 'nothing published'}), "
+                        f"next run in {delay / 60:.1f} min")
+
+    async def run(self, install_signals=True):
+        """Работа до сигнала остановки"""
+        self.stop_event = asyncio.Event()
+        if install_signals:
+            self.install_signal_handlers()
+        self.tasks = [asyncio.ensure_future(self.run_source(source)) for source in self.scrapers]
+        results = await asyncio.gather(*self.tasks, return_exceptions=True)
+        for source, result in zip(self.scrapers, results):
+            if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+                logger.error(f"Daemon: {source} scheduler stopped with error: {result}")
+        logger.info(f"Daemon stopped, runs: {self.runs}")
+
+
+async def main(argv=None):
+    registry = load_sources()
+    parser = argparse.ArgumentParser(description="🕒 Скраперы в режиме демона")
+    parser.add_argument('--source', action='append', choices=list(registry),
+                        help='Запускать только этот источник (можно указать несколько раз)')
+    parser.add_argument('--max-posts', type=int, metavar='N',
+                        help='Сколько постов публиковать за запуск каждого источника (MAX_POSTS_PER_RUN)')
+    parser.add_argument('--wait-first', action='store_true',
+                        help='Не запускать скраперы сразу, а дождаться первого интервала')
+    args = parser.parse_args(argv)
+
+    missing_vars = missing_env_vars()
+    if missing_vars:
+        print(f"❌ Отсутствуют обязательные переменные окружения: {', '.join(missing_vars)}")
+        print("📝 Создайте файл .env на основе config.env.example")
+        sys.exit(1)
+
+    sources = args.source or list(registry)
+    schedule = load_schedule(sources)
+    clients = ScraperClients()
+    scrapers = create_scrapers(sources, clients, args.max_posts)
+
+    print("🚀 Скраперы запущены в режиме демона")
+    for source in sources:
+        print(f"   - {source}: каждые {schedule[source] / 60:.0f} мин")
+    daemon = ScraperDaemon(scrapers, schedule, jitter=load_jitter(), run_on_start=not args.wait_first)
+    try:
+        await daemon.run()
+    finally:
+        await close_clients(clients)
+    print("⏹️ Демон остановлен")
+
+
+if __name__ == "__main__":
+    if platform.system() == 'Windows':
+        # Используем SelectEventLoop для Windows чтобы избежать проблем с ProactorEventLoop
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main(sys.argv[1:]))
@@ -11,7 +11,13 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ieee_spectrum_scraper import run_with_proper_cleanup
+from run_all_scrapers import missing_env_vars
 
 if __name__ == "__main__":
     print("🚀 Запуск IEEE Spectrum Scraper...")
+    missing_vars = missing_env_vars()
+    if missing_vars:
+        print(f"❌ Отсутствуют обязательные переменные окружения: {', '.join(missing_vars)}")
+        print("📝 Создайте файл .env на основе config.env.example")
+        sys.exit(1)
     run_with_proper_cleanup() 
\ No newline at end of file
@@ -6,9 +6,9 @@
 
 import asyncio
 import sys
-import os
 import platform
 from techcrunch_scraper import TechCrunchScraper
+from run_all_scrapers import missing_env_vars
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,18 +18,8 @@ async def main():
     try:
         print("🚀 Запуск TechCrunch Scraper...")
         
-        # Проверяем наличие переменных окружения
-        required_env_vars = [
-            'OPENROUTER_API_KEY',
-            'TELEGRAM_BOT_TOKEN', 
-            'TELEGRAM_CHANNEL_ID'
-        ]
-        
-        missing_vars = []
-        for var in required_env_vars:
-            if not os.getenv(var):
-                missing_vars.append(var)
-        
+        # Проверяем наличие переменных окружения (каналы - любым из способов)
+        missing_vars = missing_env_vars()
         if missing_vars:
             print(f"❌ Отсутствуют обязательные переменные окружения: {', '.join(missing_vars)}")
             print("📝 Создайте файл .env на основе config.env.example")
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Запуск узла распределенной обработки
+Поиск, извлечение и создание постов выполняются задачами общей очереди (work_queue.py)
+на любом числе узлов; публикует только один узел - держатель блокировки publisher
+"""
+
+import os
+import sys
+import socket
+import asyncio
+import logging
+import argparse
+import platform
+from datetime import datetime
+from dotenv import load_dotenv
+from async_utils import run_blocking
+from scraper_clients import ScraperClients
+from run_all_scrapers import missing_env_vars, create_scrapers, close_clients
+from base_scraper import load_sources
+from work_queue import open_work_queue, create_server, DEFAULT_LEASE_SECONDS, DEFAULT_PORT
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Виды задач узла-обработчика; publish выполняет только публикатор
+WORKER_KINDS = ('discover', 'extract', 'generate')
+PUBLISH_KIND = 'publish'
+# Отметки об отправленных постах: создаются сразу завершенными и никогда не выдаются узлам
+SENT_KIND = 'published'
+PUBLISHER_LOCK = 'publisher'
+DEFAULT_CONCURRENCY = 4
+DEFAULT_IDLE_SECONDS = 5
+# Повторы вызовов очереди при сбое сети или сервера очереди
+QUEUE_RETRIES = 3
+
+
+def enqueue_discovery(queue, sources, slot=None):
+    """Задачи поиска статей для источников; slot (по умолчанию текущая минута) защищает от повтора"""
+    slot = slot or datetime.now().strftime('%Y-%m-%dT%H:%M')
+    return [source for source in sources if queue.put('discover', f'{source}:{slot}', {'source': source})]
+
+
+class QueueWorker:
+    """Обработчик задач очереди на одном узле
+
+    Задачи проходят цепочку discover → extract → generate → publish; ключ задачи - URL статьи,
+    поэтому статья, найденная несколькими узлами, обрабатывается один раз. Пока задача
+    выполняется, аренда продлевается; задача упавшего узла достается другому после истечения аренды.
+    publisher=True - узел выполняет только publish и лишь пока держит блокировку publisher.
+    """
+
+    def __init__(self, queue, scrapers, worker_id=None, publisher=False, concurrency=DEFAULT_CONCURRENCY,
+                 lease_seconds=DEFAULT_LEASE_SECONDS, idle_seconds=DEFAULT_IDLE_SECONDS):
+        self.queue = queue
+        self.scrapers = scrapers
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.publisher = publisher
+        # Публикация последовательная, как и в обычном запуске
+        self.concurrency = 1 if publisher else max(1, concurrency)
+        self.kinds = (PUBLISH_KIND,) if publisher else WORKER_KINDS
+        self.lease_seconds = lease_seconds
+        self.idle_seconds = idle_seconds
+        self.processed = {kind: 0 for kind in self.kinds}
+
+    def task_key(self, source, article):
+        return f"{source}:{article['link']}"
+
+    # --- Обработчики задач ---
+
+    async def handle_discover(self, scraper, task):
+        """Поиск и выбор статей источника: задачи extract для max_posts лучших"""
+        source = task.payload['source']
+        scraper.start_run()
+        articles = await run_blocking(scraper.fetch_articles)
+        articles = scraper.filter_unpublished_articles(articles or [])
+        # Статьи, которые уже взял в работу любой узел, в выбор не попадают
+        known = await self.call_queue('known_keys', 'extract',
+                                      [self.task_key(source, article) for article in articles])
+        articles = [article for article in articles if self.task_key(source, article) not in known]
+        articles = scraper.filter_near_duplicates(articles)
+        if not articles:
+            logger.info(f"{source}: no new articles to queue")
+            return
+        selected = await run_blocking(scraper.rank_articles, articles, scraper.max_posts)
+        for article in selected:
+            await self.call_queue('put', 'extract', self.task_key(source, article),
+                                  {'source': source, 'article': article})
+        logger.info(f"{source}: queued {len(selected)} articles for extraction")
+
+    async def handle_extract(self, scraper, task):
+        """Текст и медиа статьи"""
+        article = task.payload['article']
+        article_data = await run_blocking(scraper.scrape_article, article['link'])
+        if not article_data['content']:
+            raise ValueError(f"failed to scrape article content: {article['link']}")
+        await self.call_queue('put', 'generate', task.key, dict(task.payload, **article_data))
+
+    async def handle_generate(self, scraper, task):
+        """Пост с AI; медиафайл скачивает публикатор (файлы узлов не общие)"""
+        article = task.payload['article']
+        post_content = await run_blocking(scraper.create_viral_post, article['title'], task.payload['content'],
+                                          article['link'], article.get('topic'))
+        if not post_content:
+            raise ValueError("failed to create viral post")
+        await self.call_queue('put', PUBLISH_KIND, task.key, dict(task.payload, post_content=post_content))
+
+    async def handle_publish(self, scraper, task):
+        """Публикация и учет (база опубликованного ведется только на узле публикатора)"""
+        article = task.payload['article']
+        payload_item = {field: task.payload.get(field)
+                        for field in ('article', 'content', 'media_url', 'post_content')}
+        # Отметка об отправке хранится в очереди и видна публикатору на любом узле:
+        # прошлый публикатор мог упасть после отправки, не успев завершить задачу
+        if await self.call_queue('known_keys', SENT_KIND, [task.key]):
+            logger.warning(f"Post was already sent by another publisher: {article['title']}")
+            if not scraper.is_url_published(article['link']):
+                scraper.record_published([self.checkpoint_for(scraper, article['link']) or payload_item])
+            return
+        if scraper.is_url_published(article['link']) or not scraper.filter_near_duplicates([article]):
+            logger.info(f"Story is already published, skipping: {article['title']}")
+            return
+        # Контрольная точка прошлой попытки на этом узле: пост ушел в канал, отметка не записана
+        item = self.checkpoint_for(scraper, article['link'])
+        if item and item['stage'] == 'publish':
+            logger.warning(f"Recording post published by an interrupted attempt: {article['title']}")
+            await self.mark_sent(task)
+            scraper.record_published([item])
+            return
+        if not scraper.reserve_story(article):
+            raise ValueError(f"story is being published by another source: {article['title']}")
+        if item is None:
+            item = dict(payload_item, media_urls=task.payload.get('media_urls') or [], media_paths=[])
+        try:
+            item = await scraper.stage_prepare(item)
+            if item:
+                await scraper.wait_post_spacing()
+            # Аренда могла истечь, пока скачивался медиафайл или шла пауза между постами:
+            # тогда задачу уже взял другой узел. Продление прямо перед отправкой дает
+            # отправке полный срок аренды
+            if task.lost or not await self.keep_lease(task):
+                raise RuntimeError("lease lost before publishing")
+            published = await scraper.stage_publish(item) if item else None
+            if published is None:
+                raise RuntimeError("failed to publish, the post is kept for a retry")
+            # Отметка пишется и при потерянной аренде: пост уже в канале, и новый
+            # держатель задачи должен ее увидеть, чтобы не отправить пост еще раз
+            if task.lost:
+                logger.warning(f"Lease expired while sending, recording the post anyway: {task}")
+            await self.mark_sent(task)
+            scraper.record_published([published])
+        finally:
+            scraper.remove_media_files([path for path in (item or {}).get('media_paths', [])
+                                        if not scraper.checkpoints.holds(path)])
+            scraper.release_story(article)
+
+    async def mark_sent(self, task):
+        """Отметка об отправке поста в общей очереди (завершенная задача вида SENT_KIND)"""
+        await self.call_queue('put', SENT_KIND, task.key, {'worker': self.worker_id}, 0, True)
+
+    @staticmethod
+    def checkpoint_for(scraper, url):
+        for item in scraper.checkpoints.pending(scraper.source_name):
+            if item['article']['link'] == url:
+                return item
+        return None
+
+    # --- Аренда и цикл обработки ---
+
+    async def call_queue(self, method, *args):
+        """Вызов метода очереди с повтором: сетевой сбой не должен терять результат задачи
+
+        Повторяются только вызовы, которые безопасно выполнить дважды (put, known_keys,
+        complete и fail - по ключу задачи и токену аренды).
+        """
+        for attempt in range(1, QUEUE_RETRIES + 1):
+            try:
+                return await run_blocking(getattr(self.queue, method), *args)
+            except Exception as e:
+                if attempt == QUEUE_RETRIES:
+                    raise
+                logger.warning(f"Work queue call {method} failed (attempt {attempt}/{QUEUE_RETRIES}): {e}")
+                await asyncio.sleep(self.idle_seconds * attempt)
+
+    async def keep_lease(self, task):
+        """Продление аренды задачи (и блокировки публикатора), False - аренда потеряна"""
+        renewed = await run_blocking(self.queue.heartbeat, task, self.lease_seconds)
+        if renewed and self.publisher:
+            renewed = await run_blocking(self.queue.acquire_lock, PUBLISHER_LOCK, self.worker_id,
+                                         self.lease_seconds)
+        if not renewed:
+            task.lost = True
+            logger.warning(f"Lease lost: {task}")
+        return renewed
+
+    async def heartbeat_loop(self, task):
+        while not task.lost:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.keep_lease(task)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for {task}: {e}")
+
+    async def run_task(self, task):
+        """Выполнение задачи с продлением аренды, True - задача завершена"""
+        heartbeat = asyncio.ensure_future(self.heartbeat_loop(task))
+        try:
+            scraper = self.scrapers.get(task.payload.get('source'))
+            if scraper is None:
+                raise ValueError(f"source is not enabled on this node: {task.payload.get('source')}")
+            await getattr(self, f'handle_{task.kind}')(scraper, task)
+        except Exception as e:
+            logger.error(f"Task {task} failed (attempt {task.attempts}): {e}")
+            await self.call_queue('fail', task, e)
+            return False
+        finally:
+            heartbeat.cancel()
+        if not await self.call_queue('complete', task):
+            logger.warning(f"Task {task} finished after its lease expired")
+            return False
+        self.processed[task.kind] += 1
+        return True
+
+    async def claim(self):
+        """Следующая задача узла или None (публикатор без блокировки задач не берет)"""
+        if self.publisher and not await run_blocking(self.queue.acquire_lock, PUBLISHER_LOCK, self.worker_id,
+                                                     self.lease_seconds):
+            return None
+        return await run_blocking(self.queue.claim, self.kinds, self.worker_id, self.lease_seconds)
+
+    async def slot_loop(self, stop_event, once):
+        while not stop_event.is_set():
+            try:
+                task = await self.claim()
+                if task is not None:
+                    await self.run_task(task)
+                    continue
+            except Exception as e:
+                # Сервер очереди недоступен: узел ждет и пробует снова, задачи вернутся по истечении аренды
+                logger.error(f"Work queue error: {e}")
+            if once:
+                return
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.idle_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, stop_event=None, once=False):
+        """Обработка задач до остановки; once - до первой пустой выборки (тесты, cron)"""
+        stop_event = stop_event or asyncio.Event()
+        try:
+            await asyncio.gather(*[self.slot_loop(stop_event, once) for _ in range(self.concurrency)])
+        finally:
+            if self.publisher:
+                try:
+                    await run_blocking(self.queue.release_lock, PUBLISHER_LOCK, self.worker_id)
+                except Exception as e:
+                    # Блокировка освободится сама, когда истечет аренда
+                    logger.warning(f"Could not release the publisher lock: {e}")
+        logger.info(f"Worker {self.worker_id} stopped, processed: {self.processed}")
+        return self.processed
+
+
+async def run_node(args, sources, publisher):
+    """Узел-обработчик или публикатор до сигнала остановки"""
+    clients = ScraperClients()
+    queue = open_work_queue(store=clients.state_store)
+    worker = QueueWorker(queue, create_scrapers(sources, clients, args.max_posts), publisher=publisher,
+                         concurrency=args.concurrency)
+    stop_event = asyncio.Event()
+    try:
+        loop = asyncio.get_event_loop()
+        for sig in ('SIGTERM', 'SIGINT'):
+            try:
+                import signal
+                loop.add_signal_handler(getattr(signal, sig), stop_event.set)
+            except (NotImplementedError, AttributeError):
+                # Windows: остановка по Ctrl+C (KeyboardInterrupt)
+                pass
+        print(f"🚀 {'Публикатор' if publisher else 'Обработчик'} {worker.worker_id}: {', '.join(sources)}")
+        await worker.run(stop_event)
+    finally:
+        await close_clients(clients)
+
+
+def serve(host, port):
+    """Сервер очереди до Ctrl+C или SIGTERM
+
+    serve_forever работает в главном потоке: KeyboardInterrupt прерывает его напрямую,
+    а в потоке пула его было бы нечем остановить (процесс не завершался бы).
+    """
+    import signal
+    server = create_server(open_work_queue(''), host, port)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"🌐 Сервер очереди: http://{host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ Сервер очереди остановлен")
+    finally:
+        server.server_close()
+
+
+def parse_args(argv=None):
+    registry = load_sources()
+    parser = argparse.ArgumentParser(description="🌐 Узел распределенной обработки (WORK_QUEUE_URL)")
+    parser.add_argument('command', choices=['serve', 'discover', 'work', 'publish', 'stats'],
+                        help='serve - сервер очереди, discover - поставить задачи поиска, '
+                             'work - обработчик, publish - публикатор, stats - состояние очереди')
+    parser.add_argument('--source', action='append', choices=list(registry),
+                        help='Только этот источник (можно указать несколько раз)')
+    parser.add_argument('--max-posts', type=int, metavar='N',
+                        help='Сколько статей ставить в работу за поиск (MAX_POSTS_PER_RUN)')
+    parser.add_argument('--concurrency', type=int,
+                        default=int(os.getenv('WORKER_CONCURRENCY', DEFAULT_CONCURRENCY)),
+                        help='Сколько задач узел выполняет одновременно (WORKER_CONCURRENCY)')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес сервера очереди')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Порт сервера очереди')
+    args = parser.parse_args(argv)
+    args.sources = args.source or list(registry)
+    return args
+
+
+async def main(args):
+    sources = args.sources
+    if args.command in ('discover', 'stats'):
+        queue = open_work_queue()
+        if args.command == 'discover':
+            queued = enqueue_discovery(queue, sources)
+            print(f"🔎 Поставлены задачи поиска: {', '.join(queued) or 'нет (уже в очереди)'}")
+        else:
+            for kind, counts in sorted(queue.stats().items()):
+                print(f"  - {kind}: {', '.join(f'{status} {count}' for status, count in sorted(counts.items()))}")
+        return
+
+    missing_vars = missing_env_vars()
+    if missing_vars:
+        print(f"❌ Отсутствуют обязательные переменные окружения: {', '.join(missing_vars)}")
+        print("📝 Создайте файл .env на основе config.env.example")
+        sys.exit(1)
+    await run_node(args, sources, publisher=args.command == 'publish')
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.command == 'serve':
+        # Сервер очереди работает без event loop: asyncio.run перехватывает Ctrl+C сам
+        serve(args.host, args.port)
+        sys.exit(0)
+    if platform.system() == 'Windows':
+        # Используем SelectEventLoop для Windows чтобы избежать проблем с ProactorEventLoop
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("\n⏹️ Узел остановлен")
+        sys.exit(0)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Scraper Clients
+Клиенты и хранилища, общие для всех скраперов процесса
+"""
+
+import os
+import requests
+from state_store import StateStore
+from near_duplicates import NearDuplicateIndex
+from telegram_queue import TelegramSendQueue
+
+
+class ScraperClients:
+    """HTTP сессия, база состояния, индекс почти-дублей, клиенты OpenRouter и Telegram
+
+    Один экземпляр передается всем скраперам процесса: соединения (keep-alive, TLS),
+    очередь отправки с лимитами Telegram и резервы публикуемых историй становятся общими.
+    Клиенты OpenRouter и Telegram создаются при первом обращении: импорт openai и telegram
+    занимает большую часть времени старта, а запуску без новых статей они не нужны.
+    """
+
+    def __init__(self, state_store=None, http_session=None):
+        self.state_store = state_store or StateStore()
+        self.http = http_session or requests.Session()
+        self.send_queue = TelegramSendQueue.from_env()
+        self._near_duplicates = None
+        self._openai_client = None
+        self._telegram_bot = None
+
+    @property
+    def near_duplicates(self):
+        if self._near_duplicates is None:
+            self._near_duplicates = NearDuplicateIndex(self.state_store)
+        return self._near_duplicates
+
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            from openai import OpenAI
+            self._openai_client = OpenAI(
+                api_key=os.getenv('OPENROUTER_API_KEY'),
+                base_url=os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
+            )
+        return self._openai_client
+
+    @property
+    def telegram_bot(self):
+        if self._telegram_bot is None:
+            from telegram import Bot
+            self._telegram_bot = Bot(token=os.getenv('TELEGRAM_BOT_TOKEN'))
+        return self._telegram_bot
+
+    async def close(self):
+        """Отправка оставшихся сообщений и закрытие соединений"""
+        await self.send_queue.close()
+        if self._telegram_bot is not None:
+            await self._telegram_bot.shutdown()
+        self.http.close()
+        self.state_store.close()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+State Store
+Общее хранилище состояния скраперов на SQLite (WAL): опубликованные URL и т.п.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from url_canon import url_hash
+from bloom_filter import BloomFilter
+from atomic_io import file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'scraper_state.db'
+DEFAULT_BLOOM_FP_RATE = 0.001
+MIN_BLOOM_CAPACITY = 10000
+# Сколько ждать снятия блокировки записи другим процессом, секунд
+DEFAULT_DB_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS published_urls (
+    url TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    url_hash INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_published_urls_source ON published_urls (source, published_at);
+CREATE INDEX IF NOT EXISTS idx_published_urls_published ON published_urls (published_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Триграммный полнотекстовый индекс для поиска подстроки в URL
+URL_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS published_urls_fts USING fts5(
+    url, content='published_urls', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS published_urls_fts_insert AFTER INSERT ON published_urls BEGIN
+    INSERT INTO published_urls_fts (rowid, url) VALUES (new.rowid, new.url);
+END;
+CREATE TRIGGER IF NOT EXISTS published_urls_fts_delete AFTER DELETE ON published_urls BEGIN
+    INSERT INTO published_urls_fts (published_urls_fts, rowid, url) VALUES ('delete', old.rowid, old.url);
+END;
+"""
+TRIGRAM_LENGTH = 3
+
+INSERT_URL_SQL = 'INSERT OR IGNORE INTO published_urls (url, source, published_at, url_hash) VALUES (?, ?, ?, ?)'
+
+
+class StateStore:
+    """Подключение к базе состояния, общее для всех источников"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.getenv('STATE_DB_PATH', DEFAULT_DB_PATH)
+        self.lock = threading.RLock()
+        self.bloom_path = self.db_path + '.bloom'
+        self.bloom_fp_rate = float(os.getenv('BLOOM_FP_RATE', DEFAULT_BLOOM_FP_RATE))
+        self.bloom = None
+        timeout = float(os.getenv('STATE_DB_TIMEOUT', DEFAULT_DB_TIMEOUT))
+        self.conn = sqlite3.connect(self.db_path, timeout=timeout, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        # FULL - каждая вставка переживает и сбой питания
+        self.conn.execute('PRAGMA synchronous=FULL')
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+        self._migrate_url_hashes()
+        self.url_search = self._create_url_search()
+
+    def _migrate_url_hashes(self):
+        """Добавление колонки хешей канонических URL в базы старого формата"""
+        columns = [row[1] for row in self.query('PRAGMA table_info(published_urls)')]
+        if 'url_hash' not in columns:
+            self.execute('ALTER TABLE published_urls ADD COLUMN url_hash INTEGER')
+        self.execute('CREATE INDEX IF NOT EXISTS idx_published_urls_hash ON published_urls (url_hash)')
+
+        rows = self.query('SELECT url, source FROM published_urls WHERE url_hash IS NULL')
+        if rows:
+            self.executemany(
+                'UPDATE published_urls SET url_hash = ? WHERE url = ?',
+                [(url_hash(url, source), url) for url, source in rows]
+            )
+            logger.info(f"Indexed {len(rows)} published URLs by canonical hash")
+
+    def _create_url_search(self):
+        """Создание индекса поиска по подстроке (нужен SQLite 3.34+ с FTS5)"""
+        exists = self.query("SELECT 1 FROM sqlite_master WHERE name = 'published_urls_fts'")
+        try:
+            with self.lock, self.conn:
+                self.conn.executescript(URL_SEARCH_SCHEMA)
+                if not exists:
+                    self.conn.execute("INSERT INTO published_urls_fts (published_urls_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"URL substring index unavailable, search will scan the table: {e}")
+            return False
+
+    def execute(self, sql, params=()):
+        """Выполнение запроса с фиксацией транзакции"""
+        with self.lock, self.conn:
+            return self.conn.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        """Пакетное выполнение запроса в одной транзакции"""
+        with self.lock, self.conn:
+            return self.conn.executemany(sql, rows)
+
+    def query(self, sql, params=()):
+        """Выполнение запроса на чтение"""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def get_meta(self, key):
+        rows = self.query('SELECT value FROM meta WHERE key = ?', (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key, value):
+        self.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def get_url_filter(self):
+        """Фильтр Блума по хешам опубликованных URL (None, если отключен через BLOOM_FP_RATE=0)"""
+        if self.bloom_fp_rate <= 0 or self.db_path == ':memory:':
+            return None
+        with self.lock:
+            if self.bloom is not None and self.bloom.is_current():
+                return self.bloom
+            self._close_url_filter()
+
+            with file_lock(self.bloom_path):
+                bloom = self._open_valid_url_filter()
+                if bloom is None:
+                    total = self.query('SELECT COUNT(*) FROM published_urls')[0][0]
+                    bloom = self._build_url_filter(total)
+            self.bloom = bloom
+            return bloom
+
+    @contextmanager
+    def locked_url_filter(self):
+        """Актуальный фильтр под межпроцессной блокировкой (None, если фильтр отключен)"""
+        if self.get_url_filter() is None:
+            yield None
+            return
+        with self.lock, file_lock(self.bloom_path):
+            # Пока ждали блокировку, другой процесс мог пересобрать файл
+            if not self.bloom.is_current():
+                self._close_url_filter()
+                self.bloom = self._open_valid_url_filter()
+                if self.bloom is None:
+                    total = self.query('SELECT COUNT(*) FROM published_urls')[0][0]
+                    self.bloom = self._build_url_filter(total)
+            yield self.bloom
+
+    def _open_valid_url_filter(self, allow_full=False):
+        """Открытие файла фильтра, если он соответствует базе (иначе None)
+
+        allow_full - принять и переполненный фильтр: ложных срабатываний больше, но промахов нет.
+        """
+        bloom = BloomFilter.open(self.bloom_path)
+        if bloom is None:
+            return None
+        total = self.query('SELECT COUNT(*) FROM published_urls')[0][0]
+        if bloom.count != total or (bloom.count > bloom.capacity and not allow_full) \
+                or bloom.fp_rate != self.bloom_fp_rate:
+            bloom.close()
+            return None
+        return bloom
+
+    def rebuild_url_filter(self, expected_count=0):
+        """Пересборка фильтра Блума из хранилища с запасом емкости"""
+        with self.lock, file_lock(self.bloom_path):
+            self.bloom = self._build_url_filter(expected_count)
+            return self.bloom
+
+    def _build_url_filter(self, expected_count):
+        """Сборка фильтра (вызывается под file_lock, файл заменяется атомарно)
+
+        Текущий фильтр закрывается перед заменой файла. Если файл держит другой процесс
+        (Windows), остается прежний файл, пока он соответствует базе, иначе фильтр отключается (None).
+        """
+        capacity = max(MIN_BLOOM_CAPACITY, expected_count * 2)
+        cursor = self.conn.execute('SELECT url_hash FROM published_urls')
+        current, self.bloom = self.bloom, None
+        try:
+            bloom = BloomFilter.create(self.bloom_path, capacity, self.bloom_fp_rate, (row[0] for row in cursor),
+                                       current=current)
+        except OSError as e:
+            logger.warning(f"Could not replace the bloom filter file, keeping the current one: {e}")
+            return self._open_valid_url_filter(allow_full=True)
+        logger.info(f"Built bloom filter for {bloom.count} published URLs (capacity {capacity})")
+        return bloom
+
+    def _close_url_filter(self):
+        if self.bloom is not None:
+            self.bloom.close()
+            self.bloom = None
+
+    def close(self):
+        with self.lock:
+            self._close_url_filter()
+            self.conn.close()
+
+
+class PublishedUrlStore:
+    """Опубликованные URL одного источника с индексированной проверкой
+
+    С source=None доступны только чтение и поиск по всем источникам.
+    """
+
+    def __init__(self, store, source):
+        self.store = store
+        self.source = source
+
+    def __contains__(self, url):
+        key = url_hash(url, self.source)
+        bloom = self.store.get_url_filter()
+        if bloom is not None and key not in bloom:
+            return False
+        rows = self.store.query('SELECT 1 FROM published_urls WHERE url_hash = ? LIMIT 1', (key,))
+        return bool(rows)
+
+    def __len__(self):
+        if self.source is None:
+            return self.store.query('SELECT COUNT(*) FROM published_urls')[0][0]
+        rows = self.store.query('SELECT COUNT(*) FROM published_urls WHERE source = ?', (self.source,))
+        return rows[0][0]
+
+    def __iter__(self):
+        return (url for url, _, _ in self.iter_urls())
+
+    def sources(self):
+        """Источники, у которых есть опубликованные URL (включая плагины SCRAPER_PLUGINS)"""
+        return [source for (source,) in self.store.query('SELECT DISTINCT source FROM published_urls ORDER BY source')]
+
+    def iter_urls(self, prefix=None, contains=None, offset=0, limit=None, batch_size=1000):
+        """Потоковый обход (url, source, published_at) в порядке публикации
+
+        prefix ищется по диапазону первичного ключа, contains - по триграммному индексу,
+        страницы читаются пачками по ключу (published_at, rowid), без загрузки всего списка.
+        """
+        conditions, params = [], []
+        if self.source is not None:
+            # При поиске "+" отключает индекс по источнику, чтобы работал индекс URL/поиска
+            conditions.append('+source = ?' if prefix or contains else 'source = ?')
+            params.append(self.source)
+        if prefix:
+            conditions.append('url >= ? AND url < ?')
+            params.extend([prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)])
+        if contains:
+            if self.store.url_search and len(contains) >= TRIGRAM_LENGTH:
+                conditions.append('rowid IN (SELECT rowid FROM published_urls_fts WHERE published_urls_fts MATCH ?)')
+                params.append('"' + contains.replace('"', '""') + '"')
+            else:
+                conditions.append('instr(lower(url), ?) > 0')
+                params.append(contains.lower())
+
+        last_key = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_conditions, page_params = list(conditions), list(params)
+            if last_key is not None:
+                page_conditions.append('(published_at, rowid) > (?, ?)')
+                page_params.extend(last_key)
+            where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ''
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            rows = self.store.query(
+                f'SELECT rowid, url, source, published_at FROM published_urls {where} '
+                f'ORDER BY published_at, rowid LIMIT ? OFFSET ?',
+                page_params + [size, offset if last_key is None else 0]
+            )
+            if not rows:
+                return
+            for row_id, url, source, published_at in rows:
+                yield url, source, published_at
+            last_key = (rows[-1][3], rows[-1][0])
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                return
+
+    def published_among(self, urls):
+        """Множество URL из списка, которые уже опубликованы (один запрос по индексу хешей)"""
+        hashes = {}
+        for url in urls:
+            hashes.setdefault(url_hash(url, self.source), []).append(url)
+        # Точные промахи фильтра Блума не требуют обращения к базе
+        bloom = self.store.get_url_filter()
+        if bloom is not None:
+            hashes = {key: value for key, value in hashes.items() if key in bloom}
+        published = set()
+        keys = list(hashes)
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self.store.query(
+                f'SELECT DISTINCT url_hash FROM published_urls WHERE url_hash IN ({",".join("?" * len(batch))})',
+                batch
+            )
+            for (found,) in rows:
+                published.update(hashes[found])
+        return published
+
+    def add(self, url, published_at=None):
+        """Добавление URL (сразу фиксируется на диске)"""
+        self.add_many([url], published_at)
+
+    def add_many(self, urls, published_at=None):
+        """Пакетное добавление URL в одной транзакции"""
+        published_at = published_at or datetime.now().isoformat()
+        rows = [(url, self.source, published_at, url_hash(url, self.source)) for url in urls]
+        with self.store.locked_url_filter() as bloom:
+            if bloom is None:
+                self.store.executemany(INSERT_URL_SQL, rows)
+                return
+            if bloom.count + len(rows) > bloom.capacity:
+                bloom = self.store.bloom = self.store._build_url_filter(bloom.count + len(rows))
+                if bloom is None:
+                    self.store.executemany(INSERT_URL_SQL, rows)
+                    return
+            # Биты ставим до вставки, чтобы фильтр никогда не отвечал "нет" для записанного URL;
+            # блокировка файла не дает параллельным процессам потерять обновление счетчика
+            for row in rows:
+                bloom.add(row[3])
+            cursor = self.store.executemany(INSERT_URL_SQL, rows)
+            bloom.count += cursor.rowcount
+            bloom.flush()
+
+    def remove(self, url):
+        """Удаление URL и всех его вариантов, возвращает True если URL был в списке"""
+        removed = self._delete('DELETE FROM published_urls WHERE url_hash = ? AND source = ?',
+                               (url_hash(url, self.source), self.source))
+        return removed > 0
+
+    def clear(self):
+        """Удаление всех URL источника"""
+        self._delete('DELETE FROM published_urls WHERE source = ?', (self.source,))
+
+    def _delete(self, sql, params):
+        """Удаление с учетом в фильтре: биты остаются (лишь ложные срабатывания), счетчик синхронизируется"""
+        with self.store.locked_url_filter() as bloom:
+            removed = self.store.execute(sql, params).rowcount
+            if bloom is not None and removed:
+                bloom.count -= removed
+                bloom.flush()
+            return removed
+
+    def migrate_json(self, json_path):
+        """Однократный перенос URL из старого JSON файла"""
+        meta_key = f'migrated_json:{os.path.abspath(json_path)}'
+        if not os.path.exists(json_path) or self.store.get_meta(meta_key):
+            return 0
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading {json_path} for migration: {e}")
+            return 0
+
+        urls = data.get('published_urls', [])
+        published_at = data.get('last_updated') or datetime.now().isoformat()
+        self.add_many(urls, published_at)
+        self.store.set_meta(meta_key, datetime.now().isoformat())
+        logger.info(f"Migrated {len(urls)} published URLs from {json_path} to {self.store.db_path}")
+        return len(urls)
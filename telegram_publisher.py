@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Telegram Publisher
+Публикация одного подготовленного поста сразу в несколько каналов
+"""
+
+import os
+import json
+import asyncio
+import logging
+from contextlib import ExitStack
+from message_splitter import split_html_message, truncate_html_message, html_length, MAX_CAPTION_LENGTH
+
+logger = logging.getLogger(__name__)
+
+# Метод Bot API и имя параметра файла для каждого типа медиа
+MEDIA_METHODS = {
+    'photo': ('send_photo', 'photo'),
+    'animation': ('send_animation', 'animation'),
+    'video': ('send_video', 'video'),
+    'document': ('send_document', 'document')
+}
+
+
+class ChannelTarget:
+    """Канал для публикации с собственными настройками подписи"""
+
+    def __init__(self, chat_id, caption_prefix='', caption_suffix='',
+                 disable_web_page_preview=False, disable_notification=False):
+        self.chat_id = chat_id
+        self.caption_prefix = caption_prefix
+        self.caption_suffix = caption_suffix
+        self.disable_web_page_preview = disable_web_page_preview
+        self.disable_notification = disable_notification
+
+    @classmethod
+    def from_dict(cls, data):
+        """Создание канала из словаря конфигурации"""
+        return cls(
+            chat_id=data['chat_id'],
+            caption_prefix=data.get('caption_prefix', ''),
+            caption_suffix=data.get('caption_suffix', ''),
+            disable_web_page_preview=data.get('disable_web_page_preview', False),
+            disable_notification=data.get('disable_notification', False)
+        )
+
+    def render(self, html_content):
+        """Подпись поста с учетом настроек канала"""
+        return f"{self.caption_prefix}{html_content}{self.caption_suffix}"
+
+    def render_caption(self, html_content, limit=MAX_CAPTION_LENGTH):
+        """Подпись к медиа не длиннее limit: обрезается пост, префикс и суффикс канала сохраняются"""
+        budget = limit - html_length(self.caption_prefix + self.caption_suffix)
+        truncated = truncate_html_message(html_content, budget)
+        if truncated != html_content:
+            logger.info(f"Caption truncated for {self.chat_id} (max {limit} characters)")
+        return self.render(truncated)
+
+    def __repr__(self):
+        return f"ChannelTarget({self.chat_id!r})"
+
+
+def load_channel_targets():
+    """Загрузка списка каналов из переменных окружения
+
+    TELEGRAM_CHANNELS_CONFIG - путь к JSON файлу со списком каналов и их настройками,
+    TELEGRAM_CHANNEL_IDS - список каналов через запятую,
+    TELEGRAM_CHANNEL_ID - один канал (обратная совместимость).
+    """
+    config_path = os.getenv('TELEGRAM_CHANNELS_CONFIG')
+    if config_path and os.path.exists(config_path):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return [ChannelTarget.from_dict(item) for item in data]
+
+    channel_ids = os.getenv('TELEGRAM_CHANNEL_IDS', '')
+    targets = [ChannelTarget(chat_id.strip()) for chat_id in channel_ids.split(',') if chat_id.strip()]
+    if targets:
+        return targets
+
+    channel_id = os.getenv('TELEGRAM_CHANNEL_ID')
+    return [ChannelTarget(channel_id)] if channel_id else []
+
+
+def extract_file_id(message, media_type):
+    """Получение file_id загруженного файла из ответа Telegram"""
+    media = getattr(message, media_type, None)
+    if isinstance(media, (list, tuple)):
+        # Для фото Telegram возвращает несколько размеров, последний - самый большой
+        media = media[-1] if media else None
+    return getattr(media, 'file_id', None)
+
+
+class TelegramPublisher:
+    """Параллельная публикация поста во все каналы с однократной загрузкой медиа"""
+
+    def __init__(self, bot, send_queue, targets):
+        self.bot = bot
+        self.send_queue = send_queue
+        self.targets = targets
+
+    async def publish(self, html_content, media_path=None, media_type='photo', targets=None, file_id=None):
+        """Публикация поста, возвращает словарь {chat_id: None или ошибка}
+
+        file_id - медиафайл, загруженный заранее (upload_media): рассылается без загрузки.
+        """
+        targets = self.targets if targets is None else targets
+        if not targets:
+            logger.error("No Telegram channels configured")
+            return {}
+
+        if media_path and os.path.exists(media_path):
+            if file_id is None:
+                return await self._publish_media(html_content, media_path, media_type, targets)
+            results = await asyncio.gather(
+                *[self._send_media(target, html_content, file_id, media_type) for target in targets],
+                return_exceptions=True
+            )
+            outcome = self._collect(targets, results)
+            failed = [target for target in targets if outcome[target.chat_id] is not None]
+            if failed:
+                # file_id мог устареть: загружаем файл заново для каналов с ошибкой
+                logger.warning("Publishing by prepared file_id failed, uploading media again")
+                outcome.update(await self._publish_media(html_content, media_path, media_type, failed))
+            return outcome
+
+        results = await asyncio.gather(
+            *[self._send_text(target, html_content) for target in targets],
+            return_exceptions=True
+        )
+        return self._collect(targets, results)
+
+    async def _publish_media(self, html_content, media_path, media_type, targets):
+        """Загрузка медиа в первый доступный канал и рассылка по file_id в остальные"""
+        outcome = {}
+        file_id = None
+        remaining = list(targets)
+
+        # Загружаем файл один раз; при ошибке пробуем следующий канал
+        while remaining and file_id is None:
+            target = remaining.pop(0)
+            try:
+                with open(media_path, 'rb') as media_file:
+                    message = await self._send_media(target, html_content, media_file, media_type)
+                outcome[target.chat_id] = None
+                file_id = extract_file_id(message, media_type)
+                if file_id is None and remaining:
+                    logger.warning("Telegram response has no file_id, media will be uploaded per channel")
+                    break
+            except Exception as e:
+                logger.error(f"Error publishing to {target.chat_id}: {e}")
+                outcome[target.chat_id] = e
+
+        if remaining:
+            if file_id is not None:
+                results = await asyncio.gather(
+                    *[self._send_media(target, html_content, file_id, media_type) for target in remaining],
+                    return_exceptions=True
+                )
+            else:
+                results = await asyncio.gather(
+                    *[self._upload_media(target, html_content, media_path, media_type) for target in remaining],
+                    return_exceptions=True
+                )
+            outcome.update(self._collect(remaining, results))
+        return outcome
+
+    async def upload_media(self, chat_id, media_path, media_type='photo'):
+        """Загрузка медиафайла в служебный чат заранее, возвращает file_id (или None)
+
+        Сообщение в служебном чате удаляется, file_id остается действительным.
+        """
+        target = ChannelTarget(chat_id, disable_notification=True)
+        message = await self._upload_media(target, '', media_path, media_type)
+        try:
+            await self.send_queue.send(chat_id, self.bot.delete_message, message_id=message.message_id)
+        except Exception as e:
+            logger.warning(f"Could not delete staging message in {chat_id}: {e}")
+        return extract_file_id(message, media_type)
+
+    async def publish_album(self, html_caption, media_paths, targets=None):
+        """Публикация альбома одним send_media_group, подпись на первом элементе"""
+        targets = self.targets if targets is None else targets
+        if not targets:
+            logger.error("No Telegram channels configured")
+            return {}
+
+        outcome = {}
+        file_ids = None
+        remaining = list(targets)
+
+        # Загружаем файлы один раз; остальные каналы получают альбом по file_id
+        while remaining and file_ids is None:
+            target = remaining.pop(0)
+            try:
+                messages = await self._upload_album(target, html_caption, media_paths)
+                outcome[target.chat_id] = None
+                file_ids = [extract_file_id(message, 'photo') for message in messages]
+                if None in file_ids:
+                    file_ids = None
+                    if remaining:
+                        logger.warning("Telegram response has no file_id, album will be uploaded per channel")
+                    break
+            except Exception as e:
+                logger.error(f"Error publishing album to {target.chat_id}: {e}")
+                outcome[target.chat_id] = e
+
+        if remaining:
+            if file_ids is not None:
+                results = await asyncio.gather(
+                    *[self._send_album(target, html_caption, file_ids) for target in remaining],
+                    return_exceptions=True
+                )
+            else:
+                results = await asyncio.gather(
+                    *[self._upload_album(target, html_caption, media_paths) for target in remaining],
+                    return_exceptions=True
+                )
+            outcome.update(self._collect(remaining, results))
+        return outcome
+
+    async def _upload_album(self, target, html_caption, media_paths):
+        """Загрузка файлов альбома в канал"""
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(path, 'rb')) for path in media_paths]
+            return await self._send_album(target, html_caption, files)
+
+    async def _send_album(self, target, html_caption, media):
+        """Отправка альбома (файлы или file_id) с подписью на первом элементе"""
+        from telegram import InputMediaPhoto
+
+        items = [
+            InputMediaPhoto(item, caption=target.render_caption(html_caption), parse_mode='HTML') if index == 0
+            else InputMediaPhoto(item)
+            for index, item in enumerate(media)
+        ]
+        return await self.send_queue.send(
+            target.chat_id,
+            self.bot.send_media_group,
+            media=items,
+            disable_notification=target.disable_notification
+        )
+
+    async def _upload_media(self, target, html_content, media_path, media_type):
+        """Отдельная загрузка файла в канал"""
+        with open(media_path, 'rb') as media_file:
+            return await self._send_media(target, html_content, media_file, media_type)
+
+    async def _send_media(self, target, html_content, media, media_type):
+        """Отправка медиа (файл или file_id) с подписью
+
+        Подпись анимации и других медиа обрезается; слишком длинную подпись фото Telegram
+        отклоняет, и скрапер сокращает пост с помощью AI.
+        """
+        method_name, media_param = MEDIA_METHODS.get(media_type, MEDIA_METHODS['photo'])
+        caption = target.render(html_content) if media_type == 'photo' else target.render_caption(html_content)
+        return await self.send_queue.send(
+            target.chat_id,
+            getattr(self.bot, method_name),
+            caption=caption,
+            parse_mode='HTML',
+            disable_notification=target.disable_notification,
+            **{media_param: media}
+        )
+
+    async def _send_text(self, target, html_content):
+        """Отправка текстового сообщения (длинный пост - несколькими частями)"""
+        messages = []
+        for part in split_html_message(target.render(html_content)):
+            messages.append(await self.send_queue.send(
+                target.chat_id,
+                self.bot.send_message,
+                text=part,
+                parse_mode='HTML',
+                disable_web_page_preview=target.disable_web_page_preview,
+                disable_notification=target.disable_notification
+            ))
+        return messages
+
+    def _collect(self, targets, results):
+        """Сопоставление результатов gather с каналами"""
+        outcome = {}
+        for target, result in zip(targets, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error publishing to {target.chat_id}: {result}")
+                outcome[target.chat_id] = result
+            else:
+                outcome[target.chat_id] = None
+        return outcome
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Telegram Send Queue
+Очередь исходящих сообщений Telegram с ограничением частоты и обработкой flood-wait
+"""
+
+import os
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Лимиты Telegram Bot API: ~30 сообщений в секунду на бота
+# и 20 сообщений в минуту в один канал/группу
+DEFAULT_CHAT_RATE_PER_MINUTE = 20
+DEFAULT_CHAT_BURST = 3
+DEFAULT_GLOBAL_RATE_PER_SECOND = 30
+DEFAULT_MAX_RETRIES = 3
+
+
+class TokenBucket:
+    """Token bucket для ограничения частоты запросов"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        return now
+
+    def delay(self):
+        """Время ожидания (в секундах) до появления свободного токена"""
+        now = self._refill()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        """Ожидание и захват токена, возвращает время ожидания"""
+        waited = 0.0
+        while True:
+            delay = self.delay()
+            if delay <= 0:
+                self.tokens -= 1
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def block(self, seconds):
+        """Блокировка bucket на заданное время (ответ retry_after от Telegram)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class TelegramSendQueue:
+    """Асинхронная очередь отправки с отдельным воркером на каждый чат"""
+
+    def __init__(self, chat_rate_per_minute=DEFAULT_CHAT_RATE_PER_MINUTE, chat_burst=DEFAULT_CHAT_BURST,
+                 global_rate_per_second=DEFAULT_GLOBAL_RATE_PER_SECOND, max_retries=DEFAULT_MAX_RETRIES):
+        self.chat_rate = chat_rate_per_minute / 60.0
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.global_bucket = TokenBucket(global_rate_per_second, global_rate_per_second)
+
+        self.loop = None
+        self.chat_buckets = {}
+        self.queues = {}
+        self.workers = {}
+        self.in_flight = {}
+
+        self.sent_count = 0
+        self.failed_count = 0
+        self.flood_wait_count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """Создание очереди с параметрами из переменных окружения"""
+        return cls(
+            chat_rate_per_minute=float(os.getenv('TELEGRAM_CHAT_RATE_PER_MINUTE', str(DEFAULT_CHAT_RATE_PER_MINUTE))),
+            chat_burst=int(os.getenv('TELEGRAM_CHAT_BURST', str(DEFAULT_CHAT_BURST))),
+            global_rate_per_second=float(os.getenv('TELEGRAM_GLOBAL_RATE_PER_SECOND', str(DEFAULT_GLOBAL_RATE_PER_SECOND))),
+            max_retries=int(os.getenv('TELEGRAM_MAX_RETRIES', str(DEFAULT_MAX_RETRIES)))
+        )
+
+    def _ensure_worker(self, chat_id):
+        """Создание очереди и воркера для чата при первом обращении"""
+        loop = asyncio.get_event_loop()
+        if self.loop is not loop:
+            # Новый event loop (повторный asyncio.run) - старые воркеры недействительны
+            self.loop = loop
+            self.queues.clear()
+            self.workers.clear()
+            self.in_flight.clear()
+
+        worker = self.workers.get(chat_id)
+        if worker is not None and not worker.done():
+            return self.queues[chat_id]
+
+        if chat_id not in self.chat_buckets:
+            self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        self.queues[chat_id] = asyncio.Queue()
+        self.in_flight[chat_id] = 0
+        self.workers[chat_id] = asyncio.ensure_future(self._worker(chat_id))
+        return self.queues[chat_id]
+
+    async def send(self, chat_id, method, **kwargs):
+        """Постановка вызова метода Bot API в очередь чата и ожидание результата"""
+        queue = self._ensure_worker(chat_id)
+        future = self.loop.create_future()
+        await queue.put((method, kwargs, future, time.monotonic()))
+        return await future
+
+    async def _worker(self, chat_id):
+        """Последовательная отправка сообщений одного чата с учетом лимитов"""
+        queue = self.queues[chat_id]
+        bucket = self.chat_buckets[chat_id]
+
+        while True:
+            method, kwargs, future, enqueued_at = await queue.get()
+            self.in_flight[chat_id] += 1
+            try:
+                if future.cancelled():
+                    continue
+                result = await self._send_with_retries(chat_id, bucket, method, kwargs)
+                wait_time = time.monotonic() - enqueued_at
+                self.total_wait += wait_time
+                self.max_wait = max(self.max_wait, wait_time)
+                self.sent_count += 1
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                self.failed_count += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.in_flight[chat_id] -= 1
+                queue.task_done()
+
+    async def _send_with_retries(self, chat_id, bucket, method, kwargs):
+        """Отправка с автоматическим ожиданием retry_after при flood-ошибках"""
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            try:
+                return await method(chat_id=chat_id, **kwargs)
+            except Exception as e:
+                retry_after = getattr(e, 'retry_after', None)
+                if retry_after is None or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.flood_wait_count += 1
+                if hasattr(retry_after, 'total_seconds'):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(f"Flood control for chat {chat_id}: retrying in {retry_after}s "
+                               f"(attempt {attempt}/{self.max_retries})")
+                bucket.block(float(retry_after))
+                # Файлы уже прочитаны предыдущей попыткой - перематываем их
+                for value in kwargs.values():
+                    if hasattr(value, 'seek'):
+                        value.seek(0)
+
+    def queue_depth(self, chat_id=None):
+        """Количество сообщений в очереди (включая отправляемые)"""
+        if chat_id is not None:
+            queue = self.queues.get(chat_id)
+            pending = queue.qsize() if queue else 0
+            return pending + self.in_flight.get(chat_id, 0)
+        return sum(self.queue_depth(chat) for chat in self.queues)
+
+    def stats(self):
+        """Статистика очереди: глубина, время ожидания, flood-wait"""
+        return {
+            'queue_depth': self.queue_depth(),
+            'per_chat_depth': {chat: self.queue_depth(chat) for chat in self.queues},
+            'sent': self.sent_count,
+            'failed': self.failed_count,
+            'flood_waits': self.flood_wait_count,
+            'avg_wait': self.total_wait / self.sent_count if self.sent_count else 0.0,
+            'max_wait': self.max_wait
+        }
+
+    async def close(self):
+        """Дожидается отправки всех сообщений и останавливает воркеры"""
+        for queue in list(self.queues.values()):
+            await queue.join()
+        for worker in self.workers.values():
+            worker.cancel()
+        await asyncio.gather(*self.workers.values(), return_exceptions=True)
+        self.workers.clear()
+        self.queues.clear()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Тест архива опубликованных статей
+Test script for the SQLite article archive
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_archive import ArticleArchive
+from state_store import StateStore
+
+
+def make_record(i, topic=None, timestamp='20250722_120000'):
+    article = {'title': f'Story {i}', 'link': f'https://spectrum.ieee.org/story-{i}'}
+    if topic:
+        article['topic'] = topic
+    return {'timestamp': timestamp, 'article': article, 'post_content': f'<b>Post {i}</b>',
+            'media_url': None, 'published': True}
+
+
+def test_same_second_posts_are_kept():
+    """Тест сохранения двух постов, созданных в одну секунду"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        archive = ArticleArchive(store)
+        first = archive.add('ieee_spectrum', make_record(1, 'ai'))
+        second = archive.add('ieee_spectrum', make_record(2, 'robotics'))
+        assert first and second and first != second
+
+        assert archive.get(second)['record']['post_content'] == '<b>Post 2</b>'
+        assert archive.count() == 2
+        assert [item['title'] for item in archive.find(topic='robotics')] == ['Story 2']
+        # IEEE хранит темы как 'AI' и 'Robotics', а справка CLI предлагает --topic robotics
+        archive.add('ieee_spectrum', make_record(3, 'Robotics'))
+        assert archive.count(topic='robotics') == archive.count(topic='ROBOTICS') == 2
+        assert archive.count(topic='Robotics', source='ieee_spectrum') == 2
+        assert archive.find(url='https://spectrum.ieee.org/story-1')[0]['id'] == first
+        store.close()
+
+
+def test_date_filters():
+    """Тест выборки по диапазону дат"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        archive = ArticleArchive(store)
+        for day in range(20, 25):
+            archive.add('techcrunch', make_record(day, timestamp=f'202507{day}_090000'))
+
+        assert archive.count(since='2025-07-21', until='2025-07-23') == 3
+        titles = [item['title'] for item in archive.find(since='2025-07-22', limit=2)]
+        assert titles == ['Story 24', 'Story 23']
+        store.close()
+
+
+def test_migrate_directory():
+    """Тест переноса старой папки архива без дублей при повторе"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        folder = os.path.join(tmp_dir, 'ieee_articles_archive')
+        os.makedirs(folder)
+        for i in range(3):
+            with open(os.path.join(folder, f'ieee_article_2025072{i}_100000.json'), 'w', encoding='utf-8') as f:
+                json.dump(make_record(i, 'ai', f'2025072{i}_100000'), f)
+        with open(os.path.join(folder, 'broken.json'), 'w', encoding='utf-8') as f:
+            f.write('{"timestamp": ')
+
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        archive = ArticleArchive(store)
+        assert archive.migrate_directory(folder, 'ieee_spectrum') == 3
+        assert archive.migrate_directory(folder, 'ieee_spectrum') == 0
+        assert archive.migrate_directory(folder, 'ieee_spectrum', force=True) == 0
+        assert archive.count(source='ieee_spectrum', topic='ai') == 3
+        store.close()
+
+
+def test_full_text_search_ranked():
+    """Тест полнотекстового поиска с ранжированием по заголовку, посту и тексту"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        archive = ArticleArchive(store)
+        archive.add('techcrunch', {
+            'article': {'title': 'Chip startup raises funding', 'link': 'https://techcrunch.com/chips'},
+            'post_content': 'Стартап привлек инвестиции'
+        }, content='The company builds accelerators for humanoid robots and drones.')
+        archive.add('ieee_spectrum', {
+            'article': {'title': 'Humanoid robots learn to walk', 'link': 'https://spectrum.ieee.org/walk',
+                        'topic': 'robotics'},
+            'post_content': '<b>Гуманоидные роботы</b> учатся ходить'
+        }, content='Researchers trained humanoid robots in simulation.')
+
+        results = archive.search('humanoid robot')
+        assert [item['url'] for item in results] == ['https://spectrum.ieee.org/walk', 'https://techcrunch.com/chips']
+        assert '[' in results[0]['snippet']
+        assert [item['source'] for item in archive.search('humanoid', source='techcrunch')] == ['techcrunch']
+        assert archive.search('роботы')[0]['url'] == 'https://spectrum.ieee.org/walk'
+        assert archive.search('quantum') == []
+        store.close()
+
+
+def test_existing_archive_is_indexed():
+    """Тест индексации записей, сохраненных до появления поискового индекса"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        archive = ArticleArchive(store)
+        archive.add('ieee_spectrum', make_record(1, 'ai'))
+        store.execute('DROP TABLE articles_fts')
+
+        archive = ArticleArchive(store)
+        assert [item['title'] for item in archive.search('story')] == ['Story 1']
+        store.close()
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование архива статей")
+    print("=" * 50)
+    test_same_second_posts_are_kept()
+    test_date_filters()
+    test_migrate_directory()
+    test_full_text_search_ranked()
+    test_existing_archive_is_indexed()
+    print("🎉 Все тесты архива прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
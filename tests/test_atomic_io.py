@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Тест атомарной записи и параллельной работы нескольких процессов
+Test script for atomic writes and concurrent state updates
+"""
+
+import sys
+import os
+import json
+import tempfile
+import multiprocessing
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_io import atomic_open
+from state_store import StateStore, PublishedUrlStore
+
+
+def add_urls_worker(db_path, source, worker, count):
+    store = StateStore(db_path)
+    urls = PublishedUrlStore(store, source)
+    for i in range(count):
+        urls.add(f'https://example.com/{source}/{worker}/{i}')
+    store.close()
+
+
+def test_atomic_write_keeps_old_file_on_error():
+    """Тест сохранения старого файла при ошибке во время записи"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'data.json')
+        with atomic_open(path) as f:
+            json.dump({'version': 1}, f)
+        try:
+            with atomic_open(path) as f:
+                f.write('{"version": ')
+                raise RuntimeError('crash in the middle of writing')
+        except RuntimeError:
+            pass
+        with open(path, 'r', encoding='utf-8') as f:
+            assert json.load(f) == {'version': 1}
+        assert os.listdir(tmp_dir) == ['data.json']
+
+
+def test_parallel_processes_do_not_lose_writes():
+    """Тест параллельной записи URL из нескольких процессов"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'state.db')
+        StateStore(db_path).close()
+
+        context = multiprocessing.get_context('spawn')
+        processes = [
+            context.Process(target=add_urls_worker, args=(db_path, source, worker, 25))
+            for source in ('techcrunch', 'ieee_spectrum') for worker in range(2)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            assert process.exitcode == 0
+
+        store = StateStore(db_path)
+        assert len(PublishedUrlStore(store, None)) == 100
+        assert store.get_url_filter().count == 100
+        assert 'https://example.com/ieee_spectrum/1/24' in PublishedUrlStore(store, 'ieee_spectrum')
+        store.close()
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование атомарной записи")
+    print("=" * 50)
+    test_atomic_write_keeps_old_file_on_error()
+    test_parallel_processes_do_not_lose_writes()
+    print("🎉 Все тесты атомарной записи прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Тест загрузки архива за прошедшие дни
+Test script for the historical backfill mode
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+from datetime import date, timedelta
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backfill import Backfill, supports_backfill
+from ieee_spectrum_scraper import IEEESpectrumScraper, ARCHIVE_MAX_PAGES
+from base_scraper import BaseNewsScraper
+from scraper_clients import ScraperClients
+from state_store import StateStore
+
+SINCE = date(2025, 7, 20)
+UNTIL = date(2025, 7, 22)
+
+
+class ArchiveSource(BaseNewsScraper):
+    """Источник с двумя статьями в день; статьи из broken не скачиваются"""
+
+    source_name = 'archive_example'
+    display_name = 'Archive Example'
+
+    def __init__(self, clients):
+        super().__init__(clients)
+        self.broken = set()
+        self.scraped = []
+
+    def fetch_articles_for_date(self, day):
+        return [{'title': f'Story {index} of {day}', 'link': f'https://example.com/{day}/{index}',
+                 'summary': f'Lead {index} about {day.day} robots'} for index in (1, 2)]
+
+    def scrape_article(self, article_url):
+        self.scraped.append(article_url)
+        content = '' if article_url in self.broken else f'Full text of {article_url}'
+        return {'content': content, 'media_url': None, 'media_urls': []}
+
+
+def make_source(tmp_dir):
+    return ArchiveSource(ScraperClients(StateStore(os.path.join(tmp_dir, 'state.db'))))
+
+
+def test_backfill_writes_days_in_bulk():
+    """Тест загрузки диапазона: архив, опубликованные URL, прогресс; без запросов к модели"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_source(tmp_dir)
+        assert supports_backfill(scraper)
+        stats = asyncio.run(Backfill(scraper, concurrency=3).run(SINCE, UNTIL))
+
+        assert (stats['days'], stats['articles'], stats['failed']) == (3, 6, 0)
+        assert scraper.archive.count(source='archive_example') == 6
+        assert scraper.archive.count(source='archive_example', since='2025-07-21', until='2025-07-21T23:59') == 2
+        assert scraper.is_url_published('https://example.com/2025-07-21/1')
+        assert scraper.clients._openai_client is None
+        asyncio.run(scraper.clients.close())
+
+
+def test_backfill_resumes_unfinished_days():
+    """Тест продолжения: завершенные дни пропускаются, догружаются только недостающие статьи"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_source(tmp_dir)
+        scraper.broken = {'https://example.com/2025-07-21/2'}
+        stats = asyncio.run(Backfill(scraper, archive_only=True).run(SINCE, UNTIL))
+        assert (stats['days'], stats['articles'], stats['failed']) == (2, 5, 1)
+        assert not scraper.is_url_published('https://example.com/2025-07-21/1')
+
+        scraper.broken = set()
+        scraper.scraped = []
+        stats = asyncio.run(Backfill(scraper, archive_only=True).run(SINCE, UNTIL))
+        assert (stats['days'], stats['days_skipped'], stats['articles']) == (1, 2, 1)
+        assert scraper.scraped == ['https://example.com/2025-07-21/2']
+        assert scraper.archive.count(source='archive_example') == 6
+        asyncio.run(scraper.clients.close())
+
+
+def test_unreached_day_is_not_marked_done():
+    """Тест лимита страниц IEEE Spectrum: день старше просмотренных страниц не отмечается загруженным"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = IEEESpectrumScraper(ScraperClients(StateStore(os.path.join(tmp_dir, 'state.db'))))
+        scraper.scrape_article = lambda url: {'content': f'Full text of {url}', 'media_url': None, 'media_urls': []}
+
+        def story(topic, day, page):
+            return {'title': f'{topic} story of {day}', 'link': f'https://spectrum.ieee.org/{topic}-{day}-{page}',
+                    'description': f'{topic} lead', 'parsed_date': day}
+
+        # Последняя просматриваемая страница заканчивается на дне too_old: он может продолжаться дальше
+        too_old = SINCE - timedelta(days=1)
+        for topic_url, topic in ((scraper.ai_url, 'ai'), (scraper.robotics_url, 'robotics')):
+            scraper.listing_cache[(topic_url, 1)] = [story(topic, UNTIL, 1), story(topic, SINCE, 1)]
+            for page in range(2, ARCHIVE_MAX_PAGES):
+                scraper.listing_cache[(topic_url, page)] = [story(topic, SINCE, page)]
+            scraper.listing_cache[(topic_url, ARCHIVE_MAX_PAGES)] = [story(topic, too_old, ARCHIVE_MAX_PAGES)]
+
+        stats = asyncio.run(Backfill(scraper, archive_only=True).run(too_old, UNTIL))
+        assert (stats['days'], stats['failed_days']) == (3, 1)
+        assert too_old not in Backfill(scraper).progress.done_days('ieee_spectrum', too_old, UNTIL)
+
+        # Страница без дат тоже не считается концом дня
+        scraper.listing_cache[(scraper.ai_url, 2)] = []
+        try:
+            scraper.fetch_articles_for_date(too_old)
+            assert False, "listing without dates must not finish the day"
+        except ValueError as e:
+            assert 'no article dates' in str(e)
+        asyncio.run(scraper.clients.close())
+
+
+def test_relative_day_labels_are_dated():
+    """Тест относительных меток IEEE Spectrum: статья "2d" попадает в свой день, а не в сегодняшний"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = IEEESpectrumScraper(ScraperClients(StateStore(os.path.join(tmp_dir, 'state.db'))))
+        today = scraper.today
+        assert scraper.parse_article_date('2d') == today - timedelta(days=2)
+        assert scraper.parse_article_date('3 days ago') == today - timedelta(days=3)
+        assert scraper.parse_article_date('17h') == today
+
+        for topic_url, topic in ((scraper.ai_url, 'ai'), (scraper.robotics_url, 'robotics')):
+            scraper.listing_cache[(topic_url, 1)] = [
+                {'title': f'{topic} {label}', 'link': f'https://spectrum.ieee.org/{topic}-{label}',
+                 'description': f'{topic} lead', 'parsed_date': scraper.parse_article_date(label)}
+                for label in ('17h', '1d', '2d', '3d')
+            ]
+        articles = scraper.fetch_articles_for_date(today - timedelta(days=2))
+        assert sorted(article['title'] for article in articles) == ['ai 2d', 'robotics 2d']
+        asyncio.run(scraper.clients.close())
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование загрузки архива")
+    print("=" * 50)
+    test_backfill_writes_days_in_bulk()
+    test_backfill_resumes_unfinished_days()
+    test_unreached_day_is_not_marked_done()
+    test_relative_day_labels_are_dated()
+    print("🎉 Все тесты загрузки архива прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
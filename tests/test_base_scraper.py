@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Тест общего конвейера скраперов и регистрации источников
+Test script for the shared scraper pipeline and source plugins
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from PIL import Image
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base_scraper
+from base_scraper import BaseNewsScraper, register_source, load_sources
+from scraper_clients import ScraperClients
+from state_store import StateStore
+from telegram_publisher import ChannelTarget
+
+ARTICLES = [
+    {'title': 'Robots learn to fold laundry', 'link': 'https://example.com/robots',
+     'summary': 'A new robot folds towels', 'author': 'Alice'},
+    {'title': 'Quantum chips reach new record', 'link': 'https://example.com/quantum',
+     'summary': 'Qubits hold state longer', 'author': 'Bob'},
+]
+
+
+SLOW_SECONDS = 0.3
+
+
+class FakeCompletions:
+    """Ответы AI по очереди: выбор статьи, пост, короткий пост"""
+
+    def __init__(self, answers, delay=0):
+        self.answers = list(answers)
+        self.prompts = []
+        self.delay = delay
+
+    def create(self, model, messages, max_tokens, temperature):
+        time.sleep(self.delay)
+        self.prompts.append(messages[0]['content'])
+        message = SimpleNamespace(content=self.answers.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakePublisher:
+    """Первые caption_errors публикаций отклоняются из-за длины подписи, первые outages - из-за сбоя сети"""
+
+    def __init__(self, caption_errors=1, outages=0):
+        self.posts = []
+        self.file_ids = []
+        self.uploads = []
+        self.albums = []
+        self.caption_errors = caption_errors
+        self.outages = outages
+
+    async def upload_media(self, chat_id, media_path, media_type='photo'):
+        self.uploads.append((chat_id, media_type))
+        return 'file-1'
+
+    async def publish(self, html_content, media_path=None, media_type='photo', targets=None, file_id=None):
+        self.posts.append(html_content)
+        self.file_ids.append(file_id)
+        error = None
+        if len(self.posts) <= self.outages:
+            error = 'Timed out'
+        elif len(self.posts) <= self.caption_errors:
+            error = 'Bad Request: message caption is too long'
+        return {target.chat_id: error for target in targets}
+
+    async def publish_album(self, html_content, media_paths, targets=None):
+        self.posts.append(html_content)
+        self.albums.append(list(media_paths))
+        return {target.chat_id: None for target in targets}
+
+
+class ExampleSource(BaseNewsScraper):
+    source_name = 'example'
+    display_name = 'Example'
+
+    def fetch_articles(self):
+        return [dict(article) for article in ARTICLES]
+
+    def scrape_article(self, article_url):
+        return {'content': f'Full text of {article_url}', 'media_url': None, 'media_urls': []}
+
+
+def make_scraper(tmp_dir, answers, llm_delay=0):
+    clients = ScraperClients(StateStore(os.path.join(tmp_dir, 'state.db')))
+    completions = FakeCompletions(answers, llm_delay)
+    clients._openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    scraper = ExampleSource(clients=clients)
+    # Каналы не зависят от TELEGRAM_CHANNEL_ID разработчика
+    scraper.channel_targets = [ChannelTarget('@test')]
+    scraper._publisher = FakePublisher()
+    return scraper
+
+
+def test_registry_lists_sources():
+    """Тест реестра: встроенные источники и зарегистрированный плагин"""
+    sources = load_sources()
+    assert sources['techcrunch'].__name__ == 'TechCrunchScraper'
+    assert sources['ieee_spectrum'].__name__ == 'IEEESpectrumScraper'
+    assert 'example' not in sources
+
+    register_source(ExampleSource)
+    try:
+        assert load_sources()['example'] is ExampleSource
+    finally:
+        # Реестр общий для процесса: убираем тестовый источник
+        base_scraper._SOURCES.pop('example')
+
+
+def test_plugin_runs_through_pipeline():
+    """Тест полного запуска плагина: выбор, пост, сокращение длинной подписи, архив"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, ['2', 'Long post [ссылка]', 'Short post [ссылка]'])
+
+        async def scenario():
+            try:
+                return await scraper.run_daily_scraping()
+            finally:
+                await scraper.clients.close()
+
+        assert asyncio.run(scenario()) is True
+        completions = scraper.clients._openai_client.chat.completions
+        assert 'Quantum chips reach new record' in completions.prompts[0]
+        assert scraper._publisher.posts[-1] == 'Short post https://example.com/quantum'
+
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        rows = store.query('SELECT url FROM published_urls WHERE source = ?', ('example',))
+        assert [url for (url,) in rows] == ['https://example.com/quantum']
+        store.close()
+
+
+def test_media_download_overlaps_generation():
+    """Тест подготовки поста: скачивание медиа идет одновременно с запросом к модели"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, ['Post [ссылка]'], llm_delay=SLOW_SECONDS)
+        media_file = os.path.join(tmp_dir, 'image.jpg')
+
+        def slow_download(media_url):
+            time.sleep(SLOW_SECONDS)
+            open(media_file, 'wb').close()
+            return media_file
+
+        scraper.download_media = slow_download
+        item = {'article': dict(ARTICLES[0]), 'content': 'Full text', 'media_url': 'https://example.com/a.jpg',
+                'media_urls': ['https://example.com/a.jpg'], 'media_paths': []}
+
+        start = time.monotonic()
+        item = asyncio.run(scraper.stage_prepare(item))
+        elapsed = time.monotonic() - start
+        print(f"⏱️ Скачивание и генерация по {SLOW_SECONDS} с выполнены за {elapsed:.2f} с")
+        assert elapsed < SLOW_SECONDS * 1.7
+        # Скачанный файл перенесен в контрольную точку и переживет сбой публикации
+        assert len(item['media_paths']) == 1 and scraper.checkpoints.holds(item['media_paths'][0])
+        assert os.path.exists(item['media_paths'][0])
+        assert item['post_content'] == 'Post https://example.com/robots'
+        asyncio.run(scraper.clients.close())
+
+
+def test_ranking_returns_shortlist():
+    """Тест ранжирования: выбранная статья и запасные без повторов и неверных номеров"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, ['2, 9, 2, 1', 'no idea'])
+        assert [a['link'] for a in scraper.rank_articles(ARTICLES, limit=3)] == \
+            ['https://example.com/quantum', 'https://example.com/robots']
+        # Ответ без номеров или сбой модели - статьи по порядку, сколько нужно постов
+        assert scraper.rank_articles(ARTICLES, limit=3) == ARTICLES[:3]
+        assert scraper.rank_articles(ARTICLES, limit=2) == ARTICLES[:2]
+        assert scraper.rank_articles(ARTICLES) == ARTICLES[:1]
+        asyncio.run(scraper.clients.close())
+
+
+def test_backup_replaces_failed_article():
+    """Тест запасной статьи: она скрапится заранее и заменяет основную без ожидания"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, ['1, 2', 'Post [ссылка]'])
+        scraper._publisher = FakePublisher(caption_errors=0)
+
+        def slow_scrape(article_url):
+            time.sleep(SLOW_SECONDS)
+            content = '' if article_url.endswith('robots') else f'Full text of {article_url}'
+            return {'content': content, 'media_url': None, 'media_urls': []}
+
+        scraper.scrape_article = slow_scrape
+
+        async def scenario():
+            try:
+                return await scraper.run_daily_scraping()
+            finally:
+                await scraper.clients.close()
+
+        start = time.monotonic()
+        assert asyncio.run(scenario()) is True
+        elapsed = time.monotonic() - start
+        print(f"⏱️ Переход на запасную статью: {elapsed:.2f} с (скрапинг одной статьи {SLOW_SECONDS} с)")
+        assert elapsed < SLOW_SECONDS * 1.7
+        assert scraper._publisher.posts[-1] == 'Post https://example.com/quantum'
+        assert not scraper.near_duplicates.pending
+
+
+def test_failed_publish_resumes_from_checkpoint():
+    """Тест повторного запуска после сбоя Telegram: без поиска, выбора и генерации поста"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, ['1', 'Post [ссылка]'])
+        scraper._publisher = FakePublisher(caption_errors=0, outages=scraper.publish_attempts)
+        assert asyncio.run(scraper.run_daily_scraping()) is False
+        assert scraper.checkpoints.pending('example')[0]['stage'] == 'prepare'
+
+        # Второй запуск: лента и AI больше не нужны
+        scraper.fetch_articles = None
+        completions = scraper.clients._openai_client.chat.completions
+        prompts_before = len(completions.prompts)
+
+        assert asyncio.run(scraper.run_daily_scraping()) is True
+        assert len(completions.prompts) == prompts_before
+        assert scraper._publisher.posts[-1] == 'Post https://example.com/robots'
+        assert scraper.is_url_published('https://example.com/robots')
+        assert scraper.checkpoints.pending('example') == []
+        asyncio.run(scraper.clients.close())
+
+
+def test_multi_post_run_is_paced():
+    """Тест нескольких постов за запуск: один выбор, пауза между постами, учет одной пачкой"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, ['2, 1', 'Post [ссылка]', 'Post [ссылка]'])
+        scraper._publisher = FakePublisher(caption_errors=0)
+        scraper.max_posts = 2
+        scraper.post_spacing = SLOW_SECONDS
+
+        start = time.monotonic()
+        assert asyncio.run(scraper.run_daily_scraping()) is True
+        elapsed = time.monotonic() - start
+
+        assert sorted(scraper._publisher.posts) == ['Post https://example.com/quantum',
+                                                    'Post https://example.com/robots']
+        assert elapsed >= SLOW_SECONDS
+        assert all(scraper.is_url_published(article['link']) for article in ARTICLES)
+        assert scraper.archive.count(source='example') == 2
+        assert scraper.checkpoints.pending('example') == []
+        asyncio.run(scraper.clients.close())
+
+
+def test_interrupted_bookkeeping_is_recorded():
+    """Тест прерванного запуска: опубликованный пост учитывается, но не публикуется повторно"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, [])
+        item = {'article': dict(ARTICLES[0]), 'content': 'Full text', 'media_url': None, 'media_urls': [],
+                'media_paths': [], 'post_content': 'Post'}
+        scraper.checkpoints.save('example', item, 'publish')
+        scraper.max_posts = 1
+        scraper.fetch_articles = lambda: []
+
+        assert asyncio.run(scraper.run_daily_scraping()) is False
+        assert scraper._publisher.posts == []
+        assert scraper.is_url_published(ARTICLES[0]['link'])
+        assert scraper.checkpoints.pending('example') == []
+        asyncio.run(scraper.clients.close())
+
+
+def test_prepared_post_is_published_later():
+    """Тест очереди готовых постов: подготовка заранее и публикация без поиска и запросов к модели"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        long_post = 'Long post ' + 'x' * 1100 + ' [ссылка]'
+        scraper = make_scraper(tmp_dir, ['1', long_post, 'Short post [ссылка]'])
+        scraper._publisher = FakePublisher(caption_errors=0)
+        scraper.staging_chat_id = '@staging'
+
+        def scrape_with_image(article_url):
+            return {'content': 'Full text', 'media_url': 'https://example.com/a.jpg',
+                    'media_urls': ['https://example.com/a.jpg']}
+
+        def download_image(media_url):
+            path = os.path.join(tmp_dir, 'image.jpg')
+            Image.new('RGB', (64, 48)).save(path)
+            return path
+
+        scraper.scrape_article = scrape_with_image
+        scraper.download_media = download_image
+
+        assert asyncio.run(scraper.run_daily_scraping(prepare_ahead=True)) is True
+        assert scraper._publisher.posts == []
+        ready = scraper.checkpoints.pending('example')
+        # Длинная подпись сокращена при подготовке, фото загружено в служебный чат
+        assert ready[0]['stage'] == 'ready' and ready[0]['post_content'] == 'Short post https://example.com/robots'
+        assert ready[0]['file_id'] == 'file-1' and scraper._publisher.uploads == [('@staging', 'photo')]
+        # Очередь заполнена: повторная подготовка ничего не делает
+        assert asyncio.run(scraper.run_daily_scraping(prepare_ahead=True)) is True
+
+        scraper.fetch_articles = None
+        completions = scraper.clients._openai_client.chat.completions
+        prompts_before = len(completions.prompts)
+        assert asyncio.run(scraper.run_daily_scraping(ready_only=True)) is True
+        assert len(completions.prompts) == prompts_before
+        assert scraper._publisher.posts == ['Short post https://example.com/robots']
+        assert scraper._publisher.file_ids == ['file-1']
+        assert scraper.is_url_published('https://example.com/robots')
+        assert scraper.checkpoints.pending('example') == []
+        asyncio.run(scraper.clients.close())
+
+
+def test_stale_ready_post_expires():
+    """Тест устаревшего готового поста: статья удалена с сайта - пост не публикуется"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, [])
+        prepared_at = datetime.now() - timedelta(hours=scraper.ready_max_age_hours + 1)
+        item = {'article': dict(ARTICLES[0]), 'content': 'Full text', 'media_url': None, 'media_urls': [],
+                'media_paths': [], 'post_content': 'Post', 'prepared_at': prepared_at.isoformat()}
+        scraper.checkpoints.save('example', item, 'ready')
+        scraper.article_available = lambda article_url: False
+
+        assert asyncio.run(scraper.run_daily_scraping(ready_only=True)) is False
+        assert scraper._publisher.posts == []
+        assert not scraper.is_url_published(ARTICLES[0]['link'])
+        assert scraper.checkpoints.pending('example') == []
+        asyncio.run(scraper.clients.close())
+
+
+def test_published_story_is_skipped():
+    """Тест повторного запуска: опубликованная статья не выбирается снова"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, [])
+        scraper.add_published_url('https://example.com/robots')
+        articles = scraper.filter_unpublished_articles(scraper.fetch_articles())
+        assert [article['link'] for article in articles] == ['https://example.com/quantum']
+        asyncio.run(scraper.clients.close())
+
+
+def test_album_keeps_only_valid_photos():
+    """Тест альбома: GIF не попадает в кандидаты, поврежденный файл отбрасывается до отправки"""
+    from bs4 import BeautifulSoup
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, [])
+        soup = BeautifulSoup('<article><img src="/a.jpg"><img src="/loop.gif"><img src="/b.png"></article>',
+                             'html.parser')
+        assert scraper.extract_image_candidates(soup, 'https://example.com/story', 'https://example.com/hero.gif') \
+            == ['https://example.com/a.jpg', 'https://example.com/b.png']
+
+        paths = [os.path.join(tmp_dir, name) for name in ('a.jpg', 'broken.jpg', 'b.png', 'c.gif')]
+        Image.new('RGB', (400, 300), 'red').save(paths[0])
+        with open(paths[1], 'wb') as f:
+            f.write(b'not an image')
+        Image.new('RGB', (400, 300), 'blue').save(paths[2])
+        Image.new('RGB', (400, 300), 'green').save(paths[3])
+        assert asyncio.run(scraper.publish_to_telegram('**Post**', paths[0], album_paths=paths)) is True
+        assert scraper._publisher.albums == [[paths[0], paths[2]]]
+        assert not os.path.exists(paths[1])
+        asyncio.run(scraper.clients.close())
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование общего конвейера скраперов")
+    print("=" * 50)
+    test_registry_lists_sources()
+    test_plugin_runs_through_pipeline()
+    test_media_download_overlaps_generation()
+    test_ranking_returns_shortlist()
+    test_backup_replaces_failed_article()
+    test_failed_publish_resumes_from_checkpoint()
+    test_multi_post_run_is_paced()
+    test_interrupted_bookkeeping_is_recorded()
+    test_prepared_post_is_published_later()
+    test_stale_ready_post_expires()
+    test_published_story_is_skipped()
+    test_album_keeps_only_valid_photos()
+    print("🎉 Все тесты конвейера прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
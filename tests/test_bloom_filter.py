@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Тест фильтра Блума перед хранилищем опубликованных URL
+Test script for the persisted bloom filter
+"""
+
+import sys
+import os
+import random
+import tempfile
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bloom_filter
+from bloom_filter import BloomFilter
+from state_store import StateStore, PublishedUrlStore
+
+
+def test_no_false_negatives_and_fp_rate():
+    """Тест отсутствия ложных промахов и доли ложных срабатываний"""
+    rng = random.Random(42)
+    keys = [rng.getrandbits(64) - 2 ** 63 for _ in range(5000)]
+    others = [rng.getrandbits(64) - 2 ** 63 for _ in range(20000)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bloom = BloomFilter.create(os.path.join(tmp_dir, 'urls.bloom'), 5000, 0.01, keys)
+        assert bloom.count == 5000
+        assert all(key in bloom for key in keys)
+        false_positives = sum(1 for key in others if key in bloom)
+        print(f"📊 Ложные срабатывания: {false_positives / len(others):.4f}")
+        assert false_positives / len(others) < 0.02
+        bloom.close()
+
+
+def test_persisted_between_runs():
+    """Тест повторного открытия фильтра без пересборки"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'state.db')
+        store = StateStore(db_path)
+        urls = PublishedUrlStore(store, 'techcrunch')
+        urls.add_many([f'https://techcrunch.com/story-{i}/' for i in range(100)])
+        store.close()
+
+        store = StateStore(db_path)
+        bloom = store.get_url_filter()
+        assert bloom is not None and bloom.count == 100
+        urls = PublishedUrlStore(store, 'techcrunch')
+        assert 'https://techcrunch.com/story-7' in urls
+        assert 'https://techcrunch.com/story-1000' not in urls
+        store.close()
+
+
+def test_rebuild_when_out_of_sync():
+    """Тест пересборки фильтра, если база изменилась в обход него"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'state.db')
+        store = StateStore(db_path)
+        urls = PublishedUrlStore(store, 'techcrunch')
+        urls.add_many(['https://techcrunch.com/a', 'https://techcrunch.com/b'])
+        assert urls.remove('https://techcrunch.com/a')
+        assert store.get_url_filter().count == 1
+        store.close()
+
+        # Запись без фильтра (например, старой версией программы)
+        os.environ['BLOOM_FP_RATE'] = '0'
+        try:
+            store = StateStore(db_path)
+            PublishedUrlStore(store, 'techcrunch').add('https://techcrunch.com/c')
+            store.close()
+        finally:
+            del os.environ['BLOOM_FP_RATE']
+
+        store = StateStore(db_path)
+        assert 'https://techcrunch.com/c' in PublishedUrlStore(store, 'techcrunch')
+        assert store.get_url_filter().count == 2
+        store.close()
+
+
+def test_rebuild_when_file_is_mapped():
+    """Тест пересборки как в Windows: отображенный в память файл заменить нельзя"""
+    real_replace, retry_seconds = os.replace, bloom_filter.REPLACE_RETRY_SECONDS
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        urls = PublishedUrlStore(store, 'techcrunch')
+        urls.add_many([f'https://techcrunch.com/story-{i}/' for i in range(5)])
+        old = store.get_url_filter()
+
+        def windows_replace(src, dst):
+            if not old.mm.closed:
+                raise PermissionError(f"file is mapped: {dst}")
+            real_replace(src, dst)
+
+        def held_by_other_process(src, dst):
+            raise PermissionError(f"file is mapped by another process: {dst}")
+
+        try:
+            os.replace = windows_replace
+            bloom = store.rebuild_url_filter(20000)
+            assert bloom.capacity == 40000 and bloom.count == 5
+
+            # Файл держит другой процесс: остается прежний фильтр, запись не теряется
+            os.replace = held_by_other_process
+            bloom_filter.REPLACE_RETRY_SECONDS = 0
+            bloom = store.rebuild_url_filter(50000)
+            assert bloom.capacity == 40000 and bloom.count == 5
+            urls.add('https://techcrunch.com/new-story/')
+            assert 'https://techcrunch.com/new-story/' in urls and store.get_url_filter().count == 6
+            assert not [name for name in os.listdir(tmp_dir) if name.endswith('.tmp')]
+        finally:
+            os.replace, bloom_filter.REPLACE_RETRY_SECONDS = real_replace, retry_seconds
+            store.close()
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование фильтра Блума")
+    print("=" * 50)
+    test_no_false_negatives_and_fp_rate()
+    test_persisted_between_runs()
+    test_rebuild_when_out_of_sync()
+    test_rebuild_when_file_is_mapped()
+    print("🎉 Все тесты фильтра Блума прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
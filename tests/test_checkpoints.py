@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Тест контрольных точек подготовки постов
+Test script for per-article run checkpoints
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoints import RunCheckpoints
+from state_store import StateStore
+
+ARTICLE = {'title': 'Robots learn to fold laundry', 'link': 'https://example.com/robots',
+           'parsed_date': date(2025, 7, 22)}
+
+
+def make_item(tmp_dir):
+    media_path = os.path.join(tmp_dir, 'download.jpg')
+    with open(media_path, 'wb') as f:
+        f.write(b'image')
+    return {'article': dict(ARTICLE), 'content': 'Full text', 'media_url': 'https://example.com/a.jpg',
+            'media_urls': ['https://example.com/a.jpg'], 'media_paths': [media_path],
+            'post_content': 'Post', 'backups': object()}
+
+
+def test_save_and_resume():
+    """Тест сохранения точки: данные этапа и медиафайлы доступны следующему запуску"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        checkpoints = RunCheckpoints(store)
+        item = make_item(tmp_dir)
+        checkpoints.save('techcrunch', item, 'prepare')
+
+        # Медиафайл перенесен из временной папки в папку контрольных точек
+        assert item['stage'] == 'prepare'
+        assert checkpoints.holds(item['media_paths'][0]) and os.path.exists(item['media_paths'][0])
+
+        store.close()
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        pending = RunCheckpoints(store).pending('techcrunch')
+        assert len(pending) == 1
+        assert pending[0]['stage'] == 'prepare' and pending[0]['post_content'] == 'Post'
+        assert pending[0]['media_paths'] == item['media_paths']
+        assert pending[0]['article']['parsed_date'] == '2025-07-22'
+        assert 'backups' not in pending[0]
+        assert RunCheckpoints(store).pending('ieee_spectrum') == []
+        store.close()
+
+
+def test_clear_removes_media():
+    """Тест удаления точки после публикации вместе с медиафайлами"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        checkpoints = RunCheckpoints(store)
+        item = make_item(tmp_dir)
+        checkpoints.save('techcrunch', item, 'prepare')
+        checkpoints.clear('techcrunch', ARTICLE['link'])
+        assert checkpoints.pending('techcrunch') == []
+        assert not os.path.exists(item['media_paths'][0])
+        store.close()
+
+
+def test_stale_checkpoints_are_collected():
+    """Тест сборки мусора: устаревшие точки не продолжаются и удаляются с файлами"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        checkpoints = RunCheckpoints(store, ttl_hours=1)
+        item = make_item(tmp_dir)
+        checkpoints.save('techcrunch', item, 'scrape')
+        store.execute("UPDATE run_checkpoints SET updated_at = '2000-01-01T00:00:00'")
+
+        assert checkpoints.pending('techcrunch') == []
+        assert checkpoints.gc() == 1
+        assert not os.path.exists(item['media_paths'][0])
+        assert checkpoints.gc() == 0
+        store.close()
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование контрольных точек")
+    print("=" * 50)
+    test_save_and_resume()
+    test_clear_removes_media()
+    test_stale_checkpoints_are_collected()
+    print("🎉 Все тесты контрольных точек прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,7 +26,9 @@ def test_date_parsing():
             ("Today", scraper.today),
             ("Yesterday", scraper.today - timedelta(days=1)),
             ("2 hours ago", scraper.today),
-            ("1 day ago", scraper.today),
+            ("1 day ago", scraper.today - timedelta(days=1)),
+            ("2d", scraper.today - timedelta(days=2)),
+            ("17h", scraper.today),
             ("", None),
             ("Invalid date", None),
         ]
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Тест отложенного импорта тяжелых зависимостей
+Test that scrapers and CLIs do not import openai, telegram, bs4 or PIL at startup
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_PACKAGES = ('openai', 'telegram', 'bs4', 'PIL', 'feedparser')
+
+
+def imported_heavy_packages(code):
+    """Тяжелые пакеты, загруженные после выполнения кода в новом интерпретаторе"""
+    check = f"{code}\nimport sys, json\nprint(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    env = dict(os.environ, OPENROUTER_API_KEY='x', TELEGRAM_BOT_TOKEN='123:abc', TELEGRAM_CHANNEL_ID='@x',
+               STATE_DB_PATH=os.path.join(ROOT, 'tests', 'lazy_imports_state.db'))
+    result = subprocess.run([sys.executable, '-c', check], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    return [package for package in HEAVY_PACKAGES if package in modules]
+
+
+def test_cli_imports_are_light():
+    """Тест утилит управления"""
+    for module in ('manage_state', 'manage_archive', 'manage_published_urls', 'manage_ieee_urls'):
+        assert imported_heavy_packages(f'import {module}') == [], module
+
+
+def test_scraper_init_defers_clients():
+    """Тест создания скраперов без импорта клиентов OpenRouter и Telegram"""
+    try:
+        code = ('from techcrunch_scraper import TechCrunchScraper\n'
+                'from ieee_spectrum_scraper import IEEESpectrumScraper\n'
+                'TechCrunchScraper(); IEEESpectrumScraper()')
+        assert imported_heavy_packages(code) == []
+        code = 'from techcrunch_scraper import TechCrunchScraper\nTechCrunchScraper().openai_client'
+        assert imported_heavy_packages(code) == ['openai']
+    finally:
+        for suffix in ('', '-wal', '-shm', '.bloom', '.bloom.lock'):
+            path = os.path.join(ROOT, 'tests', 'lazy_imports_state.db' + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование отложенного импорта")
+    print("=" * 50)
+    test_cli_imports_are_light()
+    test_scraper_init_defers_clients()
+    print("🎉 Все тесты отложенного импорта прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Корпус корректности однопроходного конвертера Markdown -> Telegram HTML
+Correctness corpus for the single-pass Markdown to Telegram HTML converter
+"""
+
+import sys
+import os
+from html.parser import HTMLParser
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_html import convert_markdown_to_html
+
+# Базовые случаи из tests/test_markdown_conversion.py и новые случаи экранирования/вложенности
+CORPUS = [
+    ('Это **жирный текст** и *курсив*',
+     'Это <b>жирный текст</b> и <i>курсив</i>'),
+    ('**Важная новость** о __технологиях__',
+     '<b>Важная новость</b> о <u>технологиях</u>'),
+    ('Код: `print("Hello")` и ~~старый текст~~',
+     'Код: <code>print("Hello")</code> и <s>старый текст</s>'),
+    ('Ссылка: [TechCrunch](https://techcrunch.com)',
+     'Ссылка: <a href="https://techcrunch.com">TechCrunch</a>'),
+    ('Смешанный **текст** с *разными* __стилями__',
+     'Смешанный <b>текст</b> с <i>разными</i> <u>стилями</u>'),
+    ('AT&T купила <компанию>',
+     'AT&amp;T купила &lt;компанию&gt;'),
+    ('Уже экранировано: &amp; &lt; &#128640;',
+     'Уже экранировано: &amp; &lt; &#128640;'),
+    ('`a < b && c`',
+     '<code>a &lt; b &amp;&amp; c</code>'),
+    ('[**Читать** статью](https://example.com/?a=1&b=2)',
+     '<a href="https://example.com/?a=1&amp;b=2"><b>Читать</b> статью</a>'),
+    ('**жирный *и курсив***',
+     '<b>жирный <i>и курсив</i></b>'),
+    ('**a *b** c*',
+     '<b>a <i>b</i></b><i> c</i>'),
+    ('Непарный ** маркер',
+     'Непарный ** маркер'),
+    ('**строка\nдругая**',
+     '**строка\nдругая**'),
+    ('Разделитель ****',
+     'Разделитель ****'),
+    ('', ''),
+]
+
+
+class TagBalanceChecker(HTMLParser):
+    """Проверка правильной вложенности тегов"""
+
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.valid = True
+
+    def handle_starttag(self, tag, attrs):
+        self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if not self.stack or self.stack.pop() != tag:
+            self.valid = False
+
+
+def is_well_formed(html):
+    checker = TagBalanceChecker()
+    checker.feed(html)
+    checker.close()
+    return checker.valid and not checker.stack
+
+
+def test_corpus():
+    """Тест корпуса конвертации"""
+    failures = []
+    for markdown, expected in CORPUS:
+        result = convert_markdown_to_html(markdown)
+        if result != expected:
+            failures.append((markdown, result, expected))
+            print(f"❌ {markdown!r}: {result!r} != {expected!r}")
+    assert not failures
+
+
+def test_output_is_well_formed():
+    """Тест корректной вложенности тегов на произвольной разметке"""
+    samples = [
+        '*a **b* c** d',
+        '__a ~~b __c~~ d',
+        '**a [*b*](http://x) c**',
+        '~~**__*x*__**~~',
+        '* пункт\n* пункт **два**',
+    ]
+    for sample in samples:
+        result = convert_markdown_to_html(sample)
+        print(f"🔍 {sample!r} -> {result!r}")
+        assert is_well_formed(result), result
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Корпус корректности Markdown -> HTML")
+    print("=" * 50)
+    test_corpus()
+    test_output_is_well_formed()
+    print("🎉 Все тесты корпуса прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Тест проверки медиафайлов перед публикацией
+Test script for media validation against Telegram upload limits
+"""
+
+import sys
+import os
+import tempfile
+from PIL import Image
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_validation import validate_media, media_type_for
+
+
+def test_valid_photo_and_gif():
+    """Тест корректных файлов: фото и GIF принимаются"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        photo = os.path.join(tmp_dir, 'photo.jpg')
+        Image.new('RGB', (640, 480)).save(photo)
+        gif = os.path.join(tmp_dir, 'anim.gif')
+        Image.new('P', (32, 32)).save(gif)
+        assert validate_media(photo) is None
+        assert validate_media(gif) is None
+        assert (media_type_for(photo), media_type_for(gif)) == ('photo', 'animation')
+
+
+def test_rejected_files():
+    """Тест файлов, которые Telegram не примет: нет файла, пустой, битый, неверные размеры"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        assert validate_media(os.path.join(tmp_dir, 'missing.jpg')) == 'file is missing'
+
+        empty = os.path.join(tmp_dir, 'empty.jpg')
+        open(empty, 'wb').close()
+        assert validate_media(empty) == 'file is empty'
+
+        broken = os.path.join(tmp_dir, 'broken.jpg')
+        with open(broken, 'wb') as f:
+            f.write(b'<html>not an image</html>')
+        assert validate_media(broken).startswith('not a valid image')
+
+        banner = os.path.join(tmp_dir, 'banner.png')
+        Image.new('RGB', (2100, 100)).save(banner)
+        assert validate_media(banner).startswith('unsupported photo aspect ratio')
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование проверки медиафайлов")
+    print("=" * 50)
+    test_valid_photo_and_gif()
+    test_rejected_files()
+    print("🎉 Все тесты проверки медиафайлов прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
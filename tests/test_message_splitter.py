@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Тест разбиения длинных постов на части
+Test script for the tag-aware Telegram message splitter
+"""
+
+import sys
+import os
+import re
+import html
+from html.parser import HTMLParser
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from message_splitter import split_html_message, truncate_html_message, utf16_length
+
+
+class TagBalanceChecker(HTMLParser):
+    """Проверка правильной вложенности тегов"""
+
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.valid = True
+
+    def handle_starttag(self, tag, attrs):
+        self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if not self.stack or self.stack.pop() != tag:
+            self.valid = False
+
+
+def visible_text(chunk):
+    """Видимый текст части, как его посчитает Telegram"""
+    return html.unescape(re.sub(r'<[^>]+>', '', chunk))
+
+
+def assert_valid_chunks(chunks, limit):
+    for chunk in chunks:
+        checker = TagBalanceChecker()
+        checker.feed(chunk)
+        checker.close()
+        assert checker.valid and not checker.stack, chunk
+        assert utf16_length(visible_text(chunk)) <= limit, chunk
+
+
+def test_split_keeps_tags_balanced():
+    """Тест закрытия и повторного открытия тегов между частями"""
+    paragraph = '<b>Жирный <i>курсив</i> и</b> <a href="https://example.com/?a=1&amp;b=2">ссылка &amp; текст</a>. '
+    post = (paragraph * 20 + '\n\n') * 10
+    chunks = split_html_message(post, limit=500)
+    print(f"✂️ {len(post)} символов -> {len(chunks)} частей")
+    assert len(chunks) > 1
+    assert_valid_chunks(chunks, 500)
+    original = ' '.join(visible_text(post).split())
+    joined = ' '.join(' '.join(visible_text(chunk) for chunk in chunks).split())
+    assert joined == original
+
+
+def test_split_prefers_paragraphs():
+    """Тест разбиения по границам абзацев"""
+    paragraphs = ['Абзац номер %d. ' % i + 'слово ' * 40 for i in range(6)]
+    post = '\n\n'.join(paragraphs)
+    chunks = split_html_message(post, limit=600)
+    assert_valid_chunks(chunks, 600)
+    for chunk in chunks[:-1]:
+        assert chunk.endswith('\n\n'), repr(chunk[-20:])
+
+
+def test_split_counts_utf16_units():
+    """Тест учета эмодзи как двух единиц UTF-16"""
+    post = '🚀' * 300
+    chunks = split_html_message(post, limit=100)
+    assert [len(chunk) for chunk in chunks] == [50] * 6
+
+
+def test_short_message_unchanged():
+    """Тест короткого сообщения"""
+    post = '<b>Короткий</b> пост'
+    assert split_html_message(post) == [post]
+    assert truncate_html_message(post, 1024) == post
+
+
+def test_truncate_caption():
+    """Тест обрезки подписи без разрыва тегов"""
+    post = '<b>' + 'очень длинная подпись ' * 100 + '</b>'
+    caption = truncate_html_message(post, 1024)
+    assert caption.endswith('...</b>')
+    assert_valid_chunks([caption], 1024)
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование разбиения сообщений")
+    print("=" * 50)
+    test_split_keeps_tags_balanced()
+    test_split_prefers_paragraphs()
+    test_split_counts_utf16_units()
+    test_short_message_unchanged()
+    test_truncate_caption()
+    print("🎉 Все тесты разбиения прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
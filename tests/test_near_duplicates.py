@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Тест поиска почти-дублей историй между источниками
+Test script for cross-source near-duplicate story detection
+"""
+
+import sys
+import os
+import time
+import tempfile
+from datetime import datetime, timedelta
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicates import NearDuplicateIndex, fingerprint_story, similarity
+from state_store import StateStore
+
+TECHCRUNCH_STORY = (
+    'OpenAI releases GPT-5 with improved reasoning',
+    '<p>OpenAI on Thursday released GPT-5, its latest large language model, which the company '
+    'says offers improved reasoning and coding abilities.</p>'
+)
+IEEE_STORY = (
+    'OpenAI launches GPT-5 with improved reasoning',
+    'OpenAI released GPT-5 on Thursday, its latest large language model, which the company says '
+    'offers improved reasoning and coding.'
+)
+OTHER_STORY = (
+    'Nvidia unveils new AI chip for data centers',
+    'Nvidia on Tuesday announced a new chip that the company says offers improved AI performance '
+    'for large language model training.'
+)
+
+
+def test_cross_source_duplicate_found():
+    """Тест обнаружения той же истории у другого источника"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        index = NearDuplicateIndex(store, threshold=0.5, window_days=14)
+        index.add('https://techcrunch.com/gpt-5', 'techcrunch', TECHCRUNCH_STORY[0],
+                  fingerprint_story(*TECHCRUNCH_STORY))
+
+        duplicate = index.find(fingerprint_story(*IEEE_STORY))
+        print(f"🔍 Найден дубль: {duplicate}")
+        assert duplicate and duplicate['source'] == 'techcrunch'
+        assert index.find(fingerprint_story(*OTHER_STORY)) is None
+        store.close()
+
+
+def test_index_shared_between_processes():
+    """Тест видимости подписей, записанных другим подключением"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'state.db')
+        reader_store = StateStore(db_path)
+        reader = NearDuplicateIndex(reader_store, threshold=0.5, window_days=14)
+
+        writer_store = StateStore(db_path)
+        NearDuplicateIndex(writer_store, threshold=0.5, window_days=14).add(
+            'https://spectrum.ieee.org/gpt-5', 'ieee_spectrum', IEEE_STORY[0], fingerprint_story(*IEEE_STORY))
+        writer_store.close()
+
+        assert reader.find(fingerprint_story(*TECHCRUNCH_STORY))['source'] == 'ieee_spectrum'
+        reader_store.close()
+
+
+def test_lookup_is_fast():
+    """Тест скорости поиска по индексу с большой историей"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        index = NearDuplicateIndex(store, threshold=0.5, window_days=14)
+        for i in range(2000):
+            signature = fingerprint_story(f'Story number {i} about topic{i}', f'lead{i} text{i} words{i}')
+            for key in index._band_keys(signature):
+                index.buckets.setdefault(key, []).append((f'url{i}', 'techcrunch', '', signature, '9999'))
+
+        signature = fingerprint_story(*OTHER_STORY)
+        start = time.perf_counter()
+        for _ in range(100):
+            index.find(signature)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+        print(f"⏱️ Поиск: {elapsed_ms:.3f} мс")
+        assert elapsed_ms < 5
+        store.close()
+
+
+def test_recall_at_threshold():
+    """Тест полноты LSH: дубли со сходством выше порога находятся через полосы, а не теряются"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        index = NearDuplicateIndex(store, threshold=0.5, window_days=14)
+        pairs = []
+        for story in range(300):
+            # 12 общих слов и по 4 своих: коэффициент Жаккара 12 / 20 = 0.6
+            shared = [f'shared{story}x{word}' for word in range(12)]
+            original = fingerprint_story(' '.join(shared + [f'first{story}x{word}' for word in range(4)]))
+            variant = fingerprint_story(' '.join(shared + [f'second{story}x{word}' for word in range(4)]))
+            pairs.append((f'https://example.com/{story}', original, variant))
+        index.add_many([(url, 'techcrunch', '', original) for url, original, _ in pairs])
+
+        above = [(url, variant) for url, original, variant in pairs if similarity(original, variant) >= 0.5]
+        found = [url for url, variant in above if (index.find(variant) or {}).get('url') == url]
+        print(f"🎯 Найдено через полосы: {len(found)} из {len(above)}")
+        assert len(found) >= 0.97 * len(above)
+        store.close()
+
+
+def test_stale_entries_are_pruned():
+    """Тест удаления из памяти подписей, вышедших из окна"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        index = NearDuplicateIndex(store, threshold=0.5, window_days=14)
+        published_at = (datetime.now() - timedelta(days=10)).isoformat()
+        index.add('https://techcrunch.com/gpt-5', 'techcrunch', TECHCRUNCH_STORY[0],
+                  fingerprint_story(*TECHCRUNCH_STORY), published_at)
+        assert index.buckets and index.oldest == published_at
+
+        index.window_days = 7
+        assert index.find(fingerprint_story(*IEEE_STORY)) is None
+        assert index.buckets == {} and index.oldest is None
+        store.close()
+
+
+def test_reserved_story_blocks_other_source():
+    """Тест резерва истории, которую сейчас публикует другой источник процесса"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        index = NearDuplicateIndex(store, threshold=0.5, window_days=14)
+        assert index.reserve('https://techcrunch.com/gpt-5', 'techcrunch', TECHCRUNCH_STORY[0],
+                             fingerprint_story(*TECHCRUNCH_STORY))
+        assert not index.reserve('https://spectrum.ieee.org/gpt-5', 'ieee_spectrum', IEEE_STORY[0],
+                                 fingerprint_story(*IEEE_STORY))
+        assert index.find(fingerprint_story(*IEEE_STORY))['source'] == 'techcrunch'
+
+        index.release('https://techcrunch.com/gpt-5')
+        assert index.reserve('https://spectrum.ieee.org/gpt-5', 'ieee_spectrum', IEEE_STORY[0],
+                             fingerprint_story(*IEEE_STORY))
+        store.close()
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование поиска почти-дублей")
+    print("=" * 50)
+    test_cross_source_duplicate_found()
+    test_index_shared_between_processes()
+    test_lookup_is_fast()
+    test_recall_at_threshold()
+    test_stale_entries_are_pruned()
+    test_reserved_story_blocks_other_source()
+    print("🎉 Все тесты почти-дублей прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
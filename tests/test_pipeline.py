@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Тест асинхронного конвейера с ограниченными очередями
+Test script for the bounded-queue stage pipeline
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import Pipeline, Stage
+
+STEP_SECONDS = 0.05
+
+
+class ConcurrencyProbe:
+    """Обработчик этапа, запоминающий максимальное число одновременных вызовов"""
+
+    def __init__(self, delay=STEP_SECONDS):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, item):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return item
+
+
+def test_stage_concurrency_limits():
+    """Тест лимитов параллельности и перекрытия этапов"""
+    fetch, llm, publish = ConcurrencyProbe(), ConcurrencyProbe(), ConcurrencyProbe()
+    pipeline = Pipeline([Stage('fetch', fetch, concurrency=3), Stage('llm', llm, concurrency=2),
+                         Stage('publish', publish, concurrency=1)])
+
+    start = time.monotonic()
+    results = asyncio.run(pipeline.run(range(6)))
+    elapsed = time.monotonic() - start
+
+    assert sorted(results) == list(range(6))
+    assert (fetch.peak, llm.peak, publish.peak) == (3, 2, 1)
+    # Последовательно: 6 элементов x 3 этапа; с перекрытием - время ограничено публикацией
+    print(f"⏱️ 6 элементов прошли 3 этапа за {elapsed:.2f} с (последовательно {18 * STEP_SECONDS:.2f} с)")
+    assert elapsed < 12 * STEP_SECONDS
+
+
+def test_bounded_queue_backpressure():
+    """Тест обратного давления: медленный этап не дает первому уйти далеко вперед"""
+    started = []
+
+    async def fast(item):
+        started.append(item)
+        return item
+
+    async def slow(item):
+        await asyncio.sleep(STEP_SECONDS)
+        # Обработано item + 1 элементов, ожидают в очереди и у быстрого этапа - не больше 3
+        assert len(started) <= item + 1 + 3
+        return item
+
+    pipeline = Pipeline([Stage('fast', fast, queue_size=1), Stage('slow', slow, queue_size=1)])
+    assert asyncio.run(pipeline.run(range(8))) == list(range(8))
+
+
+def test_failed_and_dropped_items():
+    """Тест отбрасывания элементов: None и исключение не останавливают остальные"""
+    async def parse(item):
+        if item == 1:
+            raise ValueError('broken page')
+        return None if item == 2 else item * 10
+
+    async def publish(item):
+        return item + 1
+
+    pipeline = Pipeline([Stage('parse', parse, concurrency=2), Stage('publish', publish)])
+    assert sorted(asyncio.run(pipeline.run(range(4)))) == [1, 31]
+    stats = pipeline.stats_dict()
+    assert (stats['parse']['passed'], stats['parse']['dropped'], stats['parse']['failed']) == (2, 1, 1)
+    assert stats['publish']['passed'] == 2
+
+
+def test_limits_from_env():
+    """Тест лимитов этапа из переменных окружения"""
+    os.environ['PIPELINE_LLM_CONCURRENCY'] = '5'
+    os.environ['PIPELINE_QUEUE_SIZE'] = '7'
+    try:
+        stage = Stage.from_env('llm', ConcurrencyProbe(), concurrency=2)
+        assert (stage.concurrency, stage.queue_size) == (5, 7)
+    finally:
+        del os.environ['PIPELINE_LLM_CONCURRENCY']
+        del os.environ['PIPELINE_QUEUE_SIZE']
+    assert Stage.from_env('llm', ConcurrencyProbe(), concurrency=2).concurrency == 2
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование конвейера")
+    print("=" * 50)
+    test_stage_concurrency_limits()
+    test_bounded_queue_backpressure()
+    test_failed_and_dropped_items()
+    test_limits_from_env()
+    print("🎉 Все тесты конвейера прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Тест общего запуска всех скраперов в одном event loop
+Test script for the unified multi-source runner
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_all_scrapers import create_scrapers, run_all, missing_env_vars, CHANNEL_ENV_VARS
+from scraper_clients import ScraperClients
+from state_store import StateStore
+
+BLOCKING_SECONDS = 0.3
+
+
+def slow_empty_fetch():
+    """Блокирующая загрузка ленты без новых статей"""
+    time.sleep(BLOCKING_SECONDS)
+    return []
+
+
+class FailingScraper:
+    async def run_daily_scraping(self):
+        raise RuntimeError('feed is down')
+
+
+def test_scrapers_share_clients():
+    """Тест общих клиентов и базы состояния у всех скраперов"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        clients = ScraperClients(StateStore(os.path.join(tmp_dir, 'state.db')))
+        scrapers = create_scrapers(['techcrunch', 'ieee_spectrum'], clients)
+        techcrunch, ieee = scrapers['techcrunch'], scrapers['ieee_spectrum']
+        assert techcrunch.http is ieee.http is clients.http
+        assert techcrunch.state_store is ieee.state_store is clients.state_store
+        assert techcrunch.send_queue is ieee.send_queue
+        assert techcrunch.near_duplicates is ieee.near_duplicates
+        asyncio.run(clients.close())
+
+
+def test_sources_run_concurrently():
+    """Тест параллельного выполнения блокирующих этапов разных источников"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        clients = ScraperClients(StateStore(os.path.join(tmp_dir, 'state.db')))
+        scrapers = create_scrapers(['techcrunch', 'ieee_spectrum'], clients)
+        scrapers['techcrunch'].scrape_rss_feed = slow_empty_fetch
+        scrapers['ieee_spectrum'].scrape_ieee_articles = slow_empty_fetch
+        scrapers['broken'] = FailingScraper()
+
+        async def scenario():
+            try:
+                return await run_all(scrapers)
+            finally:
+                await clients.close()
+
+        start = time.monotonic()
+        results = asyncio.run(scenario())
+        elapsed = time.monotonic() - start
+        print(f"⏱️ Два источника по {BLOCKING_SECONDS} с выполнены за {elapsed:.2f} с")
+        assert elapsed < BLOCKING_SECONDS * 1.8
+        assert results['techcrunch']['success'] is False and results['techcrunch']['error'] is None
+        assert results['broken']['error'] == 'feed is down'
+
+
+def test_channel_list_satisfies_required_vars():
+    """Тест проверки окружения: достаточно списка каналов TELEGRAM_CHANNEL_IDS без TELEGRAM_CHANNEL_ID"""
+    names = ('OPENROUTER_API_KEY', 'TELEGRAM_BOT_TOKEN', 'TELEGRAM_CHANNEL_ID', 'TELEGRAM_CHANNEL_IDS',
+             'TELEGRAM_CHANNELS_CONFIG')
+    saved = {name: os.environ.pop(name) for name in names if name in os.environ}
+    try:
+        os.environ.update(OPENROUTER_API_KEY='key', TELEGRAM_BOT_TOKEN='123:abc')
+        assert missing_env_vars() == [CHANNEL_ENV_VARS]
+        os.environ['TELEGRAM_CHANNEL_IDS'] = '@main,@regional'
+        assert missing_env_vars() == []
+    finally:
+        for name in names:
+            os.environ.pop(name, None)
+        os.environ.update(saved)
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование общего запуска скраперов")
+    print("=" * 50)
+    test_scrapers_share_clients()
+    test_sources_run_concurrently()
+    test_channel_list_satisfies_required_vars()
+    print("🎉 Все тесты общего запуска прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Тест режима демона: расписание, разброс запусков и остановка
+Test script for the in-process scraper scheduler
+"""
+
+import sys
+import os
+import time
+import random
+import asyncio
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_daemon import ScraperDaemon, load_schedule, next_delay
+
+
+class FakeScraper:
+    """Скрапер, который только считает запуски и проверяет, что запуски одного источника не пересекаются"""
+
+    def __init__(self, log, duration=0.01):
+        self.log = log
+        self.duration = duration
+        self.active = 0
+        self.starts = []
+
+    async def run_daily_scraping(self):
+        self.active += 1
+        assert self.active == 1
+        self.log.append(self)
+        self.starts.append(time.monotonic())
+        await asyncio.sleep(self.duration)
+        self.active -= 1
+        return True
+
+
+def test_schedule_from_env():
+    """Тест интервалов по источникам из переменных окружения"""
+    os.environ['DAEMON_INTERVAL_MINUTES'] = '60'
+    os.environ['DAEMON_INTERVAL_IEEE_SPECTRUM'] = '15'
+    try:
+        assert load_schedule() == {'techcrunch': 3600.0, 'ieee_spectrum': 900.0}
+        assert load_schedule(['ieee_spectrum']) == {'ieee_spectrum': 900.0}
+    finally:
+        del os.environ['DAEMON_INTERVAL_MINUTES']
+        del os.environ['DAEMON_INTERVAL_IEEE_SPECTRUM']
+
+
+def test_jitter_bounds():
+    """Тест разброса паузы между запусками"""
+    rng = random.Random(1)
+    delays = [next_delay(600, 60, rng) for _ in range(1000)]
+    assert all(540 <= delay <= 660 for delay in delays)
+    assert len(set(delays)) > 1
+    assert next_delay(10, 60, rng) >= 0
+
+
+def test_daemon_runs_sources_and_stops():
+    """Тест запусков по расписанию и остановки без прерывания запуска"""
+    async def scenario():
+        log = []
+        fast, slow = FakeScraper(log), FakeScraper(log)
+        daemon = ScraperDaemon({'fast': fast, 'slow': slow}, {'fast': 0.02, 'slow': 10})
+        task = asyncio.ensure_future(daemon.run(install_signals=False))
+        await asyncio.sleep(0.2)
+        daemon.stop()
+        await asyncio.wait_for(task, timeout=5)
+        return daemon, log, fast, slow
+
+    daemon, log, fast, slow = asyncio.run(scenario())
+    print(f"📊 Запуски: {daemon.runs}")
+    assert daemon.runs['slow'] == 1 and log.count(slow) == 1
+    assert daemon.runs['fast'] >= 3
+    assert fast.active == slow.active == 0
+
+
+def test_slow_source_does_not_delay_others():
+    """Тест расписания: медленный источник не задерживает другие, интервал считается от начала запуска"""
+    async def scenario():
+        log = []
+        fast, slow = FakeScraper(log, duration=0.08), FakeScraper(log, duration=10)
+        daemon = ScraperDaemon({'fast': fast, 'slow': slow}, {'fast': 0.1, 'slow': 60})
+        task = asyncio.ensure_future(daemon.run(install_signals=False))
+        await asyncio.sleep(0.65)
+        daemon.stop()
+        daemon.stop()
+        await asyncio.wait_for(task, timeout=5)
+        return fast, slow
+
+    fast, slow = asyncio.run(scenario())
+    gaps = [later - earlier for earlier, later in zip(fast.starts, fast.starts[1:])]
+    print(f"📊 Паузы между запусками: {[round(gap, 3) for gap in gaps]}")
+    # Пока идет 10-секундный запуск slow, fast запускается каждые 0.1 с, а не каждые 0.18 с
+    assert len(slow.starts) == 1 and len(fast.starts) >= 5
+    assert sum(gaps) / len(gaps) < 0.15
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование режима демона")
+    print("=" * 50)
+    test_schedule_from_env()
+    test_jitter_bounds()
+    test_daemon_runs_sources_and_stops()
+    test_slow_source_does_not_delay_others()
+    print("🎉 Все тесты режима демона прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Тест SQLite хранилища опубликованных URL
+Test script for the SQLite-backed published URL store
+"""
+
+import sys
+import os
+import json
+import tempfile
+import contextlib
+from io import StringIO
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_store import StateStore, PublishedUrlStore
+import manage_state
+
+
+def make_store(tmp_dir):
+    return StateStore(os.path.join(tmp_dir, 'state.db'))
+
+
+def test_add_and_contains():
+    """Тест добавления и проверки URL по источникам"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir)
+        techcrunch = PublishedUrlStore(store, 'techcrunch')
+        ieee = PublishedUrlStore(store, 'ieee_spectrum')
+
+        techcrunch.add('https://techcrunch.com/a')
+        techcrunch.add('https://techcrunch.com/a')
+        ieee.add_many(['https://spectrum.ieee.org/b', 'https://spectrum.ieee.org/c'])
+
+        assert 'https://techcrunch.com/a' in techcrunch
+        assert 'https://techcrunch.com/missing' not in techcrunch
+        assert len(techcrunch) == 1
+        assert len(ieee) == 2
+        assert list(techcrunch) == ['https://techcrunch.com/a']
+
+        assert ieee.remove('https://spectrum.ieee.org/b')
+        assert not ieee.remove('https://spectrum.ieee.org/b')
+        ieee.clear()
+        assert len(ieee) == 0 and len(techcrunch) == 1
+        store.close()
+
+
+def test_persists_between_connections():
+    """Тест сохранения URL после переподключения"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir)
+        PublishedUrlStore(store, 'techcrunch').add('https://techcrunch.com/a')
+        store.close()
+
+        store = make_store(tmp_dir)
+        assert 'https://techcrunch.com/a' in PublishedUrlStore(store, 'techcrunch')
+        store.close()
+
+
+def test_migrate_json_once():
+    """Тест однократного переноса старого JSON файла"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'published_urls.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'published_urls': ['https://techcrunch.com/a', 'https://techcrunch.com/b']}, f)
+
+        store = make_store(tmp_dir)
+        urls = PublishedUrlStore(store, 'techcrunch')
+        assert urls.migrate_json(json_path) == 2
+        urls.remove('https://techcrunch.com/a')
+        # Повторный запуск не возвращает удаленные URL
+        assert urls.migrate_json(json_path) == 0
+        assert list(urls) == ['https://techcrunch.com/b']
+        store.close()
+
+
+def test_paginated_listing_and_search():
+    """Тест постраничного вывода и поиска по префиксу и подстроке"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir)
+        techcrunch = PublishedUrlStore(store, 'techcrunch')
+        techcrunch.add_many([f'https://techcrunch.com/2025/07/{i:02d}/story-{i}/' for i in range(1, 26)])
+        PublishedUrlStore(store, 'ieee_spectrum').add('https://spectrum.ieee.org/robot-story-7')
+
+        pages = [list(techcrunch.iter_urls(offset=offset, limit=10, batch_size=4)) for offset in (0, 10, 20)]
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert [row[0] for page in pages for row in page] == list(techcrunch)
+
+        prefix = [row[0] for row in techcrunch.iter_urls(prefix='https://techcrunch.com/2025/07/1')]
+        assert len(prefix) == 10
+        all_sources = PublishedUrlStore(store, None)
+        assert len(all_sources) == 26
+        assert sorted(row[1] for row in all_sources.iter_urls(contains='STORY-7')) == ['ieee_spectrum', 'techcrunch']
+        assert [row[0] for row in techcrunch.iter_urls(contains='-7')] == ['https://techcrunch.com/2025/07/07/story-7/']
+        store.close()
+
+
+def run_manage_state(*argv):
+    output = StringIO()
+    with contextlib.redirect_stdout(output):
+        manage_state.main(list(argv))
+    return output.getvalue()
+
+
+def test_plugin_sources_in_manage_state():
+    """Тест CLI: источники-плагины из базы доступны в --source, неизвестные отклоняются"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        old_path = os.environ.get('STATE_DB_PATH')
+        os.environ['STATE_DB_PATH'] = os.path.join(tmp_dir, 'state.db')
+        try:
+            run_manage_state('--source', 'example', 'add', 'https://example.com/robots')
+            store = StateStore()
+            assert PublishedUrlStore(store, None).sources() == ['example']
+            store.close()
+
+            assert 'example: 1' in run_manage_state('count')
+            assert 'https://example.com/robots' in run_manage_state('--source', 'example', 'list')
+            try:
+                with contextlib.redirect_stderr(StringIO()):
+                    run_manage_state('--source', 'missing', 'list')
+                assert False, "unknown source must be rejected"
+            except SystemExit as e:
+                assert e.code == 2
+        finally:
+            if old_path is None:
+                os.environ.pop('STATE_DB_PATH')
+            else:
+                os.environ['STATE_DB_PATH'] = old_path
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование хранилища опубликованных URL")
+    print("=" * 50)
+    test_add_and_contains()
+    test_persists_between_connections()
+    test_migrate_json_once()
+    test_paginated_listing_and_search()
+    test_plugin_sources_in_manage_state()
+    print("🎉 Все тесты хранилища прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
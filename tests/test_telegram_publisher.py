@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Тест публикации в несколько каналов
+Test script for multi-channel fan-out publishing
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram_queue import TelegramSendQueue
+from telegram_publisher import ChannelTarget, TelegramPublisher, load_channel_targets
+from message_splitter import html_length
+
+
+class FakeFile:
+    def __init__(self, file_id):
+        self.file_id = file_id
+
+
+class FakeMessage:
+    def __init__(self, photo=None, message_id=1):
+        self.photo = photo
+        self.message_id = message_id
+
+
+class FakeBot:
+    """Имитация telegram.Bot с записью вызовов"""
+
+    def __init__(self, failing_chats=(), stale_file_ids=()):
+        self.failing_chats = set(failing_chats)
+        self.stale_file_ids = set(stale_file_ids)
+        self.calls = []
+
+    async def send_photo(self, chat_id, photo, caption, parse_mode, disable_notification):
+        uploaded = hasattr(photo, 'read')
+        self.calls.append(('photo', chat_id, uploaded, caption))
+        if chat_id in self.failing_chats:
+            raise RuntimeError(f"chat not found: {chat_id}")
+        if photo in self.stale_file_ids:
+            raise RuntimeError("Bad Request: wrong file identifier")
+        return FakeMessage(photo=[FakeFile('small'), FakeFile('file-123')], message_id=42)
+
+    async def send_animation(self, chat_id, animation, caption, parse_mode, disable_notification):
+        self.calls.append(('animation', chat_id, hasattr(animation, 'read'), caption))
+        return FakeMessage(message_id=43)
+
+    async def delete_message(self, chat_id, message_id):
+        self.calls.append(('delete', chat_id, False, message_id))
+
+    async def send_media_group(self, chat_id, media, disable_notification):
+        uploaded = any(hasattr(item.media, 'input_file_content') for item in media)
+        self.calls.append(('album', chat_id, uploaded, media[0].caption))
+        if chat_id in self.failing_chats:
+            raise RuntimeError(f"chat not found: {chat_id}")
+        return [FakeMessage(photo=[FakeFile(f'album-{i}')]) for i in range(len(media))]
+
+    async def send_message(self, chat_id, text, parse_mode, disable_web_page_preview, disable_notification):
+        self.calls.append(('message', chat_id, False, text))
+        if chat_id in self.failing_chats:
+            raise RuntimeError(f"chat not found: {chat_id}")
+        return FakeMessage()
+
+
+def make_publisher(bot, targets):
+    queue = TelegramSendQueue(chat_rate_per_minute=6000, chat_burst=10)
+    return TelegramPublisher(bot, queue, targets)
+
+
+def make_image():
+    image = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
+    image.write(b'\xff\xd8' + b'0' * 200)
+    image.close()
+    return image.name
+
+
+def test_single_upload_fan_out():
+    """Тест однократной загрузки медиа и рассылки по file_id"""
+    bot = FakeBot()
+    targets = [
+        ChannelTarget('@main'),
+        ChannelTarget('@regional', caption_prefix='[RU] '),
+        ChannelTarget('@backup', caption_suffix='\n#news')
+    ]
+    image_path = make_image()
+    try:
+        results = asyncio.run(make_publisher(bot, targets).publish('<b>Post</b>', image_path, 'photo'))
+    finally:
+        os.unlink(image_path)
+
+    print(f"📨 Вызовы: {bot.calls}")
+    assert all(error is None for error in results.values())
+    uploads = [call for call in bot.calls if call[2]]
+    assert len(uploads) == 1
+    captions = {call[1]: call[3] for call in bot.calls}
+    assert captions['@regional'] == '[RU] <b>Post</b>'
+    assert captions['@backup'] == '<b>Post</b>\n#news'
+
+
+def test_failures_tracked_per_channel():
+    """Тест учета ошибок по каналам и повтора только для упавших"""
+    bot = FakeBot(failing_chats={'@regional'})
+    targets = [ChannelTarget('@main'), ChannelTarget('@regional')]
+    publisher = make_publisher(bot, targets)
+
+    results = asyncio.run(publisher.publish('text'))
+    failed = [t for t in targets if results[t.chat_id] is not None]
+    assert [t.chat_id for t in failed] == ['@regional']
+
+    bot.failing_chats.clear()
+    bot.calls.clear()
+    results = asyncio.run(publisher.publish('text', targets=failed))
+    assert list(results) == ['@regional']
+    assert [call[1] for call in bot.calls] == ['@regional']
+
+
+def test_upload_falls_back_to_next_channel():
+    """Тест загрузки медиа через следующий канал при ошибке первого"""
+    bot = FakeBot(failing_chats={'@main'})
+    targets = [ChannelTarget('@main'), ChannelTarget('@regional'), ChannelTarget('@backup')]
+    image_path = make_image()
+    try:
+        results = asyncio.run(make_publisher(bot, targets).publish('Post', image_path, 'photo'))
+    finally:
+        os.unlink(image_path)
+
+    assert results['@main'] is not None
+    assert results['@regional'] is None and results['@backup'] is None
+    assert [call[1] for call in bot.calls if not call[2]] == ['@backup']
+
+
+def test_album_single_call_per_channel():
+    """Тест альбома: один send_media_group на канал и одна загрузка файлов"""
+    bot = FakeBot()
+    targets = [ChannelTarget('@main'), ChannelTarget('@regional', caption_prefix='[RU] ')]
+    paths = [make_image() for _ in range(3)]
+    try:
+        results = asyncio.run(make_publisher(bot, targets).publish_album('<b>Post</b>', paths))
+    finally:
+        for path in paths:
+            os.unlink(path)
+
+    print(f"📨 Вызовы: {bot.calls}")
+    assert all(error is None for error in results.values())
+    assert [call[0] for call in bot.calls] == ['album', 'album']
+    assert [call[2] for call in bot.calls] == [True, False]
+    assert bot.calls[1][3] == '[RU] <b>Post</b>'
+
+
+def test_media_captions_fit_with_channel_prefix():
+    """Тест подписи GIF и альбома: обрезается пост, префикс и суффикс канала помещаются в лимит"""
+    bot = FakeBot()
+    targets = [ChannelTarget('@main'), ChannelTarget('@regional', caption_prefix='<b>[RU]</b> ',
+                                                     caption_suffix='\n#news #robots')]
+    publisher = make_publisher(bot, targets)
+    post = '<i>' + 'Robots fold laundry. ' * 60 + '</i>'
+    paths = [make_image() for _ in range(2)]
+    try:
+        asyncio.run(publisher.publish(post, paths[0], 'animation'))
+        asyncio.run(publisher.publish_album(post, paths))
+    finally:
+        for path in paths:
+            os.unlink(path)
+
+    captions = [call[3] for call in bot.calls if call[1] == '@regional']
+    assert len(captions) == 2
+    for caption in captions:
+        assert html_length(caption) <= 1024
+        assert caption.startswith('<b>[RU]</b> ') and caption.endswith('</i>\n#news #robots')
+
+
+def test_prepared_file_id():
+    """Тест заранее загруженного медиа: загрузка в служебный чат и публикация по file_id"""
+    bot = FakeBot(stale_file_ids={'stale-id'})
+    targets = [ChannelTarget('@main'), ChannelTarget('@regional')]
+    publisher = make_publisher(bot, targets)
+    image_path = make_image()
+    try:
+        assert asyncio.run(publisher.upload_media('@staging', image_path)) == 'file-123'
+        # Служебное сообщение удалено, file_id остается
+        assert [call[:2] for call in bot.calls] == [('photo', '@staging'), ('delete', '@staging')]
+
+        bot.calls.clear()
+        results = asyncio.run(publisher.publish('Post', image_path, 'photo', file_id='file-123'))
+        assert all(error is None for error in results.values())
+        assert not any(call[2] for call in bot.calls)
+
+        # Устаревший file_id: файл загружается заново
+        bot.calls.clear()
+        results = asyncio.run(publisher.publish('Post', image_path, 'photo', file_id='stale-id'))
+        assert all(error is None for error in results.values())
+        assert len([call for call in bot.calls if call[2]]) == 1
+    finally:
+        os.unlink(image_path)
+
+
+def test_load_channel_targets_from_env():
+    """Тест чтения списка каналов из окружения"""
+    os.environ['TELEGRAM_CHANNEL_IDS'] = '@main, @regional'
+    try:
+        targets = load_channel_targets()
+    finally:
+        del os.environ['TELEGRAM_CHANNEL_IDS']
+    assert [t.chat_id for t in targets] == ['@main', '@regional']
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование публикации в несколько каналов")
+    print("=" * 50)
+    test_single_upload_fan_out()
+    test_failures_tracked_per_channel()
+    test_upload_falls_back_to_next_channel()
+    test_album_single_call_per_channel()
+    test_media_captions_fit_with_channel_prefix()
+    test_prepared_file_id()
+    test_load_channel_targets_from_env()
+    print("🎉 Все тесты публикации прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
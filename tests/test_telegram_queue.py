@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Тест очереди отправки Telegram
+Test script for the rate-limited Telegram send queue
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram_queue import TelegramSendQueue, TokenBucket
+
+
+class FloodError(Exception):
+    """Имитация telegram.error.RetryAfter"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Flood control exceeded. Retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+def test_token_bucket_pacing():
+    """Тест ограничения частоты token bucket"""
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=1)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(run())
+    print(f"⏱️ 3 токена при 20/сек и capacity=1: {elapsed:.3f}с")
+    assert elapsed >= 0.09
+
+
+def test_queue_honors_retry_after():
+    """Тест автоматического ожидания retry_after"""
+    calls = []
+
+    async def fake_send_message(chat_id, text):
+        calls.append((chat_id, text, time.monotonic()))
+        if len(calls) == 1:
+            raise FloodError(0.1)
+        return f"sent:{text}"
+
+    async def run():
+        queue = TelegramSendQueue(chat_rate_per_minute=6000, chat_burst=5)
+        result = await queue.send('@channel', fake_send_message, text='hello')
+        stats = queue.stats()
+        await queue.close()
+        return result, stats
+
+    result, stats = asyncio.run(run())
+    print(f"📊 Статистика очереди: {stats}")
+    assert result == 'sent:hello'
+    assert len(calls) == 2
+    assert calls[1][2] - calls[0][2] >= 0.09
+    assert stats['flood_waits'] == 1
+    assert stats['sent'] == 1
+    assert stats['queue_depth'] == 0
+
+
+def test_queue_gives_up_after_max_retries():
+    """Тест ошибки после исчерпания попыток"""
+    async def always_flood(chat_id, text):
+        raise FloodError(0.01)
+
+    async def run():
+        queue = TelegramSendQueue(chat_rate_per_minute=6000, chat_burst=5, max_retries=2)
+        try:
+            await queue.send('@channel', always_flood, text='hello')
+        except FloodError:
+            return queue.stats()
+        finally:
+            await queue.close()
+        return None
+
+    stats = asyncio.run(run())
+    assert stats is not None
+    assert stats['failed'] == 1
+    assert stats['flood_waits'] == 2
+
+
+def test_queue_keeps_order_per_chat():
+    """Тест порядка сообщений внутри одного чата"""
+    sent = []
+
+    async def fake_send_message(chat_id, text):
+        await asyncio.sleep(0)
+        sent.append((chat_id, text))
+
+    async def run():
+        queue = TelegramSendQueue(chat_rate_per_minute=6000, chat_burst=10)
+        await asyncio.gather(*[
+            queue.send(chat, fake_send_message, text=str(i))
+            for i in range(5) for chat in ('@a', '@b')
+        ])
+        await queue.close()
+
+    asyncio.run(run())
+    assert [text for chat, text in sent if chat == '@a'] == ['0', '1', '2', '3', '4']
+    assert [text for chat, text in sent if chat == '@b'] == ['0', '1', '2', '3', '4']
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование очереди отправки Telegram")
+    print("=" * 50)
+    test_token_bucket_pacing()
+    test_queue_honors_retry_after()
+    test_queue_gives_up_after_max_retries()
+    test_queue_keeps_order_per_chat()
+    print("🎉 Все тесты очереди прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
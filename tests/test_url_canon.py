@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Тест канонизации URL статей
+Test script for URL canonicalization and hashed dedup
+"""
+
+import sys
+import os
+import tempfile
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_canon import canonicalize_url, url_hash
+from state_store import StateStore, PublishedUrlStore
+
+
+def test_variants_share_canonical_form():
+    """Тест одинакового канонического вида у вариантов одной статьи"""
+    canonical = 'https://techcrunch.com/2025/07/22/some-story'
+    variants = [
+        'https://techcrunch.com/2025/07/22/some-story/',
+        'http://techcrunch.com/2025/07/22/some-story/',
+        'https://www.TechCrunch.com/2025/07/22/some-story/?utm_source=rss&utm_medium=feed',
+        'https://techcrunch.com/2025/07/22/some-story/amp/',
+        'https://amp.techcrunch.com/2025/07/22/some-story/#comments',
+    ]
+    for variant in variants:
+        assert canonicalize_url(variant, 'techcrunch') == canonical, variant
+    assert canonicalize_url('http://spectrum.ieee.org/amp/robot-hands', 'ieee_spectrum') == \
+        'https://spectrum.ieee.org/robot-hands'
+
+
+def test_generic_rules_keep_meaningful_query():
+    """Тест удаления только параметров отслеживания для неизвестных источников"""
+    url = 'https://example.com:443/path/?b=2&utm_campaign=x&a=1&fbclid=abc'
+    assert canonicalize_url(url) == 'https://example.com/path?a=1&b=2'
+
+
+def test_hash_is_fixed_width():
+    """Тест 64-битного хеша, совместимого с SQLite INTEGER"""
+    value = url_hash('https://techcrunch.com/a/?utm_source=x', 'techcrunch')
+    assert value == url_hash('http://techcrunch.com/a', 'techcrunch')
+    assert -2 ** 63 <= value < 2 ** 63
+
+
+def test_store_matches_variants():
+    """Тест проверки опубликованности по каноническому хешу"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = StateStore(os.path.join(tmp_dir, 'state.db'))
+        urls = PublishedUrlStore(store, 'techcrunch')
+        urls.add('https://techcrunch.com/2025/07/22/some-story/')
+
+        assert 'https://techcrunch.com/2025/07/22/some-story/?utm_source=twitter' in urls
+        published = urls.published_among([
+            'http://techcrunch.com/2025/07/22/some-story/amp/',
+            'https://techcrunch.com/2025/07/22/other-story/',
+        ])
+        assert published == {'http://techcrunch.com/2025/07/22/some-story/amp/'}
+        store.close()
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование канонизации URL")
+    print("=" * 50)
+    test_variants_share_canonical_form()
+    test_generic_rules_keep_meaningful_query()
+    test_hash_is_fixed_width()
+    test_store_matches_variants()
+    print("🎉 Все тесты канонизации прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Тест очереди задач с арендой и распределенного обработчика
+Test script for the leased work queue and queue workers
+"""
+
+import sys
+import os
+import signal
+import asyncio
+import tempfile
+import threading
+import subprocess
+
+# Добавляем корень проекта в путь для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from work_queue import SQLiteWorkQueue, HttpWorkQueue, create_server, open_work_queue
+from run_worker import QueueWorker, enqueue_discovery
+from state_store import StateStore
+from test_base_scraper import make_scraper
+
+
+def test_lease_expiry_and_retries():
+    """Тест аренды: истекшая задача достается другому узлу, старый узел теряет ее, после max_attempts - dead"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = SQLiteWorkQueue(StateStore(os.path.join(tmp_dir, 'state.db')), max_attempts=2)
+        assert queue.put('extract', 'example:https://example.com/a', {'source': 'example'})
+        assert not queue.put('extract', 'example:https://example.com/a', {'source': 'example'})
+        assert queue.known_keys('extract', ['example:https://example.com/a', 'x']) == {'example:https://example.com/a'}
+
+        first = queue.claim(['extract'], 'node-1', lease_seconds=-1)
+        assert first.payload == {'source': 'example'}
+        second = queue.claim(['extract'], 'node-2')
+        assert second.id == first.id and second.attempts == 2
+        assert not queue.heartbeat(first) and not queue.complete(first)
+        assert queue.claim(['extract'], 'node-1') is None
+
+        assert queue.fail(second, 'boom')
+        assert queue.stats() == {'extract': {'dead': 1}}
+
+
+def test_publisher_lock_is_exclusive():
+    """Тест блокировки публикатора: второй узел получает ее только после освобождения или истечения"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = SQLiteWorkQueue(StateStore(os.path.join(tmp_dir, 'state.db')))
+        assert queue.acquire_lock('publisher', 'node-1')
+        assert queue.acquire_lock('publisher', 'node-1')
+        assert not queue.acquire_lock('publisher', 'node-2')
+        queue.release_lock('publisher', 'node-1')
+        assert queue.acquire_lock('publisher', 'node-2', lease_seconds=-1)
+        assert queue.acquire_lock('publisher', 'node-1')
+
+
+def test_http_backend_roundtrip():
+    """Тест сетевой очереди: клиент и сервер с токеном"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        server = create_server(open_work_queue(f"sqlite:///{os.path.join(tmp_dir, 'queue.db')}"),
+                               port=0, token='secret')
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}'
+            queue = HttpWorkQueue(url, token='secret')
+            assert queue.put('generate', 'example:https://example.com/a', {'title': 'Роботы'})
+            task = queue.claim(['generate'], 'node-1')
+            assert task.payload == {'title': 'Роботы'}
+            assert queue.heartbeat(task) and queue.complete(task)
+            assert queue.stats() == {'generate': {'done': 1}}
+            try:
+                HttpWorkQueue(url, token='wrong').stats()
+                assert False, "request without the token must be rejected"
+            except Exception as e:
+                assert '401' in str(e)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_serve_stops_on_signal():
+    """Тест сервера очереди: процесс run_worker.py serve завершается по SIGINT и SIGTERM"""
+    if os.name == 'nt':
+        return
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'run_worker.py')
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = dict(os.environ, STATE_DB_PATH=os.path.join(tmp_dir, 'state.db'), WORK_QUEUE_TOKEN='')
+            process = subprocess.Popen([sys.executable, script, 'serve', '--port', '0'], cwd=tmp_dir, env=env,
+                                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            try:
+                line = process.stdout.readline()
+                assert 'http://' in line, line
+                assert HttpWorkQueue(line.split()[-1]).stats() == {}
+                process.send_signal(sig)
+                assert process.wait(timeout=15) == 0
+                assert 'остановлен' in process.stdout.read()
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+
+
+def test_workers_publish_each_story_once():
+    """Тест цепочки задач: два обработчика и два публикатора, статья публикуется один раз"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, ['2', 'Post [ссылка]'])
+        scraper._publisher.caption_errors = 0
+        queue = SQLiteWorkQueue(scraper.state_store)
+        scrapers = {'example': scraper}
+        assert enqueue_discovery(queue, ['example'], slot='2025-07-21T10:00') == ['example']
+        assert enqueue_discovery(queue, ['example'], slot='2025-07-21T10:00') == []
+
+        async def scenario():
+            workers = [QueueWorker(queue, scrapers, worker_id=f'worker-{index}') for index in (1, 2)]
+            await asyncio.gather(*[worker.run(once=True) for worker in workers])
+            publishers = [QueueWorker(queue, scrapers, worker_id=f'publisher-{index}', publisher=True)
+                          for index in (1, 2)]
+            await asyncio.gather(*[publisher.run(once=True) for publisher in publishers])
+            return workers, publishers
+
+        workers, publishers = asyncio.run(scenario())
+        assert sum(worker.processed['extract'] for worker in workers) == 1
+        assert [publisher.processed['publish'] for publisher in publishers] == [1, 0]
+        assert scraper._publisher.posts == ['Post https://example.com/quantum']
+        assert scraper.is_url_published('https://example.com/quantum')
+        assert queue.stats()['publish'] == {'done': 1}
+        assert not scraper.checkpoints.pending('example')
+        asyncio.run(scraper.clients.close())
+
+
+def test_sent_post_is_not_repeated_by_another_node():
+    """Тест падения публикатора после отправки: публикатор другого узла видит отметку в очереди"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        node_dirs = [os.path.join(tmp_dir, name) for name in ('node-1', 'node-2')]
+        for node_dir in node_dirs:
+            os.makedirs(node_dir)
+        first, second = make_scraper(node_dirs[0], []), make_scraper(node_dirs[1], [])
+        first._publisher.caption_errors = 0
+        queue = SQLiteWorkQueue(StateStore(os.path.join(tmp_dir, 'queue.db')))
+        article = {'title': 'Robots learn to fold laundry', 'link': 'https://example.com/robots',
+                   'summary': 'A new robot folds towels'}
+        queue.put('publish', 'example:https://example.com/robots',
+                  {'source': 'example', 'article': article, 'content': 'Full text', 'media_url': None,
+                   'media_urls': [], 'post_content': 'Post [ссылка]'})
+
+        def crash(items):
+            raise RuntimeError("node crashed")
+
+        # Первый узел отправляет пост и падает до учета публикации
+        first.record_published = crash
+        asyncio.run(QueueWorker(queue, {'example': first}, worker_id='node-1', publisher=True).run(once=True))
+        assert len(first._publisher.posts) == 1
+        queue.store.execute('UPDATE work_tasks SET available_at = 0')
+
+        publisher = QueueWorker(queue, {'example': second}, worker_id='node-2', publisher=True)
+        asyncio.run(publisher.run(once=True))
+        assert publisher.processed['publish'] == 1
+        assert second._publisher.posts == []
+        assert second.is_url_published('https://example.com/robots')
+        for scraper in (first, second):
+            asyncio.run(scraper.clients.close())
+
+
+def test_lease_lost_during_post_spacing_is_not_sent():
+    """Тест паузы между постами: если за паузу задачу взял другой узел, пост не отправляется"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, [])
+        queue = SQLiteWorkQueue(scraper.state_store)
+        article = {'title': 'Robots learn to fold laundry', 'link': 'https://example.com/robots',
+                   'summary': 'A new robot folds towels'}
+        queue.put('publish', 'example:https://example.com/robots',
+                  {'source': 'example', 'article': article, 'content': 'Full text', 'media_url': None,
+                   'media_urls': [], 'post_content': 'Post [ссылка]'})
+        taken = []
+
+        async def long_spacing():
+            # Пауза пережила аренду: задачу забрал публикатор другого узла
+            queue.store.execute('UPDATE work_tasks SET lease_until = 0')
+            taken.append(queue.claim(['publish'], 'node-2'))
+
+        scraper.wait_post_spacing = long_spacing
+        publisher = QueueWorker(queue, {'example': scraper}, worker_id='node-1', publisher=True)
+        asyncio.run(publisher.run(once=True))
+        assert taken[0] is not None and publisher.processed['publish'] == 0
+        assert scraper._publisher.posts == []
+        assert queue.known_keys('published', ['example:https://example.com/robots']) == set()
+        asyncio.run(scraper.clients.close())
+
+
+class FlakyQueue:
+    """Очередь, у которой первые вызовы методов из failures падают, как при сбое сервера очереди"""
+
+    def __init__(self, queue, failures):
+        self.queue = queue
+        self.failures = dict(failures)
+
+    def __getattr__(self, name):
+        method = getattr(self.queue, name)
+
+        def call(*args, **kwargs):
+            if self.failures.get(name):
+                self.failures[name] -= 1
+                raise ConnectionError(f"queue server is unavailable ({name})")
+            return method(*args, **kwargs)
+        return call
+
+
+def test_worker_survives_queue_errors():
+    """Тест сбоев очереди: узел не останавливается, а повторяет вызовы и продолжает работу"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = make_scraper(tmp_dir, [])
+        queue = SQLiteWorkQueue(scraper.state_store)
+        queue.put('extract', 'example:https://example.com/robots',
+                  {'source': 'example', 'article': {'title': 'Robots', 'link': 'https://example.com/robots'}})
+        flaky = FlakyQueue(queue, {'claim': 2, 'put': 1, 'complete': 1})
+
+        async def scenario():
+            stop_event = asyncio.Event()
+            worker = QueueWorker(flaky, {'example': scraper}, worker_id='node-1', idle_seconds=0.01)
+            running = asyncio.ensure_future(worker.run(stop_event))
+            while not worker.processed['extract'] and not running.done():
+                await asyncio.sleep(0.01)
+            stop_event.set()
+            return await running
+
+        assert asyncio.run(scenario())['extract'] == 1
+        assert queue.stats() == {'extract': {'done': 1}, 'generate': {'pending': 1}}
+        asyncio.run(scraper.clients.close())
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование очереди задач")
+    print("=" * 50)
+    test_lease_expiry_and_retries()
+    test_publisher_lock_is_exclusive()
+    test_http_backend_roundtrip()
+    test_serve_stops_on_signal()
+    test_workers_publish_each_story_once()
+    test_sent_post_is_not_repeated_by_another_node()
+    test_lease_lost_during_post_spacing_is_not_sent()
+    test_worker_survives_queue_errors()
+    print("🎉 Все тесты очереди задач прошли успешно!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+URL Canonicalization
+Приведение URL статей к каноническому виду и компактный хеш для индекса дублей
+"""
+
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Параметры отслеживания, которые не меняют содержимое страницы
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'ref_url', 'cmpid', 'ncid', 'sr_share', 'guccounter',
+    'guce_referrer', 'guce_referrer_sig', 'share', 'amp', 'outputtype',
+}
+TRACKING_PREFIXES = ('utm_', 'hsa_', 'pk_', 'mtm_')
+
+AMP_PATH_RE = re.compile(r'/amp/?$')
+
+# Правила по источникам: хосты-зеркала и переписывание пути
+SOURCE_RULES = {
+    'techcrunch': {
+        'domain': 'techcrunch.com',
+        'hosts': {'amp.techcrunch.com': 'techcrunch.com', 'guce.techcrunch.com': 'techcrunch.com'},
+        'path_rewrites': [],
+        'drop_query': True,
+    },
+    'ieee_spectrum': {
+        'domain': 'spectrum.ieee.org',
+        'hosts': {},
+        # AMP-версии IEEE Spectrum имеют вид /amp/<slug>
+        'path_rewrites': [(re.compile(r'^/amp/'), '/')],
+        'drop_query': True,
+    },
+}
+
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url, source=None):
+    """Канонический вид URL статьи
+
+    Схема приводится к https, хост - к нижнему регистру без www. и порта по умолчанию,
+    удаляются фрагмент, параметры отслеживания, AMP-варианты и завершающий слэш.
+    Для известных источников дополнительно применяются правила из SOURCE_RULES.
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+
+    parts = urlsplit(url if '//' in url else '//' + url)
+    rules = SOURCE_RULES.get(source, {})
+
+    host = (parts.hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    host = rules.get('hosts', {}).get(host, host)
+    port = parts.port
+    if port and port not in (80, 443):
+        host = f'{host}:{port}'
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    path = AMP_PATH_RE.sub('', path) or '/'
+    for pattern, replacement in rules.get('path_rewrites', []):
+        path = pattern.sub(replacement, path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    if rules.get('drop_query'):
+        query = ''
+    else:
+        params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                  if not _is_tracking_param(k)]
+        query = urlencode(sorted(params))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def detect_source(url):
+    """Источник по домену URL или None"""
+    host = canonicalize_url(url).split('/')[2] if url else ''
+    for source, rules in SOURCE_RULES.items():
+        domain = rules['domain']
+        if host == domain or host.endswith('.' + domain) or host in rules['hosts']:
+            return source
+    return None
+
+
+def url_hash(url, source=None):
+    """Фиксированный 64-битный хеш канонического URL (знаковое целое для SQLite INTEGER)"""
+    digest = hashlib.blake2b(canonicalize_url(url, source).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
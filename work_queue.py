@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Work Queue
+Очередь задач для нескольких узлов: задача берется в аренду (lease) и продлевается
+сигналами жизни (heartbeat); задача упавшего узла возвращается в очередь, когда аренда истекает.
+Локальная реализация - таблица в общей SQLite базе, сетевая - HTTP клиент к серверу очереди.
+"""
+
+import os
+import json
+import time
+import uuid
+import hmac
+import logging
+from datetime import datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 60
+DEFAULT_PORT = 8765
+
+PENDING, LEASED, DONE, DEAD = 'pending', 'leased', 'done', 'dead'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_work_tasks_claim ON work_tasks (status, kind, available_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_work_tasks_token ON work_tasks (lease_token);
+CREATE TABLE IF NOT EXISTS work_locks (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    lease_until REAL NOT NULL
+);
+"""
+
+
+class Task:
+    """Задача, взятая в аренду; token подтверждает аренду при продлении и завершении"""
+
+    def __init__(self, task_id, kind, key, payload, token, attempts=1):
+        self.id = task_id
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.token = token
+        self.attempts = attempts
+        # Аренда потеряна (не продлилась): результат задачи больше не принимается
+        self.lost = False
+
+    def as_dict(self):
+        return {'id': self.id, 'kind': self.kind, 'key': self.key, 'payload': self.payload,
+                'token': self.token, 'attempts': self.attempts}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['kind'], data['key'], data['payload'], data['token'], data['attempts'])
+
+    def __repr__(self):
+        return f"Task({self.kind!r}, {self.key!r})"
+
+
+class WorkQueue:
+    """Интерфейс очереди задач
+
+    Ключ задачи (kind, key) уникален навсегда: повторная постановка той же задачи
+    (например, статьи, найденной двумя узлами) игнорируется.
+    """
+
+    def put(self, kind, key, payload, delay=0, done=False):
+        """Постановка задачи, False - задача с таким ключом уже есть
+
+        done=True - сразу завершенная задача: отметка, общая для всех узлов (например, "пост отправлен").
+        """
+        raise NotImplementedError
+
+    def known_keys(self, kind, keys):
+        """Ключи из списка, для которых задача kind уже ставилась"""
+        raise NotImplementedError
+
+    def claim(self, kinds, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Аренда первой доступной задачи одного из видов kinds, Task или None"""
+        raise NotImplementedError
+
+    def heartbeat(self, task, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Продление аренды, False - аренда истекла и задачу взял другой узел"""
+        raise NotImplementedError
+
+    def complete(self, task):
+        """Завершение задачи, False - аренда уже потеряна"""
+        raise NotImplementedError
+
+    def fail(self, task, error, retry_delay=RETRY_DELAY_SECONDS):
+        """Ошибка задачи: повтор через retry_delay или dead после max_attempts попыток"""
+        raise NotImplementedError
+
+    def acquire_lock(self, name, holder, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Захват или продление именованной блокировки, True - holder ее держит"""
+        raise NotImplementedError
+
+    def release_lock(self, name, holder):
+        raise NotImplementedError
+
+    def stats(self):
+        """Количество задач {вид: {статус: число}}"""
+        raise NotImplementedError
+
+
+def _now_iso():
+    return datetime.now().isoformat()
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Очередь в общей SQLite базе (StateStore): процессы одного узла или сервер очереди
+
+    Выбор и захват задачи выполняются одним UPDATE, поэтому два процесса не возьмут одну задачу.
+    """
+
+    def __init__(self, store, max_attempts=None):
+        self.store = store
+        self.max_attempts = max_attempts or int(os.getenv('WORK_QUEUE_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS))
+        with self.store.lock, self.store.conn:
+            self.store.conn.executescript(SCHEMA)
+
+    def put(self, kind, key, payload, delay=0, done=False):
+        cursor = self.store.execute(
+            'INSERT OR IGNORE INTO work_tasks (kind, key, payload, status, available_at, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (kind, key, json.dumps(payload, ensure_ascii=False, default=str), DONE if done else PENDING,
+             time.time() + delay, _now_iso(), _now_iso())
+        )
+        return cursor.rowcount == 1
+
+    def known_keys(self, kind, keys):
+        keys = list(keys)
+        known = set()
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self.store.query(
+                f'SELECT key FROM work_tasks WHERE kind = ? AND key IN ({",".join("?" * len(batch))})',
+                [kind] + batch
+            )
+            known.update(key for (key,) in rows)
+        return known
+
+    def claim(self, kinds, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        token = uuid.uuid4().hex
+        placeholders = ','.join('?' * len(kinds))
+        # Задача, узлы которой раз за разом пропадали, больше не выдается
+        self.store.execute(
+            "UPDATE work_tasks SET status = ?, lease_token = NULL, error = 'lease expired', updated_at = ? "
+            "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+            (DEAD, _now_iso(), LEASED, now, self.max_attempts)
+        )
+        self.store.execute(
+            f"UPDATE work_tasks SET status = ?, lease_token = ?, worker = ?, lease_until = ?, "
+            f"attempts = attempts + 1, updated_at = ? WHERE id = ("
+            f"SELECT id FROM work_tasks WHERE kind IN ({placeholders}) AND available_at <= ? "
+            f"AND (status = ? OR (status = ? AND lease_until < ?)) ORDER BY available_at, id LIMIT 1)",
+            [LEASED, token, worker, now + lease_seconds, _now_iso()] + list(kinds) + [now, PENDING, LEASED, now]
+        )
+        rows = self.store.query('SELECT id, kind, key, payload, attempts FROM work_tasks WHERE lease_token = ?',
+                                (token,))
+        if not rows:
+            return None
+        task_id, kind, key, payload, attempts = rows[0]
+        return Task(task_id, kind, key, json.loads(payload), token, attempts)
+
+    def _update_leased(self, task, sql, params):
+        cursor = self.store.execute(f'{sql}, updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?',
+                                    list(params) + [_now_iso(), task.id, task.token, LEASED])
+        return cursor.rowcount == 1
+
+    def heartbeat(self, task, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._update_leased(task, 'UPDATE work_tasks SET lease_until = ?', [time.time() + lease_seconds])
+
+    def complete(self, task):
+        return self._update_leased(task, 'UPDATE work_tasks SET status = ?, lease_token = NULL, error = NULL',
+                                   [DONE])
+
+    def fail(self, task, error, retry_delay=RETRY_DELAY_SECONDS):
+        status = DEAD if task.attempts >= self.max_attempts else PENDING
+        return self._update_leased(
+            task, 'UPDATE work_tasks SET status = ?, lease_token = NULL, error = ?, available_at = ?',
+            [status, str(error), time.time() + retry_delay]
+        )
+
+    def acquire_lock(self, name, holder, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        with self.store.lock, self.store.conn:
+            self.store.conn.execute('INSERT OR IGNORE INTO work_locks (name, holder, lease_until) VALUES (?, ?, 0)',
+                                    (name, holder))
+            cursor = self.store.conn.execute(
+                'UPDATE work_locks SET holder = ?, lease_until = ? WHERE name = ? AND (holder = ? OR lease_until < ?)',
+                (holder, now + lease_seconds, name, holder, now)
+            )
+        return cursor.rowcount == 1
+
+    def release_lock(self, name, holder):
+        self.store.execute('UPDATE work_locks SET lease_until = 0 WHERE name = ? AND holder = ?', (name, holder))
+
+    def stats(self):
+        result = {}
+        for kind, status, count in self.store.query(
+                'SELECT kind, status, COUNT(*) FROM work_tasks GROUP BY kind, status'):
+            result.setdefault(kind, {})[status] = count
+        return result
+
+
+class HttpWorkQueue(WorkQueue):
+    """Сетевая очередь: клиент сервера очереди (run_worker.py serve) на другом узле
+
+    WORK_QUEUE_TOKEN - общий секрет клиентов и сервера (заголовок Authorization).
+    """
+
+    def __init__(self, base_url, session=None, token=None, timeout=10):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = session or requests.Session()
+        self.token = token if token is not None else os.getenv('WORK_QUEUE_TOKEN', '')
+        self.timeout = timeout
+
+    def _call(self, method, **params):
+        headers = {'Authorization': f'Bearer {self.token}'} if self.token else {}
+        response = self.session.post(f'{self.base_url}/{method}', json=params, headers=headers,
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['result']
+
+    def put(self, kind, key, payload, delay=0, done=False):
+        return self._call('put', kind=kind, key=key, payload=payload, delay=delay, done=done)
+
+    def known_keys(self, kind, keys):
+        return set(self._call('known_keys', kind=kind, keys=list(keys)))
+
+    def claim(self, kinds, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        data = self._call('claim', kinds=list(kinds), worker=worker, lease_seconds=lease_seconds)
+        return Task.from_dict(data) if data else None
+
+    def heartbeat(self, task, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._call('heartbeat', task=task.as_dict(), lease_seconds=lease_seconds)
+
+    def complete(self, task):
+        return self._call('complete', task=task.as_dict())
+
+    def fail(self, task, error, retry_delay=RETRY_DELAY_SECONDS):
+        return self._call('fail', task=task.as_dict(), error=str(error), retry_delay=retry_delay)
+
+    def acquire_lock(self, name, holder, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._call('acquire_lock', name=name, holder=holder, lease_seconds=lease_seconds)
+
+    def release_lock(self, name, holder):
+        return self._call('release_lock', name=name, holder=holder)
+
+    def stats(self):
+        return self._call('stats')
+
+
+# Методы очереди, доступные по сети; параметр task передается словарем
+SERVER_METHODS = ('put', 'known_keys', 'claim', 'heartbeat', 'complete', 'fail',
+                  'acquire_lock', 'release_lock', 'stats')
+
+
+def handle_request(queue, method, params):
+    """Вызов метода очереди по запросу сервера, результат в виде JSON-совместимого значения"""
+    if method not in SERVER_METHODS:
+        raise KeyError(method)
+    if 'task' in params:
+        params['task'] = Task.from_dict(params['task'])
+    result = getattr(queue, method)(**params)
+    if isinstance(result, Task):
+        return result.as_dict()
+    if isinstance(result, set):
+        return sorted(result)
+    return result
+
+
+def create_server(queue, host='127.0.0.1', port=DEFAULT_PORT, token=None):
+    """HTTP сервер очереди (POST /<метод> с JSON параметрами), запуск - serve_forever()"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    token = token if token is not None else os.getenv('WORK_QUEUE_TOKEN', '')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if token and not hmac.compare_digest(self.headers.get('Authorization', ''), f'Bearer {token}'):
+                return self._reply(401, {'error': 'unauthorized'})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                params = json.loads(self.rfile.read(length) or b'{}')
+                result = handle_request(queue, self.path.strip('/'), params)
+            except KeyError as e:
+                return self._reply(404, {'error': f'unknown method {e}'})
+            except Exception as e:
+                logger.error(f"Work queue request {self.path} failed: {e}")
+                return self._reply(400, {'error': str(e)})
+            self._reply(200, {'result': result})
+
+        def _reply(self, status, body):
+            data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            logger.debug(f"Work queue server: {format % args}")
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+# Реализации очереди по схеме WORK_QUEUE_URL: {схема: фабрика(url, store)}
+_BACKENDS = {}
+
+
+def register_backend(scheme, factory):
+    """Подключение своей реализации очереди (например, redis://) по схеме URL"""
+    _BACKENDS[scheme] = factory
+
+
+def open_work_queue(url=None, store=None):
+    """Очередь по WORK_QUEUE_URL: пусто - общая база состояния, sqlite:///путь, http(s)://сервер"""
+    url = url if url is not None else os.getenv('WORK_QUEUE_URL', '')
+    scheme = urlparse(url).scheme if url else 'sqlite'
+    if scheme not in _BACKENDS:
+        raise ValueError(f"Unsupported work queue backend: {scheme}")
+    return _BACKENDS[scheme](url, store)
+
+
+def _open_sqlite(url, store):
+    from state_store import StateStore
+    # Как в SQLAlchemy: sqlite:///queue.db - относительный путь, sqlite:////var/queue.db - абсолютный
+    path = urlparse(url).path[1:] if url else ''
+    return SQLiteWorkQueue(StateStore(path) if path else store or StateStore())
+
+
+register_backend('sqlite', _open_sqlite)
+register_backend('http', lambda url, store: HttpWorkQueue(url))
+register_backend('https', lambda url, store: HttpWorkQueue(url))